@@ -26,17 +26,320 @@ logger = logging.getLogger("DbSchema")
 # # (YYYY-MM-DD HH:MM:SS) objects should include 'datetime' in the key name
 # # (YYYY-MM-DD) objects should include 'date' in the key name
 
-db_ver = "0.2.1"  # Current schema version
+db_ver = "0.2.9"  # Current schema version
+
+
+def _add_missing_columns(conn: sqlite3.Connection, table: str, columns: dict[str, str]) -> None:
+    """``ALTER TABLE ... ADD COLUMN`` for each ``name: definition`` not already on ``table``."""
+    existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    for name, definition in columns.items():
+        if name not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
+
+
+# Leaderboard order within each game: active players by value, ties to whoever joined first.
+# Anyone not active gets a NULL rank.  Shared by Backend.update_ranks and the 0.2.6 migration.
+RANKED_PARTICIPANTS = """SELECT participation_id, CASE WHEN status = 'active' THEN ROW_NUMBER() OVER (
+        PARTITION BY game_id, status = 'active'
+        ORDER BY current_value DESC, datetime_joined, participation_id
+    ) END AS new_rank
+    FROM game_participants"""
+
+
+# Players of every ended game in one schema (``main.`` or the attached ``archive.``).  Pending players don't count.
+CAREER_GAMES = """SELECT gp.user_id, gp.status, gp.rank, gp.change_dollars, g.start_money
+        FROM {schema}game_participants gp JOIN {schema}games g ON g.game_id = gp.game_id
+        WHERE g.status = 'ended' AND gp.status != 'pending'"""
+
+# Career totals per user over every ended game in ``{played}`` (CAREER_GAMES rows): wins (rank 1 among
+# active players), summed change_dollars and the start money it is measured against.
+CAREER_STATS = """SELECT u.user_id,
+        COALESCE(c.wins, 0) AS wins,
+        ROUND(COALESCE(c.change_dollars, 0), 2) AS change_dollars,
+        CASE WHEN c.start_money > 0 THEN ROUND(c.change_dollars * 100 / c.start_money, 2) ELSE 0 END AS change_percent,
+        COALESCE(c.start_money, 0) AS start_money
+    FROM users u LEFT JOIN (
+        SELECT p.user_id, SUM(p.status = 'active' AND p.rank = 1) AS wins,
+            SUM(COALESCE(p.change_dollars, 0)) AS change_dollars, SUM(p.start_money) AS start_money
+        FROM ({played}) p
+        GROUP BY p.user_id
+    ) c ON c.user_id = u.user_id"""
+
+
+def _rebuild_career_stats(played: str) -> tuple[str, str]:
+    return (
+        "UPDATE games SET results_recorded = 1 WHERE status = 'ended'",
+        f"""UPDATE users SET overall_wins = c.wins, change_dollars = c.change_dollars,
+        change_percent = c.change_percent, career_start_money = c.start_money
+    FROM ({CAREER_STATS.format(played=played)}) AS c WHERE users.user_id = c.user_id""",
+    )
+
+
+# Rewrites users.overall_wins/change_dollars/change_percent/career_start_money from CAREER_STATS
+# and marks every ended game as counted.  Shared by Backend.rebuild_career_stats and the 0.2.7 migration.
+REBUILD_CAREER_STATS = _rebuild_career_stats(CAREER_GAMES.format(schema="main."))
+# Same, with the games moved to the archive file (see helpers.game_archive) attached as ``archive``
+REBUILD_CAREER_STATS_WITH_ARCHIVE = _rebuild_career_stats(
+    f"{CAREER_GAMES.format(schema='main.')} UNION ALL {CAREER_GAMES.format(schema='archive.')}"
+)
+
+
+def _migrate_0_2_1_to_0_2_2(db_name: str) -> None:
+    """Add price tiers / OHLC to stock_prices (existing rows become ``raw``)."""
+    conn = sqlite3.connect(db_name)
+    try:
+        _add_missing_columns(
+            conn,
+            "stock_prices",
+            {
+                "price_type": "TEXT NOT NULL DEFAULT 'raw'",
+                "open": "REAL DEFAULT NULL",
+                "high": "REAL DEFAULT NULL",
+                "low": "REAL DEFAULT NULL",
+            },
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+_STOCK_PRICES_TABLE = """CREATE TABLE IF NOT EXISTS {name} (
+        price_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        stock_id INTEGER NOT NULL,
+        price REAL NOT NULL,           -- Closing price of stock
+        ts INTEGER NOT NULL,           -- Minutes since 1970-01-01 00:00 (host wall-clock, see helpers/price_time.py)
+        price_type TEXT NOT NULL DEFAULT 'raw', -- raw (as polled), hourly or daily (downsampled OHLC)
+        open REAL DEFAULT NULL,      -- Downsampled or backfilled bar rows only
+        high REAL DEFAULT NULL,      -- Downsampled or backfilled bar rows only
+        low REAL DEFAULT NULL,       -- Downsampled or backfilled bar rows only
+        
+        FOREIGN KEY (stock_id) REFERENCES stocks (stock_id) ON DELETE CASCADE,  -- When a ticker is deleted from the main table, all references to it will also be deleted?
+        
+        UNIQUE (stock_id, ts)                                                 -- One price per stock per minute; also the lookup index
+        );"""
+
+
+def _migrate_0_2_2_to_0_2_3(db_name: str) -> None:
+    """Rebuild stock_prices with an integer ``ts`` (epoch minute) in place of the ISO ``datetime`` text.
+
+    Rows whose datetime can't be parsed are dropped; when two rows land on the same
+    minute the later one (highest ``price_id``) is kept.
+    """
+    conn = sqlite3.connect(db_name)
+    try:
+        before = conn.execute("SELECT COUNT(*) FROM stock_prices").fetchone()[0]
+        conn.execute("DROP TABLE IF EXISTS stock_prices_new")
+        conn.execute(_STOCK_PRICES_TABLE.format(name="stock_prices_new"))
+        conn.execute(
+            """INSERT OR IGNORE INTO stock_prices_new (price_id, stock_id, price, ts, price_type, open, high, low)
+            SELECT price_id, stock_id, price, CAST(strftime('%s', datetime) AS INTEGER) / 60, price_type, open, high, low
+            FROM stock_prices
+            WHERE strftime('%s', datetime) IS NOT NULL
+            ORDER BY price_id DESC"""
+        )
+        after = conn.execute("SELECT COUNT(*) FROM stock_prices_new").fetchone()[0]
+        conn.execute("DROP TABLE stock_prices")
+        conn.execute("ALTER TABLE stock_prices_new RENAME TO stock_prices")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_stock_prices_ts ON stock_prices(ts)")
+        conn.commit()
+    finally:
+        conn.close()
+    if before != after:
+        logger.warning("stock_prices -> 0.2.3: dropped %s unparseable/duplicate row(s)", before - after)
+
+
+_SETTLEMENT_PRICES_TABLE = """CREATE TABLE IF NOT EXISTS settlement_prices (
+        game_id TEXT NOT NULL,
+        stock_id INTEGER NOT NULL,
+        settle_ts INTEGER NOT NULL,        -- Official moment (epoch minute): market open on the game's start_date, or when a late pick was made
+        price REAL NOT NULL,               -- First stock_prices row at/after settle_ts
+        price_ts INTEGER NOT NULL,         -- ts of that row
+        datetime_captured TEXT NOT NULL,   -- ISO8601 (YYYY-MM-DD HH:MM:SS)
+        PRIMARY KEY (game_id, stock_id, settle_ts),
+        FOREIGN KEY (game_id) REFERENCES games (game_id) ON DELETE CASCADE,
+        FOREIGN KEY (stock_id) REFERENCES stocks (stock_id) ON DELETE CASCADE
+        );"""
+
+
+def _migrate_0_2_3_to_0_2_4(db_name: str) -> None:
+    """Add settlement_prices (pending buys already filled keep their values)."""
+    conn = sqlite3.connect(db_name)
+    try:
+        conn.execute(_SETTLEMENT_PRICES_TABLE)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+_VALUE_HISTORY_TABLE = """CREATE TABLE IF NOT EXISTS participant_value_history (
+        participation_id INTEGER NOT NULL,
+        game_id TEXT NOT NULL,
+        ts INTEGER NOT NULL,                 -- Epoch minute of the update cycle (see helpers/price_time.py)
+        current_value REAL NOT NULL,         -- Portfolio value
+        change_dollars REAL DEFAULT NULL,
+        change_percent REAL DEFAULT NULL,
+        resolution TEXT NOT NULL DEFAULT 'cycle', -- cycle (every update) or daily (last cycle of the day, after compaction)
+        PRIMARY KEY (participation_id, ts),
+        FOREIGN KEY (participation_id) REFERENCES game_participants (participation_id) ON DELETE CASCADE,
+        FOREIGN KEY (game_id) REFERENCES games (game_id) ON DELETE CASCADE
+        ) WITHOUT ROWID;"""
+
+
+def _migrate_0_2_4_to_0_2_5(db_name: str) -> None:
+    """Add participant_value_history, seeded with each participant's last stored value."""
+    conn = sqlite3.connect(db_name)
+    try:
+        conn.execute(_VALUE_HISTORY_TABLE)
+        conn.execute(
+            """INSERT OR IGNORE INTO participant_value_history (participation_id, game_id, ts, current_value, change_dollars, change_percent)
+            SELECT participation_id, game_id, CAST(strftime('%s', last_updated) AS INTEGER) / 60, current_value, change_dollars, change_percent
+            FROM game_participants
+            WHERE current_value IS NOT NULL AND strftime('%s', last_updated) IS NOT NULL"""
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _migrate_0_2_5_to_0_2_6(db_name: str) -> None:
+    """Add ``rank`` / ``previous_rank`` to game_participants and rank every game once."""
+    conn = sqlite3.connect(db_name)
+    try:
+        _add_missing_columns(conn, "game_participants", {"rank": "INTEGER DEFAULT NULL", "previous_rank": "INTEGER DEFAULT NULL"})
+        conn.execute(f"UPDATE game_participants SET rank = ranked.new_rank FROM ({RANKED_PARTICIPANTS}) AS ranked WHERE game_participants.participation_id = ranked.participation_id")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _migrate_0_2_6_to_0_2_7(db_name: str) -> None:
+    """Add ``career_start_money`` to users and ``results_recorded`` to games, then build career stats once."""
+    conn = sqlite3.connect(db_name)
+    try:
+        _add_missing_columns(conn, "users", {"career_start_money": "REAL NOT NULL DEFAULT 0"})
+        _add_missing_columns(conn, "games", {"results_recorded": "INTEGER NOT NULL DEFAULT 0"})
+        for statement in REBUILD_CAREER_STATS:
+            conn.execute(statement)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+_GAME_RESULTS_TABLE = """CREATE TABLE IF NOT EXISTS game_results (
+        game_id TEXT NOT NULL,
+        participation_id INTEGER NOT NULL,
+        user_id INTEGER NOT NULL,
+        status TEXT NOT NULL,
+        datetime_joined TEXT NOT NULL,          -- ISO8601 (YYYY-MM-DD HH:MM:SS)
+        current_value REAL DEFAULT NULL,        -- Final portfolio value
+        change_dollars REAL DEFAULT NULL,
+        change_percent REAL DEFAULT NULL,
+        days_in_first INTEGER NOT NULL DEFAULT 0,
+        rank INTEGER DEFAULT NULL,              -- Final rank among active players
+        previous_rank INTEGER DEFAULT NULL,
+        last_updated TEXT DEFAULT NULL,         -- ISO8601 (YYYY-MM-DD HH:MM:SS)
+        PRIMARY KEY (game_id, participation_id),
+        FOREIGN KEY (game_id) REFERENCES games (game_id) ON DELETE CASCADE
+        ) WITHOUT ROWID;"""
+
+_PICK_RESULTS_TABLE = """CREATE TABLE IF NOT EXISTS pick_results (
+        game_id TEXT NOT NULL,
+        pick_id INTEGER NOT NULL,
+        participation_id INTEGER NOT NULL,
+        user_id INTEGER NOT NULL,
+        stock_id INTEGER NOT NULL,
+        ticker TEXT NOT NULL,
+        company_name TEXT DEFAULT NULL,
+        shares REAL DEFAULT NULL,
+        start_value REAL DEFAULT NULL,
+        current_value REAL DEFAULT NULL,        -- Final value
+        change_dollars REAL DEFAULT NULL,
+        change_percent REAL DEFAULT NULL,
+        status TEXT NOT NULL,
+        datetime_created TEXT NOT NULL,         -- ISO8601 (YYYY-MM-DD HH:MM:SS)
+        last_updated TEXT DEFAULT NULL,         -- ISO8601 (YYYY-MM-DD HH:MM:SS)
+        PRIMARY KEY (game_id, pick_id),
+        FOREIGN KEY (game_id) REFERENCES games (game_id) ON DELETE CASCADE
+        ) WITHOUT ROWID;"""
+
+# Copy a game's final standings/picks into game_results/pick_results (re-running overwrites).
+# ``{scope}`` filters ``g`` (games); shared by Backend.finalize_game and the 0.2.8 migration.
+FREEZE_GAME_RESULTS = (
+    """INSERT OR REPLACE INTO game_results (game_id, participation_id, user_id, status, datetime_joined, current_value,
+        change_dollars, change_percent, days_in_first, rank, previous_rank, last_updated)
+    SELECT gp.game_id, gp.participation_id, gp.user_id, gp.status, gp.datetime_joined, gp.current_value,
+        gp.change_dollars, gp.change_percent, gp.days_in_first, gp.rank, gp.previous_rank, gp.last_updated
+    FROM game_participants gp JOIN games g ON g.game_id = gp.game_id
+    WHERE {scope}""",
+    """INSERT OR REPLACE INTO pick_results (game_id, pick_id, participation_id, user_id, stock_id, ticker, company_name,
+        shares, start_value, current_value, change_dollars, change_percent, status, datetime_created, last_updated)
+    SELECT gp.game_id, sp.pick_id, sp.participation_id, gp.user_id, sp.stock_id, s.ticker, s.company_name,
+        sp.shares, sp.start_value, sp.current_value, sp.change_dollars, sp.change_percent, sp.status, sp.datetime_created, sp.last_updated
+    FROM stock_picks sp
+    JOIN game_participants gp ON gp.participation_id = sp.participation_id
+    JOIN games g ON g.game_id = gp.game_id
+    JOIN stocks s ON s.stock_id = sp.stock_id
+    WHERE {scope}""",
+)
+
+
+def _migrate_0_2_7_to_0_2_8(db_name: str) -> None:
+    """Add game_results / pick_results and freeze every game already counted as ended."""
+    conn = sqlite3.connect(db_name)
+    try:
+        conn.execute(_GAME_RESULTS_TABLE)
+        conn.execute(_PICK_RESULTS_TABLE)
+        for statement in FREEZE_GAME_RESULTS:
+            conn.execute(statement.format(scope="g.results_recorded = 1"))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+_STOCK_PICKS_STOCK_INDEX = "CREATE INDEX IF NOT EXISTS idx_stock_picks_stock ON stock_picks(stock_id, status)"
+
+
+def _migrate_0_2_8_to_0_2_9(db_name: str) -> None:
+    """Index stock_picks by stock for the draft-mode exclusivity check."""
+    conn = sqlite3.connect(db_name)
+    try:
+        conn.execute(_STOCK_PICKS_STOCK_INDEX)
+        conn.commit()
+    finally:
+        conn.close()
+
 
 # (from_version, to_version) -> migration function that mutates ``db_name`` in place.
-# When no entry matches a version jump, :func:`ensure_database` remakes empty.
+# Steps are chained (0.2.1 -> 0.2.2 -> ...) when there is no direct entry.
+# When no path reaches the target, :func:`ensure_database` remakes empty.
 MigrationFn = Callable[[str], None]
 MIGRATIONS: dict[tuple[str, str], MigrationFn] = {
-    # Example:
-    # ("0.2.0", "0.2.1"): _migrate_0_2_0_to_0_2_1,
+    ("0.2.1", "0.2.2"): _migrate_0_2_1_to_0_2_2,
+    ("0.2.2", "0.2.3"): _migrate_0_2_2_to_0_2_3,
+    ("0.2.3", "0.2.4"): _migrate_0_2_3_to_0_2_4,
+    ("0.2.4", "0.2.5"): _migrate_0_2_4_to_0_2_5,
+    ("0.2.5", "0.2.6"): _migrate_0_2_5_to_0_2_6,
+    ("0.2.6", "0.2.7"): _migrate_0_2_6_to_0_2_7,
+    ("0.2.7", "0.2.8"): _migrate_0_2_7_to_0_2_8,
+    ("0.2.8", "0.2.9"): _migrate_0_2_8_to_0_2_9,
 }
 
 
+def _migration_path(current: str, target: str) -> list[tuple[str, str]] | None:
+    """Registered steps from ``current`` to ``target`` (direct entry preferred), or None."""
+    if (current, target) in MIGRATIONS:
+        return [(current, target)]
+    path: list[tuple[str, str]] = []
+    version = current
+    while version != target:
+        step = next((key for key in MIGRATIONS if key[0] == version), None)
+        if step is None or step in path:
+            return None
+        path.append(step)
+        version = step[1]
+    return path or None
+
+
 def _read_db_version(db_name: str) -> str | None:
     """Return ``database_info.current_version``, or None if unreadable/missing."""
     path = Path(db_name)
@@ -135,7 +438,8 @@ def ensure_database(db_name: str, *, target_version: str = db_ver) -> str:
 
     * Missing / empty file → create current schema.
     * Matching version → ensure tables exist (``CREATE IF NOT EXISTS``).
-    * Mismatch with a registered ``MIGRATIONS[(from, to)]`` entry → backup, migrate, stamp version.
+    * Mismatch with a registered ``MIGRATIONS[(from, to)]`` entry (or a chain of
+      them) → backup, migrate step by step, stamp version after each step.
     * Mismatch with no migration → backup and remake empty schema.
     """
     db_path = Path(db_name)
@@ -152,23 +456,25 @@ def ensure_database(db_name: str, *, target_version: str = db_ver) -> str:
         create(db_name, upgrade=False)
         return "unchanged"
 
-    migrator = MIGRATIONS.get((current or "", target_version))
-    if migrator is not None:
+    steps = _migration_path(current or "", target_version)
+    if steps is not None:
         old_label = (current or "unknown").replace("/", "_")
         new_label = target_version.replace("/", "_")
         backup = create_db_backup(
             db_name, kind="remake", label=f"{old_label}-to-{new_label}"
         )
         logger.info(
-            "Migrating database %s from %s → %s (backup: %s)",
+            "Migrating database %s from %s → %s in %s step(s) (backup: %s)",
             db_name,
             current,
             target_version,
+            len(steps),
             backup,
         )
-        migrator(db_name)
-        create(db_name, upgrade=False)  # pick up any new CREATE IF NOT EXISTS tables
-        _set_db_version(db_name, target_version)
+        for step in steps:
+            MIGRATIONS[step](db_name)
+            _set_db_version(db_name, step[1])
+        create(db_name, upgrade=False)  # pick up any new CREATE IF NOT EXISTS tables/indexes
         return "migrated"
 
     remake_db_on_mismatch(db_name, target_version, force=True)
@@ -178,7 +484,7 @@ def ensure_database(db_name: str, *, target_version: str = db_ver) -> str:
 def create(db_name:str, upgrade:bool=True):
     """Create database schema tables.
 
-    Version: 0.2.1
+    Version: 0.2.9
 
     Args:
         db_name (str): Database name
@@ -187,6 +493,51 @@ def create(db_name:str, upgrade:bool=True):
 
     # Changelog
 
+    ## [0.2.9] - 2026-10-19
+    ### Added
+    - ``idx_stock_picks_stock``: draft-mode picks check "is this stock taken in this game?"
+      inside the insert itself (``Backend.add_stock_pick``)
+
+    ## [0.2.8] - 2026-10-19
+    ### Added
+    - ``game_results`` / ``pick_results`` tables: final standings and picks, frozen when a game
+      is finalized. ``results_recorded`` on games now marks finalization.
+      0.2.7 → 0.2.8 freezes games already counted
+
+    ## [0.2.7] - 2026-10-19
+    ### Added
+    - ``career_start_money`` on users, ``results_recorded`` on games: ``overall_wins`` /
+      ``change_dollars`` / ``change_percent`` are now kept up to date as games end.
+      0.2.6 → 0.2.7 builds them from ended games
+
+    ## [0.2.6] - 2026-10-19
+    ### Added
+    - ``rank``, ``previous_rank`` on game_participants (set by the participant update;
+      ``previous_rank`` is the rank before the last move). 0.2.5 → 0.2.6 ranks existing games
+    - ``idx_participants_game_rank`` index
+
+    ## [0.2.5] - 2026-10-19
+    ### Added
+    - ``participant_value_history`` table: per-cycle participant values, compacted to daily rows
+      with the price retention run. 0.2.4 → 0.2.5 seeds it from ``game_participants``
+
+    ## [0.2.4] - 2026-10-19
+    ### Added
+    - ``settlement_prices`` table: one official fill price per game/stock/settlement moment
+
+    ## [0.2.3] - 2026-10-19
+    ### Changed
+    - stock_prices ``datetime`` (ISO text) replaced by ``ts`` (integer epoch minute);
+      ``UNIQUE(stock_id, ts)`` doubles as the lookup index. 0.2.2 → 0.2.3 migrates in place
+    ### Added
+    - ``idx_stock_prices_ts`` index (retention/compaction scans by age)
+
+    ## [0.2.2] - 2026-10-19
+    ### Added
+    - ``price_type`` (``raw`` / ``hourly`` / ``daily``), ``open``, ``high``, ``low`` on stock_prices
+      (``price`` is the close for downsampled rows)
+    - Chained migrations; 0.2.1 → 0.2.2 migrates in place
+
     ## [0.2.1] - 2026-08-05
     ### Removed
     - ``name`` (custom team name) column on game_participants
@@ -248,6 +599,7 @@ def create(db_name:str, upgrade:bool=True):
         overall_wins INT DEFAULT 0,                 -- First place finishes
         change_dollars REAL DEFAULT NULL,           -- Overall gain/loss in dollars
         change_percent REAL DEFAULT NULL,           -- Overall gain/loss percent
+        career_start_money REAL NOT NULL DEFAULT 0, -- Start money of every ended game counted above (change_percent base)
         permissions INT NOT NULL DEFAULT 210,       -- Store users permissions
         datetime_created TEXT NOT NULL,             -- ISO8601 (YYYY-MM-DD HH:MM:SS)
         last_updated TEXT DEFAULT NULL              -- ISO8601 (YYYY-MM-DD HH:MM:SS)
@@ -305,6 +657,7 @@ def create(db_name:str, upgrade:bool=True):
         change_dollars REAL DEFAULT NULL,
         change_percent REAL DEFAULT NULL,
         leaderboard_message_id TEXT DEFAULT NULL,             -- Comma-separated Discord message snowflakes for push page edits
+        results_recorded INTEGER NOT NULL DEFAULT 0,          -- 1 once finalized: results frozen into game_results/pick_results and added to career stats
         datetime_created TEXT NOT NULL,                       -- ISO8601 (YYYY-MM-DD HH:MM:SS)
         last_updated TEXT DEFAULT NULL,                       -- ISO8601 (YYYY-MM-DD HH:MM:SS)
         
@@ -329,17 +682,8 @@ def create(db_name:str, upgrade:bool=True):
         );""")
 
     # Stock price (current and historical) table
-    #TODO add price type (daily, hourly, etc)
-    cursor.execute("""CREATE TABLE IF NOT EXISTS stock_prices (
-        price_id INTEGER PRIMARY KEY AUTOINCREMENT,
-        stock_id INTEGER NOT NULL,
-        price REAL NOT NULL,           -- Closing price of stock
-        datetime TEXT NOT NULL,      -- ISO8601 (YYYY-MM-DD HH:MM:SS)
-        
-        FOREIGN KEY (stock_id) REFERENCES stocks (stock_id) ON DELETE CASCADE,  -- When a ticker is deleted from the main table, all references to it will also be deleted?
-        
-        UNIQUE (stock_id, datetime)                                           -- Ensure only one price per stock per day
-        );""")
+    cursor.execute(_STOCK_PRICES_TABLE.format(name="stock_prices"))
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_stock_prices_ts ON stock_prices(ts);") # Retention/compaction scans by age
 
     # Game participants table (track who is in which leagues/games)
     cursor.execute("""CREATE TABLE IF NOT EXISTS game_participants (
@@ -352,6 +696,8 @@ def create(db_name:str, upgrade:bool=True):
         change_dollars REAL DEFAULT NULL,
         change_percent REAL DEFAULT NULL,
         days_in_first INTEGER NOT NULL DEFAULT 0, -- Days ended as #1 (NYSE close snapshots)
+        rank INTEGER DEFAULT NULL,              -- Leaderboard position among active players (see Backend.update_ranks)
+        previous_rank INTEGER DEFAULT NULL,     -- Rank before the last change in position
         last_updated TEXT DEFAULT NULL,         -- ISO8601 (YYYY-MM-DD HH:MM:SS)
         
         FOREIGN KEY (user_id) REFERENCES users (user_id) ON DELETE CASCADE,
@@ -360,6 +706,8 @@ def create(db_name:str, upgrade:bool=True):
         UNIQUE (user_id, game_id) -- A user can only join a specific game once
         );""")
 
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_participants_game_rank ON game_participants(game_id, rank);") # Leaders per game
+
     # Stock picks table.  Store a users stock picks for their game(s).  Buy date not needed since game_participants join date can be used
     cursor.execute("""CREATE TABLE IF NOT EXISTS stock_picks (
         pick_id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -379,6 +727,18 @@ def create(db_name:str, upgrade:bool=True):
         
         UNIQUE (participation_id, stock_id) -- User picks a specific stock only once per game participation
         );""")
+    cursor.execute(_STOCK_PICKS_STOCK_INDEX) # Who holds a stock (draft-mode exclusivity)
+
+    # Official pending_buy fill prices (see GameLogic.update_stock_picks)
+    cursor.execute(_SETTLEMENT_PRICES_TABLE)
+
+    # Participant value over time (see GameLogic.update_participants_and_games)
+    cursor.execute(_VALUE_HISTORY_TABLE)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_value_history_game_ts ON participant_value_history(game_id, ts);") # Whole-game range reads
+
+    # Frozen results of finalized games (see Backend.finalize_game)
+    cursor.execute(_GAME_RESULTS_TABLE)
+    cursor.execute(_PICK_RESULTS_TABLE)
 
     # Idempotent "days in first" awards per NYSE trade date
     cursor.execute("""CREATE TABLE IF NOT EXISTS leaderboard_day_snapshots (
@@ -25,7 +25,7 @@ from helpers.datatype_validation import GameLeaderboard
 from helpers.views import Pagination, LeaderboardImageGenerator, StockPortfolioImageGenerator
 from helpers.leaderboard_push import (
     bot_can_push_to_channel,
-    collect_player_picks,
+    collect_game_picks,
     push_all_recurring_leaderboards,
 )
 from helpers.recurring_leaderboard_image import RecurringLeaderboardImageGenerator
@@ -40,6 +40,7 @@ from stocks import Frontend
 from helpers.exceptions import NotAllowedError, DoesntExistError, AlreadyExistsError, InvalidDateFormatError
 from helpers.sp500 import ensure_sp500_seeded
 from helpers.alpaca_client import AlpacaMarketData
+from helpers.alpaca_stream import AlpacaPriceStream, DEFAULT_FLUSH_INTERVAL
 from db_schema import ensure_database, db_ver
 
 
@@ -424,6 +425,41 @@ async def _seed_sp500_on_startup() -> None:
         logger.exception('S&P 500 startup seed failed; continuing without blocking the bot')
 
 
+_price_stream: Optional[AlpacaPriceStream] = None
+
+
+async def _on_stream_flush(tickers: list[str]) -> None:
+    """Refresh realtime/minute games holding freshly streamed tickers."""
+    if _game_update_lock.locked():
+        return  # The full update cycle will pick these prices up.
+    async with _game_update_lock:
+        game_ids = await asyncio.to_thread(fe.gl.update_streamed_games, tickers)
+    if game_ids:
+        invalidate_leaderboard_cache(game_ids)
+
+
+async def _start_price_stream() -> None:
+    """Stream trades for realtime/minute games when ALPACA_STREAM_ENABLED is set."""
+    global _price_stream
+    if _price_stream is not None:
+        return  # on_ready fires again after reconnects
+    if os.getenv('ALPACA_STREAM_ENABLED', '').strip().lower() not in ('1', 'true', 'yes', 'on'):
+        return
+    try:
+        flush_interval = float(os.getenv('ALPACA_STREAM_FLUSH_SECONDS', DEFAULT_FLUSH_INTERVAL))
+        _price_stream = AlpacaPriceStream(fe.be, flush_interval=flush_interval, on_flush=_on_stream_flush)
+    except ValueError:
+        logger.exception('Invalid ALPACA_STREAM_FLUSH_SECONDS; price stream disabled')
+        return
+    if not _price_stream.configured:
+        logger.warning('Skipping price stream: Alpaca credentials not configured.')
+        return
+    try:
+        await _price_stream.run()
+    except Exception:
+        logger.exception('Price stream stopped unexpectedly')
+
+
 # Event: Called when the bot is ready and connected to Discord
 @bot.event
 async def on_ready():
@@ -445,6 +481,7 @@ async def on_ready():
         scheduled_game_update.start()
     # Keep the equity universe current without delaying command sync.
     asyncio.create_task(_seed_sp500_on_startup())
+    asyncio.create_task(_start_price_stream())
     try:
         # Sync commands globally
         synced = await bot.tree.sync()
@@ -2088,13 +2125,12 @@ async def buy_stock(
     title = 'Stock Purchase Failed'
     try:
         ticker = ticker.upper()
-        await asyncio.to_thread(
+        remaining, total = await asyncio.to_thread(
             fe.buy_stock,
             user_id=interaction.user.id,
             game_id=game_id,
             ticker=ticker,
         )
-        remaining, total = fe.pick_capacity(interaction.user.id, game_id)
         title = 'Stock Purchased'
         description = f'Added {ticker} to game #{game_id}. {remaining} of {total} picks remaining.'
         status = 'success'
@@ -2433,11 +2469,14 @@ def _cached_game_info_leaderboard_png(
 
 async def _build_rank_page(
     game,
-    leaderboard: list[GameLeaderboard],
+    leaderboard: Optional[list[GameLeaderboard]],
     guild: discord.Guild | None,
     page_index: int,
 ) -> dict:
-    """Render one requested rank page, or reuse its cached PNG."""
+    """Render one requested rank page, or reuse its cached PNG.
+
+    With ``leaderboard=None`` only this page's rows are loaded.
+    """
     recurring = getattr(game, "template_id", None) is not None
     page_size = (
         _RECURRING_LEADERBOARD_RANK_PAGE_SIZE
@@ -2445,7 +2484,11 @@ async def _build_rank_page(
         else _LEADERBOARD_RANK_PAGE_SIZE
     )
     start = page_index * page_size
-    entries = leaderboard[start : start + page_size]
+    if leaderboard is None:
+        info = await asyncio.to_thread(fe.game_info, game.id, True, page_size, start)
+        entries = info.leaderboard or []
+    else:
+        entries = leaderboard[start : start + page_size]
     rank_start = start + 1 if entries else 0
     rank_end = start + len(entries) if entries else 0
     filename = f"leaderboard_{game.id}_{page_index + 1}.png"
@@ -2460,10 +2503,19 @@ async def _build_rank_page(
             "rank_end": rank_end,
         }
 
+    page_picks: dict[int, list[dict]] = {}
+    if recurring and entries:
+        page_picks = await asyncio.to_thread(
+            collect_game_picks,
+            fe,
+            game,
+            [entry.participation_id for entry in entries if entry.participation_id is not None],
+        )
     processed: list[dict] = []
-    for rank, entry in enumerate(entries, start=rank_start):
+    for entry in entries:
         row = {
-            "rank": rank,
+            "rank": getattr(entry, "rank", None),  # Stored rank; None (pending/inactive) renders as a placeholder
+            "previous_rank": getattr(entry, "previous_rank", None),
             "user_id": entry.user_id,
             "display_name": await resolve_player_name(entry.user_id, guild),
             "current_value": entry.current_value,
@@ -2474,9 +2526,7 @@ async def _build_rank_page(
         }
         if recurring:
             row["days_in_first"] = getattr(entry, "days_in_first", 0) or 0
-            row["picks"] = (
-                await asyncio.to_thread(collect_player_picks, fe, game.id, entry.user_id) or []
-            )
+            row["picks"] = page_picks.get(entry.participation_id or 0, [])
         processed.append(row)
     game_data = {
         "name": game.name,
@@ -2504,13 +2554,17 @@ async def _build_rank_page(
 
 def _leaderboard_game_data(
     game,
-    leaderboard: list[GameLeaderboard],
+    leaderboard: Optional[list[GameLeaderboard]],
     *,
     title: str | None = None,
     description: str | None = None,
     embed: discord.Embed | None = None,
+    leaderboard_size: Optional[int] = None,
 ) -> dict:
-    """Create a lazy game descriptor without rendering any images."""
+    """Create a lazy game descriptor without rendering any images.
+
+    Pass ``leaderboard=None`` and ``leaderboard_size`` to load each rank page's rows on demand.
+    """
     page_size = (
         _RECURRING_LEADERBOARD_RANK_PAGE_SIZE
         if getattr(game, "template_id", None) is not None
@@ -2524,7 +2578,7 @@ def _leaderboard_game_data(
         "embed": embed,
         "rank_page_count": max(
             1,
-            (len(leaderboard) + page_size - 1) // page_size,
+            ((len(leaderboard) if leaderboard is not None else leaderboard_size or 0) + page_size - 1) // page_size,
         ),
         "rank_pages": {},
     }
@@ -2703,11 +2757,12 @@ async def leaderboard_cmd(
             if game_id
             else "You're not on the board yet."
         )
-        for i, entry in enumerate(leaderboard, start=1):
+        for entry in leaderboard:
             if entry.user_id == user_id:
                 d_chg = float(entry.change_dollars or 0)
                 p_chg = float(entry.change_percent or 0)
-                rank_desc = f"Your rank: **#{i}** · ${d_chg:+,.2f} ({p_chg:+.2f}%)"
+                place = f"**#{entry.rank}**" if entry.rank else "not ranked yet"  # Stored rank, not list position
+                rank_desc = f"Your rank: {place} · ${d_chg:+,.2f} ({p_chg:+.2f}%)"
                 break
         games.append(
             _leaderboard_game_data(
@@ -2840,11 +2895,12 @@ async def my_stocks(
         game = info.game
         rank_line = "Not ranked yet"
         if info.leaderboard:
-            for i, entry in enumerate(info.leaderboard, start=1):
+            for entry in info.leaderboard:
                 if entry.user_id == user_id:
                     d_chg = float(entry.change_dollars or 0)
                     p_chg = float(entry.change_percent or 0)
-                    rank_line = f"**#{i}** · ${d_chg:+,.2f} ({p_chg:+.2f}%)"
+                    place = f"**#{entry.rank}**" if entry.rank else "Not ranked yet"  # Stored rank, not list position
+                    rank_line = f"{place} · ${d_chg:+,.2f} ({p_chg:+.2f}%)"
                     break
 
         status_label = game.status
@@ -2923,7 +2979,7 @@ async def game_info(
     await interaction.response.defer(ephemeral=ephemeral_test)
 
     try:
-        game_info_obj = await asyncio.to_thread(fe.game_info, game_id, True)
+        game_info_obj = await asyncio.to_thread(fe.game_info, game_id, True, 0) # Size only; pages load their own rows
         game = game_info_obj.game
         if not await asyncio.to_thread(_user_can_view_game_info, game, interaction.user.id):
             await interaction.followup.send(
@@ -2935,14 +2991,15 @@ async def game_info(
                 ephemeral=ephemeral_test,
             )
             return
-        leaderboard = game_info_obj.leaderboard or []
+        player_count = game_info_obj.leaderboard_size or 0
         view = UserLeaderboardView(
             interaction,
             [
                 _leaderboard_game_data(
                     game,
-                    leaderboard,
-                    embed=_game_info_embed(game, len(leaderboard)),
+                    None,
+                    embed=_game_info_embed(game, player_count),
+                    leaderboard_size=player_count,
                 )
             ],
             show_game_controls=False,
@@ -2,10 +2,14 @@
 
 from __future__ import annotations
 
+import json
 import logging
 import os
+import random
+import re
+import threading
 import time
-from typing import Any, Optional
+from typing import Any, Iterator, Optional
 from urllib.parse import quote
 
 import requests
@@ -16,6 +20,14 @@ DATA_BASE = "https://data.alpaca.markets/v2"
 DEFAULT_TRADING_BASE = "https://paper-api.alpaca.markets"
 BATCH_SIZE = 100
 SLEEP_BETWEEN_BATCHES = 0.35  # ~170 req/min max, under free-tier 200/min
+BARS_PAGE_LIMIT = 10000  # Alpaca max bars per page (shared across the symbols in a request)
+_TIMEFRAME_RE = re.compile(r"^\d+(Min|Hour|Day|Week|Month)$")
+MAX_REQUEST_ATTEMPTS = 4  # per _get call, including the first try
+BACKOFF_BASE = 1.0  # seconds; doubled per attempt, with jitter
+BACKOFF_CAP = 30.0
+MAX_RATE_LIMIT_WAIT = 60.0  # never sleep longer than this for Retry-After / X-RateLimit-Reset
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RESET_TIMEOUT = 60.0  # seconds open before a half-open probe is allowed
 
 
 def to_alpaca_symbol(ticker: str) -> str:
@@ -28,22 +40,150 @@ def to_db_ticker(ticker: str) -> str:
     return ticker.strip().upper().replace(".", "-")
 
 
-def price_from_snapshot(snap: dict[str, Any]) -> Optional[float]:
+def price_and_source_from_snapshot(snap: dict[str, Any]) -> tuple[Optional[float], Optional[str]]:
+    """Best price in a snapshot and where it came from: ``trade``, ``quote`` or ``bar``."""
     trade = snap.get("latestTrade") or {}
     if trade.get("p") is not None:
-        return float(trade["p"])
+        return float(trade["p"]), "trade"
     quote = snap.get("latestQuote") or {}
     ap, bp = quote.get("ap"), quote.get("bp")
     if ap is not None and bp is not None and float(ap) > 0 and float(bp) > 0:
-        return (float(ap) + float(bp)) / 2
+        return (float(ap) + float(bp)) / 2, "quote"
     if ap is not None and float(ap) > 0:
-        return float(ap)
+        return float(ap), "quote"
     if bp is not None and float(bp) > 0:
-        return float(bp)
+        return float(bp), "quote"
     bar = snap.get("dailyBar") or snap.get("prevDailyBar") or {}
     if bar.get("c") is not None:
-        return float(bar["c"])
-    return None
+        return float(bar["c"]), "bar"
+    return None, None
+
+
+def price_from_snapshot(snap: dict[str, Any]) -> Optional[float]:
+    return price_and_source_from_snapshot(snap)[0]
+
+
+# Fields kept by the compact snapshot parser. Everything else (conditions,
+# exchange codes, sizes, VWAP, trade counts, ...) is dropped as it is decoded.
+_BAR_FIELDS = ("t", "o", "h", "l", "c", "v")
+
+
+def _compact_object_hook(include_bars: bool):
+    """``json`` object hook that trims trades, quotes, bars and snapshots to the fields we read.
+
+    Objects are decoded innermost first, so each trade/quote/bar is reduced
+    before its snapshot is built and the full tree is never held at once.
+    """
+
+    def hook(obj: dict[str, Any]) -> dict[str, Any]:
+        if "p" in obj:  # trade
+            return {"p": obj["p"]}
+        if "ap" in obj or "bp" in obj:  # quote
+            return {"ap": obj.get("ap"), "bp": obj.get("bp")}
+        if "o" in obj and "c" in obj:  # bar
+            if include_bars:
+                return {key: obj.get(key) for key in _BAR_FIELDS}
+            return {"c": obj["c"]}
+        if not include_bars:
+            obj.pop("minuteBar", None)  # snapshot (no-op for the symbol map)
+        return obj
+
+    return hook
+
+
+def parse_snapshots(body: bytes | str, *, include_bars: bool = False) -> dict[str, Any]:
+    """Decode a ``/stocks/snapshots`` body keeping only what ``price_from_snapshot`` needs.
+
+    With ``include_bars`` the minute/daily/previous-daily bars keep their
+    ``t``/``o``/``h``/``l``/``c``/``v`` fields for history writes.
+    """
+    data = json.loads(body, object_hook=_compact_object_hook(include_bars))
+    return data if isinstance(data, dict) else {}
+
+
+def backoff_delay(attempt: int, *, base: float = BACKOFF_BASE, cap: float = BACKOFF_CAP) -> float:
+    """Exponential backoff with jitter: somewhere in [half, full] of ``base * 2**(attempt-1)``, capped."""
+    ceiling = min(cap, base * (2 ** max(attempt - 1, 0)))
+    return random.uniform(ceiling / 2, ceiling)
+
+
+class CircuitOpenError(RuntimeError):
+    """Alpaca calls are short-circuited after repeated failures."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker.
+
+    ``closed`` passes every call. After ``failure_threshold`` consecutive
+    failures it goes ``open`` and rejects calls for ``reset_timeout`` seconds,
+    then ``half_open`` lets a single probe through: success closes the circuit,
+    failure re-opens it for another timeout.
+
+    Thread-safe: one client is shared by ``asyncio.to_thread`` workers and the
+    backfill, so the counters are only changed under a lock.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        reset_timeout: float = BREAKER_RESET_TIMEOUT,
+        clock=time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def _state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if self._clock() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def allow(self) -> bool:
+        """True if a request may go out now (claims the probe slot when half-open)."""
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    @property
+    def probing(self) -> bool:
+        return self._probing
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.opened_at is not None:
+                logger.info("Alpaca circuit closed after successful probe")
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._probing or self.failures >= self.failure_threshold:
+                if self.opened_at is None or self._probing:
+                    logger.error(
+                        "Alpaca circuit open after %s consecutive failure(s); pausing calls for %.0fs",
+                        self.failures,
+                        self.reset_timeout,
+                    )
+                self.opened_at = self._clock()
+            self._probing = False
 
 
 class AlpacaMarketData:
@@ -54,6 +194,7 @@ class AlpacaMarketData:
         api_key: Optional[str] = None,
         secret_key: Optional[str] = None,
         trading_base: Optional[str] = None,
+        data_base: Optional[str] = None,
     ):
         self.api_key = (api_key if api_key is not None else os.getenv("ALPACA_API_KEY", "")).strip()
         self.secret_key = (
@@ -65,6 +206,11 @@ class AlpacaMarketData:
             else os.getenv("ALPACA_BASE_URL", DEFAULT_TRADING_BASE)
         )
         self.trading_base = (base or DEFAULT_TRADING_BASE).rstrip("/")
+        data = data_base if data_base is not None else os.getenv("ALPACA_DATA_URL", DATA_BASE)
+        self.data_base = (data or DATA_BASE).rstrip("/")
+        self.breaker = CircuitBreaker()
+        self.last_price_sources: dict[str, str] = {}  # db_ticker -> trade / quote / bar, from get_latest_prices
+        self._rate_limit_resume_at = 0.0  # time.time() before which requests should wait
         self._session = requests.Session()
         self._session.headers.update(
             {
@@ -83,13 +229,82 @@ class AlpacaMarketData:
             raise RuntimeError("Alpaca credentials missing (ALPACA_API_KEY / ALPACA_SECRET_KEY)")
 
     def _get(self, url: str, params: Optional[dict] = None) -> requests.Response:
-        r = self._session.get(url, params=params, timeout=30)
-        if r.status_code == 429:
-            retry = float(r.headers.get("Retry-After", "5"))
-            logger.warning("Alpaca rate limited; sleeping %.0fs", retry)
-            time.sleep(retry)
-            r = self._session.get(url, params=params, timeout=30)
-        return r
+        """GET with rate-limit awareness, jittered retries and the circuit breaker.
+
+        429s wait for ``Retry-After`` (or ``X-RateLimit-Reset``); 5xx and network
+        errors back off exponentially and each one counts towards the breaker,
+        so retrying stops as soon as it opens. Other responses (including 4xx)
+        are returned for the caller to handle. A half-open probe gets one attempt.
+
+        Raises:
+            CircuitOpenError: The breaker is open; no request was sent.
+            requests.RequestException: Network failure on the last attempt.
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError("Alpaca circuit open; skipping request")
+        attempts = 1 if self.breaker.probing else MAX_REQUEST_ATTEMPTS
+        for attempt in range(1, attempts + 1):
+            self._wait_for_rate_limit()
+            try:
+                r = self._session.get(url, params=params, timeout=30)
+            except requests.RequestException:
+                self.breaker.record_failure()  # Every failed attempt counts, so an outage trips the breaker quickly
+                if attempt == attempts or self.breaker.state != "closed":
+                    raise
+                delay = backoff_delay(attempt)
+                logger.warning("Alpaca request failed (attempt %s/%s); retrying in %.1fs", attempt, attempts, delay)
+                time.sleep(delay)
+                continue
+
+            self._note_rate_limit(r)
+            if r.status_code != 429 and r.status_code < 500:
+                self.breaker.record_success()
+                return r
+            if r.status_code >= 500 or attempt == attempts:  # A 429 only counts once its retries run out
+                self.breaker.record_failure()
+            if attempt == attempts or self.breaker.state != "closed":
+                return r
+            if r.status_code == 429:
+                delay = self._retry_after(r) or backoff_delay(attempt)
+                logger.warning("Alpaca rate limited; sleeping %.1fs", delay)
+            else:
+                delay = backoff_delay(attempt)
+                logger.warning(
+                    "Alpaca returned %s (attempt %s/%s); retrying in %.1fs", r.status_code, attempt, attempts, delay
+                )
+            time.sleep(delay)
+        raise AssertionError("unreachable")  # pragma: no cover
+
+    @staticmethod
+    def _header_float(r: requests.Response, name: str) -> Optional[float]:
+        try:
+            return float(r.headers[name])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def _retry_after(self, r: requests.Response) -> Optional[float]:
+        """Seconds to wait after a 429, from ``Retry-After`` or ``X-RateLimit-Reset``."""
+        retry = self._header_float(r, "Retry-After")
+        if retry is None:
+            reset = self._header_float(r, "X-RateLimit-Reset")
+            retry = reset - time.time() if reset is not None else None
+        if retry is None:
+            return None
+        return min(max(retry, 0.0), MAX_RATE_LIMIT_WAIT)
+
+    def _note_rate_limit(self, r: requests.Response) -> None:
+        """Remember when the window resets if this response used the last request in it."""
+        remaining = self._header_float(r, "X-RateLimit-Remaining")
+        reset = self._header_float(r, "X-RateLimit-Reset")
+        if remaining is not None and remaining <= 0 and reset is not None:
+            self._rate_limit_resume_at = min(reset, time.time() + MAX_RATE_LIMIT_WAIT)
+
+    def _wait_for_rate_limit(self) -> None:
+        wait = self._rate_limit_resume_at - time.time()
+        if wait > 0:
+            logger.info("Alpaca rate limit window exhausted; waiting %.1fs for reset", wait)
+            time.sleep(wait)
+        self._rate_limit_resume_at = 0.0
 
     def is_market_open(self) -> Optional[bool]:
         """Return True/False from Alpaca clock, or None if the call fails."""
@@ -111,6 +326,7 @@ class AlpacaMarketData:
             LookupError: Symbol not found.
             ValueError: Not an active tradable US equity (e.g. crypto).
             RuntimeError: Missing credentials or trading API unauthorized/unavailable.
+            CircuitOpenError: Alpaca circuit is open after repeated failures; no request was sent.
         """
         self._require_configured()
         symbol = to_alpaca_symbol(ticker)
@@ -141,13 +357,22 @@ class AlpacaMarketData:
         prices = self.get_latest_prices([to_db_ticker(ticker)])
         return to_db_ticker(ticker) in prices
 
-    def fetch_snapshots(self, symbols: list[str]) -> dict[str, Any]:
-        """Fetch IEX snapshots for a batch of Alpaca symbols."""
+    def fetch_snapshots(
+        self, symbols: list[str], *, include_bars: bool = False, compact: bool = True
+    ) -> dict[str, Any]:
+        """Fetch IEX snapshots for a batch of Alpaca symbols.
+
+        By default the body is parsed with ``parse_snapshots`` so only the price
+        fields survive; pass ``include_bars`` to keep OHLCV bars, or
+        ``compact=False`` for Alpaca's full payload.
+        """
         if not symbols:
             return {}
         params = {"symbols": ",".join(symbols), "feed": "iex"}
-        r = self._get(f"{DATA_BASE}/stocks/snapshots", params=params)
+        r = self._get(f"{self.data_base}/stocks/snapshots", params=params)
         r.raise_for_status()
+        if compact:
+            return parse_snapshots(r.content, include_bars=include_bars)
         data = r.json()
         return data if isinstance(data, dict) else {}
 
@@ -158,8 +383,13 @@ class AlpacaMarketData:
         Batches requests under free-tier limits. Failed batches are retried, then
         any still-missing symbols are fetched individually so a single bad
         response cannot drop the rest of the universe.
+
+        The source of each price (``trade``, ``quote`` or ``bar``) is kept in
+        ``last_price_sources`` until the next call.
         """
         self._require_configured()
+        sources: dict[str, str] = {}
+        self.last_price_sources = sources
         if not tickers:
             return {}
 
@@ -178,17 +408,21 @@ class AlpacaMarketData:
 
         for i in range(0, len(ordered_alpaca), BATCH_SIZE):
             batch = ordered_alpaca[i : i + BATCH_SIZE]
+            if self.breaker.state == "open":
+                unresolved.extend(ordered_alpaca[i:])
+                break
             data = self._fetch_snapshots_with_retries(batch, attempts=3)
             if data is None:
                 unresolved.extend(batch)
             else:
                 for alpaca_sym in batch:
                     snap = data.get(alpaca_sym)
-                    price = price_from_snapshot(snap) if isinstance(snap, dict) else None
+                    price, source = price_and_source_from_snapshot(snap) if isinstance(snap, dict) else (None, None)
                     if price is None:
                         unresolved.append(alpaca_sym)
                     else:
                         prices[alpaca_to_db[alpaca_sym]] = price
+                        sources[alpaca_to_db[alpaca_sym]] = str(source)
 
             if i + BATCH_SIZE < len(ordered_alpaca):
                 time.sleep(SLEEP_BETWEEN_BATCHES)
@@ -198,22 +432,27 @@ class AlpacaMarketData:
         for alpaca_sym in unresolved:
             if alpaca_to_db[alpaca_sym] in prices:
                 continue
+            if self.breaker.state == "open":
+                still_missing.append(alpaca_sym)
+                continue
             data = self._fetch_snapshots_with_retries([alpaca_sym], attempts=3)
             if data is None:
                 still_missing.append(alpaca_sym)
                 continue
             snap = data.get(alpaca_sym)
-            price = price_from_snapshot(snap) if isinstance(snap, dict) else None
+            price, source = price_and_source_from_snapshot(snap) if isinstance(snap, dict) else (None, None)
             if price is None:
                 still_missing.append(alpaca_sym)
             else:
                 prices[alpaca_to_db[alpaca_sym]] = price
+                sources[alpaca_to_db[alpaca_sym]] = str(source)
             time.sleep(SLEEP_BETWEEN_BATCHES)
 
         if still_missing:
             missing_db = [alpaca_to_db[s] for s in still_missing]
             logger.error(
-                "Alpaca price fetch incomplete after retries: %s/%s tickers missing: %s",
+                "Alpaca price fetch incomplete after retries%s: %s/%s tickers missing: %s",
+                " (circuit open)" if self.breaker.state == "open" else "",
                 len(missing_db),
                 len(ordered_alpaca),
                 ", ".join(missing_db[:50]) + ("..." if len(missing_db) > 50 else ""),
@@ -229,6 +468,8 @@ class AlpacaMarketData:
         for attempt in range(1, attempts + 1):
             try:
                 return self.fetch_snapshots(symbols)
+            except CircuitOpenError:
+                return None  # Outage: don't burn retries, the caller reports what's missing
             except Exception as exc:
                 last_exc = exc
                 logger.warning(
@@ -238,7 +479,8 @@ class AlpacaMarketData:
                     len(symbols),
                     exc,
                 )
-                time.sleep(SLEEP_BETWEEN_BATCHES * attempt)
+                if attempt < attempts:
+                    time.sleep(backoff_delay(attempt, base=SLEEP_BETWEEN_BATCHES))
         if last_exc is not None:
             logger.exception(
                 "Alpaca snapshot fetch exhausted retries for %s symbol(s)",
@@ -246,3 +488,80 @@ class AlpacaMarketData:
                 exc_info=last_exc,
             )
         return None
+
+    def fetch_bars(
+        self,
+        symbols: list[str],
+        start: str,
+        end: str,
+        *,
+        timeframe: str = "1Day",
+        page_token: Optional[str] = None,
+    ) -> tuple[dict[str, list[dict[str, Any]]], Optional[str]]:
+        """Fetch one page of IEX historical bars for a batch of Alpaca symbols.
+
+        Returns ``({symbol: [bar, ...]}, next_page_token)``. Bars use Alpaca's
+        short keys (``t``, ``o``, ``h``, ``l``, ``c``, ``v``).
+        """
+        if not symbols:
+            return {}, None
+        if not _TIMEFRAME_RE.match(timeframe):
+            raise ValueError(f"Invalid bar timeframe {timeframe!r}")
+        params = {
+            "symbols": ",".join(symbols),
+            "timeframe": timeframe,
+            "start": start,
+            "end": end,
+            "limit": BARS_PAGE_LIMIT,
+            "adjustment": "raw",
+            "feed": "iex",
+            "sort": "asc",
+        }
+        if page_token:
+            params["page_token"] = page_token
+        r = self._get(f"{self.data_base}/stocks/bars", params=params)
+        r.raise_for_status()
+        data = r.json()
+        if not isinstance(data, dict):
+            return {}, None
+        bars = data.get("bars") or {}
+        return (bars if isinstance(bars, dict) else {}), data.get("next_page_token") or None
+
+    def iter_bars(
+        self,
+        tickers: list[str],
+        start: str,
+        end: str,
+        *,
+        timeframe: str = "1Day",
+    ) -> Iterator[tuple[str, list[dict[str, Any]]]]:
+        """
+        Yield ``(db_ticker, bars)`` pages for every requested ticker.
+
+        Symbols are requested ``BATCH_SIZE`` at a time and each batch is paged
+        through ``next_page_token``, sleeping between requests to stay under the
+        free-tier rate limit. A ticker may be yielded more than once when its
+        bars span several pages; callers should treat each page as a chunk.
+        """
+        self._require_configured()
+        alpaca_to_db: dict[str, str] = {}
+        for ticker in tickers:
+            alpaca_to_db.setdefault(to_alpaca_symbol(ticker), ticker)
+        ordered_alpaca = list(alpaca_to_db)
+
+        first_request = True
+        for i in range(0, len(ordered_alpaca), BATCH_SIZE):
+            batch = ordered_alpaca[i : i + BATCH_SIZE]
+            page_token: Optional[str] = None
+            while True:
+                if not first_request:
+                    time.sleep(SLEEP_BETWEEN_BATCHES)
+                first_request = False
+                bars, page_token = self.fetch_bars(
+                    batch, start, end, timeframe=timeframe, page_token=page_token
+                )
+                for alpaca_sym, symbol_bars in bars.items():
+                    if alpaca_sym in alpaca_to_db and symbol_bars:
+                        yield alpaca_to_db[alpaca_sym], symbol_bars
+                if not page_token:
+                    break
@@ -0,0 +1,252 @@
+"""Alpaca websocket trade stream for ``realtime`` / ``minute`` games.
+
+Polling snapshots every 15 minutes is fine for daily games but far too slow
+for games that advertise realtime updates. This keeps one websocket open to
+Alpaca's IEX stream, subscribes to the tickers currently held in those games,
+and coalesces trades to the last price per ticker per minute. A flush task
+writes the coalesced prices in one statement every ``flush_interval`` seconds
+and then hands the flushed tickers to ``on_flush`` (the bot refreshes the
+affected games there).
+
+Backpressure: the socket reader feeds a bounded queue. When the consumer falls
+behind, ``put`` blocks, the reader stops draining the socket and TCP flow
+control pushes back on the server instead of buffering without limit. Flushes
+run while ticks keep coalescing, so memory is bounded by held tickers × minutes
+per flush window.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+from typing import Any, Awaitable, Callable, Optional
+
+import aiohttp
+
+from helpers.alpaca_client import to_alpaca_symbol, to_db_ticker
+from helpers.price_backfill import bar_datetime
+
+logger = logging.getLogger("AlpacaPriceStream")
+
+STREAM_URL = "wss://stream.data.alpaca.markets/v2/iex"
+DEFAULT_FLUSH_INTERVAL = 5.0  # seconds between writes to stock_prices
+DEFAULT_REFRESH_INTERVAL = 60.0  # seconds between subscription re-syncs
+DEFAULT_QUEUE_SIZE = 10000
+MAX_RECONNECT_DELAY = 300.0
+
+
+class StreamError(RuntimeError):
+    """The stream rejected the connection (bad auth, connection limit, etc.)."""
+
+
+class AlpacaPriceStream:
+    """Stream trades for held tickers into ``stock_prices``.
+
+    Args:
+        be: Backend used for ``get_stream_holdings`` and ``add_many_stock_prices``.
+        api_key / secret_key: Alpaca credentials (default: env).
+        url: Stream endpoint (default: ``ALPACA_STREAM_URL`` or the IEX feed).
+        flush_interval: Seconds between price writes.
+        refresh_interval: Seconds between subscription re-syncs against the DB.
+        queue_size: Max raw trades buffered between the socket and the coalescer.
+        on_flush: Awaited with the sorted DB tickers written by each flush.
+    """
+
+    def __init__(
+        self,
+        be: Any,
+        *,
+        api_key: Optional[str] = None,
+        secret_key: Optional[str] = None,
+        url: Optional[str] = None,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        refresh_interval: float = DEFAULT_REFRESH_INTERVAL,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        on_flush: Optional[Callable[[list[str]], Awaitable[None]]] = None,
+    ):
+        if flush_interval <= 0 or refresh_interval <= 0:
+            raise ValueError("`flush_interval` and `refresh_interval` must be positive.")
+        self.be = be
+        self.api_key = (api_key if api_key is not None else os.getenv("ALPACA_API_KEY", "")).strip()
+        self.secret_key = (
+            secret_key if secret_key is not None else os.getenv("ALPACA_SECRET_KEY", "")
+        ).strip()
+        self.url = url or os.getenv("ALPACA_STREAM_URL") or STREAM_URL
+        self.flush_interval = flush_interval
+        self.refresh_interval = refresh_interval
+        self.on_flush = on_flush
+        self._queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(maxsize=queue_size)
+        self._pending: dict[tuple[str, str], float] = {}  # (db ticker, minute) -> last price
+        self._stock_ids: dict[str, int] = {}
+        self._subscribed: set[str] = set()  # Alpaca symbols
+        self._stopping = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self.stats = {"trades": 0, "rows": 0, "flushes": 0, "reconnects": 0}
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.api_key and self.secret_key)
+
+    @property
+    def subscribed(self) -> set[str]:
+        """Alpaca symbols the server has confirmed."""
+        return set(self._subscribed)
+
+    async def run(self) -> None:
+        """Stream until ``stop``; reconnects with exponential backoff on errors."""
+        if not self.configured:
+            raise RuntimeError("Alpaca credentials missing (ALPACA_API_KEY / ALPACA_SECRET_KEY)")
+        delay = 1.0
+        while not self._stopping.is_set():
+            try:
+                await self.run_once()
+                delay = 1.0
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Alpaca price stream dropped; reconnecting in %.0fs", delay)
+            if self._stopping.is_set():
+                break
+            self.stats["reconnects"] += 1
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+            delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+    async def stop(self) -> None:
+        """Close the connection after writing anything still pending."""
+        self._stopping.set()
+
+    async def run_once(self) -> None:
+        """Hold a single connection until it closes or ``stop`` is called.
+
+        Raises:
+            StreamError: Authentication or subscription was rejected.
+        """
+        self._subscribed.clear()
+        async with aiohttp.ClientSession() as session:
+            async with session.ws_connect(self.url, heartbeat=30) as ws:
+                await self._authenticate(ws)
+                await self.sync_subscriptions(ws)
+                tasks = [
+                    asyncio.create_task(self._reader(ws)),
+                    asyncio.create_task(self._consumer()),
+                    asyncio.create_task(self._flusher()),
+                    asyncio.create_task(self._refresher(ws)),
+                    asyncio.create_task(self._stopping.wait()),
+                ]
+                try:
+                    done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    for task in tasks:
+                        task.cancel()
+                    await asyncio.gather(*tasks, return_exceptions=True)
+                self._drain_queue()
+                await self.flush()
+                for task in done:
+                    if not task.cancelled() and task.exception() is not None:
+                        raise task.exception()  # type: ignore[misc]
+
+    async def _authenticate(self, ws: aiohttp.ClientWebSocketResponse) -> None:
+        await self._expect(ws, "connected")
+        await ws.send_json({"action": "auth", "key": self.api_key, "secret": self.secret_key})
+        await self._expect(ws, "authenticated")
+        logger.info("Alpaca price stream authenticated (%s)", self.url)
+
+    async def _expect(self, ws: aiohttp.ClientWebSocketResponse, success_msg: str) -> None:
+        msg = await ws.receive(timeout=30)
+        if msg.type != aiohttp.WSMsgType.TEXT:
+            raise StreamError(f"Stream closed while waiting for {success_msg!r}")
+        for event in json.loads(msg.data):
+            if event.get("T") == "error":
+                raise StreamError(f"Stream error {event.get('code')}: {event.get('msg')}")
+            if event.get("T") == "success" and event.get("msg") == success_msg:
+                return
+        raise StreamError(f"Unexpected stream reply while waiting for {success_msg!r}: {msg.data}")
+
+    def _wanted_symbols(self) -> set[str]:
+        """Load held tickers (and their stock IDs) from the DB; runs in a worker thread."""
+        holdings = self.be.get_stream_holdings()
+        self._stock_ids = {to_db_ticker(str(row["ticker"])): int(row["stock_id"]) for row in holdings}
+        return {to_alpaca_symbol(ticker) for ticker in self._stock_ids}
+
+    async def sync_subscriptions(self, ws: aiohttp.ClientWebSocketResponse) -> None:
+        """Subscribe to newly held tickers and drop the ones nobody holds anymore."""
+        wanted = await asyncio.to_thread(self._wanted_symbols)
+        added = sorted(wanted - self._subscribed)
+        removed = sorted(self._subscribed - wanted)
+        if added:
+            await ws.send_json({"action": "subscribe", "trades": added})
+        if removed:
+            await ws.send_json({"action": "unsubscribe", "trades": removed})
+        if added or removed:
+            logger.info("Price stream subscriptions: +%s -%s (%s wanted)", len(added), len(removed), len(wanted))
+
+    async def _reader(self, ws: aiohttp.ClientWebSocketResponse) -> None:
+        async for msg in ws:
+            if msg.type != aiohttp.WSMsgType.TEXT:
+                if msg.type == aiohttp.WSMsgType.ERROR:
+                    raise StreamError(f"Stream socket error: {ws.exception()}")
+                continue
+            for event in json.loads(msg.data):
+                kind = event.get("T")
+                if kind == "t":
+                    await self._queue.put(event)  # blocks when full: backpressure
+                elif kind == "subscription":
+                    self._subscribed = {str(s) for s in event.get("trades") or []}
+                elif kind == "error":
+                    logger.error("Price stream error %s: %s", event.get("code"), event.get("msg"))
+        raise StreamError("Stream closed by server")
+
+    async def _consumer(self) -> None:
+        while True:
+            self.coalesce(await self._queue.get())
+
+    def _drain_queue(self) -> None:
+        while not self._queue.empty():
+            self.coalesce(self._queue.get_nowait())
+
+    def coalesce(self, trade: dict[str, Any]) -> None:
+        """Keep only the latest trade price per ticker per minute."""
+        symbol, price, stamp = trade.get("S"), trade.get("p"), trade.get("t")
+        if not symbol or price is None or not stamp:
+            return
+        self.stats["trades"] += 1
+        minute = bar_datetime(str(stamp), "1Min")
+        self._pending[(to_db_ticker(str(symbol)), minute)] = float(price)
+
+    async def _flusher(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def _refresher(self, ws: aiohttp.ClientWebSocketResponse) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            await self.sync_subscriptions(ws)
+
+    async def flush(self) -> list[str]:
+        """Write coalesced prices and notify ``on_flush``; returns the tickers written."""
+        async with self._flush_lock:
+            pending, self._pending = self._pending, {}
+            rows = [
+                {"stock_id": self._stock_ids[ticker], "price": price, "datetime": minute}
+                for (ticker, minute), price in pending.items()
+                if ticker in self._stock_ids
+            ]
+            if not rows:
+                return []
+            await asyncio.to_thread(self.be.add_many_stock_prices, rows, True)
+            tickers = sorted({ticker for (ticker, _), _ in pending.items() if ticker in self._stock_ids})
+            self.stats["rows"] += len(rows)
+            self.stats["flushes"] += 1
+            logger.debug("Price stream flushed %s row(s) for %s ticker(s)", len(rows), len(tickers))
+            if self.on_flush is not None:
+                try:
+                    await self.on_flush(tickers)
+                except Exception:
+                    logger.exception("Price stream on_flush callback failed")
+            return tickers
@@ -113,6 +113,23 @@ async def sell_ticker_autocomplete(
         return []
 
 
+def _stock_pages(fe, page_size: int = 200):
+    """Every stock in the DB, fetched one keyset page at a time.
+
+    Callers stop once they have 25 choices, so usually only the first page is read.
+    """
+    after = None
+    while True:
+        try:
+            page = fe.be.get_many_stocks(limit=page_size, after=after)
+        except LookupError:
+            return
+        yield from page
+        if len(page) < page_size:
+            return
+        after = page[-1].id
+
+
 async def buy_ticker_autocomplete(
     interaction: Interaction,
     current: str,
@@ -149,12 +166,7 @@ async def buy_ticker_autocomplete(
             seen.add(typed)
 
         needle = current.strip().lower()
-        try:
-            stocks = _fe.be.get_many_stocks()
-        except LookupError:
-            stocks = ()
-
-        for stock in stocks:
+        for stock in _stock_pages(_fe):
             ticker = str(stock.ticker)
             company_name = str(getattr(stock, "company", "") or "")
             label = autocomplete_label(ticker, company_name)
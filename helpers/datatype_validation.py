@@ -3,7 +3,10 @@ from datetime import datetime, date
 from typing import Optional, Literal, TypeVar
 
 # EXTERNAL
-from pydantic import BaseModel, Field, PositiveInt, PositiveFloat, field_validator, TypeAdapter, AliasChoices, ConfigDict
+from pydantic import BaseModel, Field, PositiveInt, PositiveFloat, field_validator, model_validator, TypeAdapter, AliasChoices, ConfigDict
+
+# LOCAL
+from helpers.price_time import from_ts
 
 
 # Statuses
@@ -12,6 +15,7 @@ GameStatus = Literal['open', 'active', 'ended']
 ParticipantStatus = Literal['pending', 'active', 'inactive']
 PickStatus = Literal['pending_buy', 'owned', 'pending_sell', 'sold']
 UpdateFrequency = Literal['daily', 'hourly', 'minute', 'realtime', 'alpaca']
+PriceType = Literal['raw', 'hourly', 'daily']
 PydanticModelType = TypeVar('PydanticModelType', bound=BaseModel)
 GameTemplateStatus = Literal['enabled', 'disabled']
 
@@ -58,6 +62,7 @@ class Game(BaseModel):
     change_dollars: Optional[float] = None
     change_percent: Optional[float] = None
     leaderboard_message_id: Optional[str] = None
+    finalized: bool = Field(default=False, validation_alias=AliasChoices('results_recorded')) # Results frozen into game_results/pick_results
     datetime_created: datetime # YYYY-MM-DD HH:MM:SS
     last_updated: Optional[datetime] = Field(default=None, validation_alias=AliasChoices('datetime_updated', 'last_updated')) # YYYY-MM-DD HH:MM:SS
 
@@ -131,8 +136,19 @@ Stocks = TypeAdapter(list[Stock])
 class StockPrice(BaseModel):
     id: int = Field(validation_alias=AliasChoices('price_id'))
     stock_id: int
-    price: float
-    datetime: datetime # YYYY-MM-DD HH:MM:SS
+    price: float # Close for hourly/daily rows
+    datetime: datetime # YYYY-MM-DD HH:MM:SS, stored as `ts` (epoch minute)
+    price_type: PriceType = 'raw'
+    open: Optional[float] = None
+    high: Optional[float] = None
+    low: Optional[float] = None
+
+    @model_validator(mode='before')
+    @classmethod
+    def from_epoch_minute(cls, data):
+        if isinstance(data, dict) and 'datetime' not in data and data.get('ts') is not None:
+            data = {**data, 'datetime': from_ts(data['ts'])}
+        return data
 
 StockPrices = TypeAdapter(list[StockPrice])
 
@@ -147,11 +163,55 @@ class GameParticipant(BaseModel):
     change_dollars: Optional[float] = None
     change_percent: Optional[float] = None
     days_in_first: int = 0
+    rank: Optional[int] = None # Among active players, as of the last update
+    previous_rank: Optional[int] = None # Before the last change in rank
     last_updated: Optional[datetime] = Field(default=None, validation_alias=AliasChoices('datetime_updated', 'last_updated')) # YYYY-MM-DD HH:MM:SS
     
 GameParticipants = TypeAdapter(list[GameParticipant])
 
 
+class PickContext(BaseModel):
+    """What a buy checks, loaded in one query (see `Backend.get_pick_context`)"""
+    participation_id: int
+    user_id: int
+    game_id: int | str
+    status: ParticipantStatus
+    pick_date: Optional[date] = None
+    pick_count: PositiveInt
+    draft_mode: bool = False
+    open_picks: int = 0 # pending_buy, owned and pending_sell picks
+    stock: Optional[Stock] = None # Only when a ticker was asked for and is in the database
+
+    @model_validator(mode='before')
+    @classmethod
+    def nest_stock(cls, data):
+        if isinstance(data, dict) and 'stock_id' in data:
+            data = dict(data)
+            stock = {key: data.pop(key) for key in ('stock_id', 'ticker', 'exchange', 'company_name')}
+            if stock['stock_id'] is not None:
+                data['stock'] = stock
+        return data
+
+# Participant value history
+class ParticipantValue(BaseModel):
+    participant_id: int = Field(validation_alias=AliasChoices('participation_id'))
+    game_id: int | str
+    datetime: datetime # YYYY-MM-DD HH:MM:SS, stored as `ts` (epoch minute)
+    current_value: float
+    change_dollars: Optional[float] = None
+    change_percent: Optional[float] = None
+    resolution: Literal['cycle', 'daily'] = 'cycle'
+
+    @model_validator(mode='before')
+    @classmethod
+    def from_epoch_minute(cls, data):
+        if isinstance(data, dict) and 'datetime' not in data and data.get('ts') is not None:
+            data = {**data, 'datetime': from_ts(data['ts'])}
+        return data
+
+ParticipantValues = TypeAdapter(list[ParticipantValue])
+
+
 class StockPick(BaseModel):
     model_config = ConfigDict(extra='ignore') # Ignore extra data
     
@@ -178,16 +238,22 @@ class MyGames(BaseModel):
 
 
 class GameLeaderboard(BaseModel):
+    participation_id: Optional[int] = None
     user_id: int
     current_value: float
     joined: datetime
     change_dollars: float
     change_percent: float
     days_in_first: int = 0
+    rank: Optional[int] = None
+    previous_rank: Optional[int] = None
     display_name: Optional[str] = None
     last_updated: datetime | None = None
 
+GameLeaderboards = TypeAdapter(list[GameLeaderboard])
+
 class GameInfo(BaseModel):
     game: Game
     leaderboard: Optional[list[GameLeaderboard]] = None
+    leaderboard_size: Optional[int] = None # All leaderboard rows, even when only a page is included
     
\ No newline at end of file
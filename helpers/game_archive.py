@@ -0,0 +1,242 @@
+"""Hot/cold split: finalized games move to a separate archive SQLite file.
+
+Every game ever played used to stay in ``games`` / ``game_participants`` /
+``stock_picks`` etc., so those scans grew without bound. Once a finalized game
+(see ``Backend.finalize_game``) has been over for ``GAME_ARCHIVE_AFTER_DAYS``,
+:func:`archive_ended_games` copies it and every row that belongs to it into the
+archive (``ATTACH``-ed to the same connection, one transaction per batch) and
+deletes it from the main file, where ``ON DELETE CASCADE`` removes the rest.
+
+Archive tables mirror the main ones' columns (without their constraints),
+grow new columns as the main schema does, and are keyed by unique indexes so a
+re-run can't duplicate anything. ``Backend`` read methods fall back to
+:func:`query_archive` for games that are no longer in the main file.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import threading
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from helpers.sqlhelper import Status
+
+logger = logging.getLogger("GameArchive")
+
+# Table -> (unique key columns, how to select the rows of the games in ``archive_ids``)
+ARCHIVED_TABLES: dict[str, tuple[tuple[str, ...], str]] = {
+    "games": (("game_id",), "game_id IN (SELECT game_id FROM archive_ids)"),
+    "game_participants": (("participation_id",), "game_id IN (SELECT game_id FROM archive_ids)"),
+    "stock_picks": (
+        ("pick_id",),
+        """participation_id IN (SELECT participation_id FROM main.game_participants
+            WHERE game_id IN (SELECT game_id FROM archive_ids))""",
+    ),
+    "settlement_prices": (("game_id", "stock_id", "settle_ts"), "game_id IN (SELECT game_id FROM archive_ids)"),
+    "participant_value_history": (("participation_id", "ts"), "game_id IN (SELECT game_id FROM archive_ids)"),
+    "leaderboard_day_snapshots": (("game_id", "trade_date"), "game_id IN (SELECT game_id FROM archive_ids)"),
+    "game_results": (("game_id", "participation_id"), "game_id IN (SELECT game_id FROM archive_ids)"),
+    "pick_results": (("game_id", "pick_id"), "game_id IN (SELECT game_id FROM archive_ids)"),
+}
+
+# Extra archive indexes for the reads ``Backend`` falls back to.
+_ARCHIVE_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS archive.idx_archive_participants_game ON game_participants(game_id)",
+    "CREATE INDEX IF NOT EXISTS archive.idx_archive_participants_user ON game_participants(user_id)",
+    "CREATE INDEX IF NOT EXISTS archive.idx_archive_picks_participant ON stock_picks(participation_id)",
+)
+
+
+_archived_ids: dict[str, set[str]] = {}  # Archive file -> game IDs in it, see archived_game_ids
+_archived_ids_lock = threading.Lock()
+
+
+def archive_path(db_name: str) -> str:
+    """``GAME_ARCHIVE_DB``, else ``<db stem>_archive<suffix>`` next to the main database."""
+    configured = os.getenv("GAME_ARCHIVE_DB", "").strip()
+    if configured:
+        return configured
+    path = Path(db_name)
+    return str(path.with_name(f"{path.stem}_archive{path.suffix or '.db'}"))
+
+
+def archive_enabled() -> bool:
+    """``GAME_ARCHIVE_ENABLED`` (default on) gates the automatic daily run."""
+    return os.getenv("GAME_ARCHIVE_ENABLED", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+def archive_after_days() -> int:
+    """``GAME_ARCHIVE_AFTER_DAYS`` (default 90, minimum 0): days after a game ends before it is archived."""
+    return max(0, int(os.getenv("GAME_ARCHIVE_AFTER_DAYS", "90")))
+
+
+def _columns(conn: sqlite3.Connection, schema: str, table: str) -> list[str]:
+    return [row[1] for row in conn.execute(f"PRAGMA {schema}.table_info({table})")]
+
+
+def _sync_table(conn: sqlite3.Connection, table: str, key: tuple[str, ...]) -> list[str]:
+    """Create/extend ``archive.<table>`` to hold every main column; returns the shared column list."""
+    main_columns = _columns(conn, "main", table)
+    if not main_columns:
+        return []  # Table not in this schema version
+    archived = _columns(conn, "archive", table)
+    if not archived:
+        conn.execute(f"CREATE TABLE archive.{table} AS SELECT * FROM main.{table} WHERE 0")
+        conn.execute(f"CREATE UNIQUE INDEX archive.uq_archive_{table} ON {table}({', '.join(key)})")
+    else:
+        for column in main_columns:
+            if column not in archived:
+                conn.execute(f"ALTER TABLE archive.{table} ADD COLUMN {column}")
+    return main_columns
+
+
+def archive_ended_games(
+    db_name: str,
+    archive_db: Optional[str] = None,
+    after_days: Optional[int] = None,
+    *,
+    today: Optional[date] = None,
+    batch_size: int = 50,
+    log: Optional[logging.Logger] = None,
+) -> dict[str, int]:
+    """
+    Move finalized games that ended more than ``after_days`` ago into the archive file.
+
+    A game's end is its ``end_date``, or the day it was last updated when it was ended by hand.
+
+    Args:
+        db_name: Main SQLite database.
+        archive_db: Archive file (created if missing). Defaults to :func:`archive_path`.
+        after_days: Defaults to :func:`archive_after_days`.
+        batch_size: Games moved per transaction.
+
+    Returns:
+        Counts: games, plus rows moved per table.
+    """
+    log = log or logger
+    archive_db = archive_db or archive_path(db_name)
+    after_days = archive_after_days() if after_days is None else max(0, after_days)
+    cutoff = ((today or date.today()) - timedelta(days=after_days)).isoformat()
+    report: dict[str, int] = {table: 0 for table in ARCHIVED_TABLES}  # "games" doubles as the game count
+
+    conn = sqlite3.connect(db_name, isolation_level=None, timeout=30)
+    try:
+        due = [
+            str(row[0])
+            for row in conn.execute(
+                """SELECT game_id FROM games
+                WHERE status = 'ended' AND results_recorded = 1
+                AND COALESCE(end_date, substr(last_updated, 1, 10), substr(datetime_created, 1, 10)) < ?
+                ORDER BY game_id""",
+                (cutoff,),
+            )
+        ]
+        if not due:
+            return report
+        conn.execute("PRAGMA foreign_keys = ON")  # Deleting a game cascades to its rows
+        conn.execute("ATTACH DATABASE ? AS archive", (archive_db,))
+        columns = {table: _sync_table(conn, table, key) for table, (key, _) in ARCHIVED_TABLES.items()}
+        for statement in _ARCHIVE_INDEXES:
+            conn.execute(statement)
+        conn.execute("CREATE TEMP TABLE archive_ids (game_id TEXT PRIMARY KEY)")
+
+        for start in range(0, len(due), batch_size):
+            batch = due[start : start + batch_size]
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute("DELETE FROM archive_ids")
+                conn.executemany("INSERT INTO archive_ids (game_id) VALUES (?)", [(game_id,) for game_id in batch])
+                for table, (_, scope) in ARCHIVED_TABLES.items():
+                    if not columns[table]:
+                        continue
+                    names = ", ".join(columns[table])
+                    moved = conn.execute(
+                        f"INSERT OR REPLACE INTO archive.{table} ({names}) SELECT {names} FROM main.{table} WHERE {scope}"
+                    ).rowcount
+                    report[table] += max(moved, 0)
+                conn.execute("DELETE FROM main.games WHERE game_id IN (SELECT game_id FROM archive_ids)")
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            _note_archived(archive_db, batch)
+        conn.execute("DETACH DATABASE archive")
+    finally:
+        conn.close()
+
+    log.info(
+        "Game archive (ended before %s): moved %s game(s), %s participant(s), %s pick(s) to %s",
+        cutoff,
+        report["games"],
+        report["game_participants"],
+        report["stock_picks"],
+        archive_db,
+    )
+    return report
+
+
+def archived_game_ids(archive_db: str) -> set[str]:
+    """Game IDs in the archive file, read once per process and then kept up to date by :func:`archive_ended_games`.
+
+    ``Backend.add_game`` checks new IDs against it, so a new game can't take an archived game's ID.
+    """
+    key = str(Path(archive_db).resolve())
+    with _archived_ids_lock:
+        if key not in _archived_ids:
+            resp = query_archive(archive_db, "SELECT game_id FROM games")
+            rows = resp.result if resp.status == "success" and isinstance(resp.result, tuple) else ()
+            _archived_ids[key] = {str(row["game_id"]) for row in rows}
+        return _archived_ids[key]
+
+
+def _note_archived(archive_db: str, game_ids: list[str]) -> None:
+    key = str(Path(archive_db).resolve())
+    with _archived_ids_lock:
+        if key in _archived_ids:  # Otherwise the first archived_game_ids call reads them
+            _archived_ids[key].update(game_ids)
+
+
+def run_with_archive(db_name: str, archive_db: str, statements: Iterable[str]) -> None:
+    """Run writes on the main database in one transaction, with the archive attached as ``archive``.
+
+    For statements that have to see archived games too (e.g. ``REBUILD_CAREER_STATS_WITH_ARCHIVE``).
+    """
+    conn = sqlite3.connect(db_name, isolation_level=None, timeout=30)
+    try:
+        conn.execute("ATTACH DATABASE ? AS archive", (archive_db,))
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+    finally:
+        conn.close()
+
+
+def query_archive(archive_db: str, query: str, values: Optional[list[Any]] = None) -> Status:
+    """Run a read-only query on the archive file, answering like ``SqlHelper.send_query``.
+
+    A missing archive (nothing archived yet) reads as no rows.
+    """
+    if not Path(archive_db).is_file():
+        return Status(status="error", reason="NO ROWS RETURNED", more_info="No archive")
+    conn = sqlite3.connect(f"{Path(archive_db).resolve().as_uri()}?mode=ro", uri=True)
+    conn.row_factory = sqlite3.Row
+    try:
+        rows = conn.execute(query, values or []).fetchall()
+    except sqlite3.OperationalError as e:
+        if "no such table" in str(e):
+            return Status(status="error", reason="NO ROWS RETURNED", more_info=str(e))
+        return Status(status="error", reason=str(e.sqlite_errorname), result=e)  # type: ignore[attr-defined]
+    finally:
+        conn.close()
+    if not rows:
+        return Status(status="error", reason="NO ROWS RETURNED", more_info="Query valid, but no rows were returned")
+    return Status(status="success", reason="VALID QUERY", result=tuple(dict(row) for row in rows))
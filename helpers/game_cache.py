@@ -0,0 +1,180 @@
+"""Bounded LRU cache of validated ``dtv.Game`` rows.
+
+``Backend.get_game`` runs several times per command (``buy_stock``,
+``pick_capacity``, ownership and visibility checks, ``game_info``), each a
+query plus pydantic validation. Games change rarely between update cycles, so
+validated rows are kept here, keyed by game ID.
+
+One cache is shared per database file (:func:`for_db`): ``Frontend.be`` and
+``GameLogic.be`` are separate ``Backend`` instances, and a write through either
+must be seen by both. Every ``Backend`` write to ``games`` invalidates the IDs
+it touched. Writes made outside ``Backend`` (another process, raw SQL) are not
+seen, so such callers should :meth:`GameCache.clear` afterwards.
+
+Game rows that fail validation in a listing are skipped and put on the
+database's :class:`RepairQueue` (:func:`repair_queue_for`), which the update
+cycle works through with ``Backend.repair_queued_games``.
+
+``add_game``'s game ID counters are shared the same way (:func:`id_stats_for`),
+so ``Backend.game_id_stats`` covers every ``Backend`` in the process.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+
+def cache_size() -> int:
+    """``GAME_CACHE_SIZE`` (default 256, minimum 0): games kept per database. ``0`` disables the cache."""
+    return max(0, int(os.getenv("GAME_CACHE_SIZE", "256")))
+
+
+class GameCache:
+    """Thread-safe LRU map of game ID -> validated game, with hit/miss counters."""
+
+    def __init__(self, max_size: Optional[int] = None):
+        self.max_size = cache_size() if max_size is None else max(0, max_size)
+        self._items: OrderedDict[str, Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, game_id: int | str) -> Optional[Any]:
+        """The cached game (a copy, callers may modify it), or None on a miss."""
+        key = str(game_id)
+        with self._lock:
+            game = self._items.get(key)
+            if game is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+        return game.model_copy()
+
+    def put(self, game_id: int | str, game: Any) -> None:
+        if not self.max_size:
+            return
+        key = str(game_id)
+        with self._lock:
+            self._items[key] = game.model_copy()
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, game_ids: Iterable[int | str]) -> None:
+        """Drop these games, e.g. after writing to them."""
+        with self._lock:
+            for game_id in game_ids:
+                if self._items.pop(str(game_id), None) is not None:
+                    self.invalidations += 1
+
+    def clear(self) -> None:
+        """Drop every game (counters are kept)."""
+        with self._lock:
+            self.invalidations += len(self._items)
+            self._items.clear()
+
+    def stats(self) -> dict[str, int | float]:
+        """Counters for monitoring: size, hits, misses, hit_rate, evictions, invalidations."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._items),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+class RepairQueue:
+    """Thread-safe set of game IDs waiting for ``get_game``'s repairs."""
+
+    def __init__(self):
+        self._ids: dict[str, None] = {}  # Insertion ordered set
+        self._lock = threading.Lock()
+        self.queued = 0
+
+    def add(self, game_id: int | str) -> None:
+        with self._lock:
+            if str(game_id) not in self._ids:
+                self._ids[str(game_id)] = None
+                self.queued += 1
+
+    def drain(self) -> list[str]:
+        """Take every queued ID, oldest first."""
+        with self._lock:
+            ids = list(self._ids)
+            self._ids.clear()
+        return ids
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+
+class GameIdStats:
+    """Thread-safe game ID allocation counters: games created, and random IDs that were already taken."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.allocated = 0
+        self.collisions = 0
+
+    def record_allocation(self) -> None:
+        with self._lock:
+            self.allocated += 1
+
+    def record_collision(self) -> None:
+        with self._lock:
+            self.collisions += 1
+
+    def stats(self) -> dict[str, int | float]:
+        """Counters for monitoring: allocated, collisions and collision_rate (collisions per allocated game)."""
+        with self._lock:
+            return {
+                "allocated": self.allocated,
+                "collisions": self.collisions,
+                "collision_rate": round(self.collisions / self.allocated, 4) if self.allocated else 0.0,
+            }
+
+
+_caches: dict[str, GameCache] = {}
+_repair_queues: dict[str, RepairQueue] = {}
+_id_stats: dict[str, GameIdStats] = {}
+_caches_lock = threading.Lock()
+
+
+def for_db(db_name: str) -> GameCache:
+    """The cache shared by every ``Backend`` on ``db_name``."""
+    key = str(Path(db_name).resolve())
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = GameCache()
+        return _caches[key]
+
+
+def repair_queue_for(db_name: str) -> RepairQueue:
+    """The repair queue shared by every ``Backend`` on ``db_name``."""
+    key = str(Path(db_name).resolve())
+    with _caches_lock:
+        if key not in _repair_queues:
+            _repair_queues[key] = RepairQueue()
+        return _repair_queues[key]
+
+
+def id_stats_for(db_name: str) -> GameIdStats:
+    """The game ID counters shared by every ``Backend`` on ``db_name``."""
+    key = str(Path(db_name).resolve())
+    with _caches_lock:
+        if key not in _id_stats:
+            _id_stats[key] = GameIdStats()
+        return _id_stats[key]
@@ -87,33 +87,32 @@ def build_push_embed(game, *, best_pick: Optional[dict] = None, worst_pick: Opti
     return embed
 
 
-def collect_player_picks(fe, game_id, user_id: int) -> Optional[list[dict]]:
-    """Chip data for one player's holdings, or None when they are not a participant."""
-    try:
-        participant = fe.be.get_many_participants(game_id=game_id, user_id=user_id)[0]
-    except LookupError:
-        return None
-    try:
-        picks = fe.be.get_many_stock_picks(
-            participant_id=participant.id,
-            status=["owned", "pending_buy", "pending_sell"],
-            include_tickers=True,
-        )
-    except LookupError:
-        return []
-    picks_data: list[dict] = []
-    for pick in picks:
-        ticker = pick.stock_ticker or "?"
-        company = getattr(pick, "company_name", None) or ticker
-        picks_data.append(
-            {
-                "ticker": ticker,
-                "company": company,
-                "company_name": company,
-                "change_percent": float(pick.change_percent or 0),
-                "status": pick.status,
-            }
-        )
+def collect_game_picks(fe, game, participant_ids: Optional[list[int]] = None) -> dict[int, list[dict]]:
+    """Chip data for every player's holdings (one query), keyed by participation id.
+
+    Players without holdings are left out.
+    """
+    grouped = fe.be.get_picks_for_game(
+        game.id,
+        participant_ids=participant_ids,
+        status=["owned", "pending_buy", "pending_sell"],
+        finalized=bool(getattr(game, "finalized", False)),
+    )
+    picks_data: dict[int, list[dict]] = {}
+    for participation_id, picks in grouped.items():
+        chips = picks_data.setdefault(participation_id, [])
+        for pick in picks:
+            ticker = pick.stock_ticker or "?"
+            company = getattr(pick, "company_name", None) or ticker
+            chips.append(
+                {
+                    "ticker": ticker,
+                    "company": company,
+                    "company_name": company,
+                    "change_percent": float(pick.change_percent or 0),
+                    "status": pick.status,
+                }
+            )
     return picks_data
 
 
@@ -125,13 +124,12 @@ def collect_push_players(fe, game) -> tuple[list[dict], list[dict]]:
     """
     info = fe.game_info(game.id, show_leaderboard=True)
     leaderboard = info.leaderboard or []
+    game_picks = collect_game_picks(fe, info.game)
     players: list[dict] = []
     owned_pcts: list[dict] = []
 
     for entry in leaderboard:
-        picks_data = collect_player_picks(fe, game.id, entry.user_id)
-        if picks_data is None:
-            continue
+        picks_data = game_picks.get(entry.participation_id, [])
         for pick in picks_data:
             if pick["status"] == "owned":
                 owned_pcts.append({"ticker": pick["ticker"], "pct": pick["change_percent"]})
@@ -143,6 +141,8 @@ def collect_push_players(fe, game) -> tuple[list[dict], list[dict]]:
                 "change_dollars": entry.change_dollars,
                 "change_percent": entry.change_percent,
                 "days_in_first": getattr(entry, "days_in_first", 0) or 0,
+                "rank": getattr(entry, "rank", None),
+                "previous_rank": getattr(entry, "previous_rank", None),
                 "joined": entry.joined,
                 "picks": picks_data,
             }
@@ -196,12 +196,8 @@ def render_push_pages(
     generator = RecurringLeaderboardImageGenerator()
     images: list[BytesIO] = []
 
-    for page_index, page in enumerate(chunk_push_players(players)):
-        ranked_page: list[dict] = []
-        for offset, player in enumerate(page):
-            row = dict(player)
-            row["rank"] = page_index * PUSH_PAGE_SIZE + offset + 1
-            ranked_page.append(row)
+    for page in chunk_push_players(players):
+        ranked_page = [dict(player) for player in page]  # Stored ranks; unranked players get a placeholder
         images.append(
             generator.create_image(
                 game_data,
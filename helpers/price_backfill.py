@@ -0,0 +1,137 @@
+"""Backfill ``stock_prices`` from Alpaca historical bars.
+
+The live loop only stores point-in-time snapshots, so downtime or newly added
+tickers leave holes in the history. This pulls IEX bars for a ticker set and
+date range and bulk-loads the closes with ``INSERT OR IGNORE``; re-running the
+same range is a no-op.
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import date, datetime, time as dt_time
+from typing import Any, Optional
+
+import pytz
+
+from helpers.alpaca_client import AlpacaMarketData, to_db_ticker
+
+logger = logging.getLogger("PriceBackfill")
+
+MARKET_TZ = pytz.timezone("America/New_York")
+MARKET_CLOSE = dt_time(16, 0)
+
+
+def bar_datetime(bar_time: str, timeframe: str) -> str:
+    """Convert an Alpaca bar timestamp to the ``YYYY-MM-DD HH:MM:SS`` format ``Backend`` takes.
+
+    Snapshot rows use the bot host's local clock, so bars are stored the same
+    way. Daily (and longer) bars are pinned to the NYSE close of their ET trade
+    date so ``get_many_stock_prices(datetime='YYYY-MM-DD')`` finds them.
+    """
+    stamp = datetime.fromisoformat(bar_time.replace("Z", "+00:00"))
+    if stamp.tzinfo is None:
+        stamp = stamp.replace(tzinfo=pytz.utc)
+    if timeframe.endswith(("Day", "Week", "Month")):
+        trade_date = stamp.astimezone(MARKET_TZ).date()
+        stamp = MARKET_TZ.localize(datetime.combine(trade_date, MARKET_CLOSE))
+    local = stamp.astimezone().replace(tzinfo=None, second=0, microsecond=0)
+    return local.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def bar_price_type(timeframe: str) -> str:
+    """``stock_prices.price_type`` for bars of ``timeframe`` (minute bars count as raw)."""
+    if timeframe.endswith("Min"):
+        return "raw"
+    if timeframe.endswith("Hour"):
+        return "hourly"
+    return "daily"
+
+
+def _iso_day(value: str | date) -> str:
+    if isinstance(value, date):
+        return value.isoformat()
+    return datetime.strptime(value, "%Y-%m-%d").date().isoformat()
+
+
+def backfill_stock_prices(
+    be: Any,
+    alpaca: Optional[AlpacaMarketData] = None,
+    *,
+    start: str | date,
+    end: str | date,
+    tickers: Optional[list[str]] = None,
+    timeframe: str = "1Day",
+    log: Optional[logging.Logger] = None,
+) -> dict[str, int]:
+    """
+    Load historical bars into ``stock_prices`` for ``tickers`` (default: every stock in the DB).
+
+    Bars are written page by page so memory stays flat for long ranges.
+    Tickers that are not in the ``stocks`` table are skipped; add them first.
+
+    Returns counts: tickers, bars, inserted, skipped, unknown.
+    """
+    log = log or logger
+    alpaca = alpaca or AlpacaMarketData()
+    start_day, end_day = _iso_day(start), _iso_day(end)
+    if start_day > end_day:
+        raise ValueError("`start` must be on or before `end`.")
+
+    try:
+        stocks = be.get_many_stocks()
+    except LookupError:
+        stocks = ()
+    stock_ids = {str(stock.ticker).upper(): int(stock.id) for stock in stocks}
+
+    if tickers is None:
+        wanted = list(stock_ids)
+    else:
+        wanted = list(dict.fromkeys(to_db_ticker(t) for t in tickers))
+    unknown = [t for t in wanted if t not in stock_ids]
+    if unknown:
+        log.warning(
+            "Backfill skipping %s ticker(s) not in the stocks table: %s",
+            len(unknown),
+            ", ".join(unknown[:50]) + ("..." if len(unknown) > 50 else ""),
+        )
+    known = [t for t in wanted if t in stock_ids]
+
+    stats = {"tickers": len(known), "bars": 0, "inserted": 0, "skipped": 0, "unknown": len(unknown)}
+    if not known:
+        return stats
+
+    price_type = bar_price_type(timeframe)
+    for ticker, bars in alpaca.iter_bars(known, start_day, end_day, timeframe=timeframe):
+        stock_id = stock_ids.get(to_db_ticker(ticker))
+        if stock_id is None:
+            continue
+        rows = [
+            {
+                "stock_id": stock_id,
+                "price": float(bar["c"]),
+                "datetime": bar_datetime(str(bar["t"]), timeframe),
+                "price_type": price_type,
+                "open": bar.get("o"),
+                "high": bar.get("h"),
+                "low": bar.get("l"),
+            }
+            for bar in bars
+            if bar.get("c") is not None and bar.get("t")
+        ]
+        stats["inserted"] += be.add_many_stock_prices(rows)
+        stats["bars"] += len(rows)
+
+    stats["skipped"] = stats["bars"] - stats["inserted"]
+    log.info(
+        "Backfill %s→%s (%s): tickers=%s bars=%s inserted=%s skipped=%s unknown=%s",
+        start_day,
+        end_day,
+        timeframe,
+        stats["tickers"],
+        stats["bars"],
+        stats["inserted"],
+        stats["skipped"],
+        stats["unknown"],
+    )
+    return stats
@@ -0,0 +1,294 @@
+"""Columnar per-ticker price history (export + memory-mapped reader).
+
+Analytics (charts, returns, best/worst pick across games) only need
+``(ts, price)`` pairs, so pulling them row by row through ``SqlHelper`` dicts
+and pydantic is wasted work. :func:`export_price_columns` keeps a directory of
+flat native-endian arrays in step with ``stock_prices``::
+
+    <dir>/manifest.json      watermark + per-ticker row counts
+    <dir>/<stock_id>.ts      int64 epoch minutes (see helpers/price_time.py), ascending
+    <dir>/<stock_id>.price   float64 prices, same order
+
+Exports are incremental: a ticker whose new rows all come after its last
+exported minute gets its tail re-read and appended; one that gained rows at or
+before it (backfill, retention compaction) is rewritten. :class:`PriceColumns` maps the
+files read-only and hands out ``memoryview`` columns, which slice, ``bisect``
+and feed ``numpy.frombuffer`` without copying.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import mmap
+import os
+import sqlite3
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Final, Iterable, Optional
+
+from helpers.price_time import to_ts
+
+logger = logging.getLogger("PriceColumns")
+
+MANIFEST = "manifest.json"
+FORMAT_VERSION = 1
+_TS_CODE: Final = "q"  # int64
+_PRICE_CODE: Final = "d"  # float64
+
+
+def columns_dir() -> Optional[str]:
+    """``PRICE_COLUMNS_DIR`` (unset/blank disables the automatic export)."""
+    return os.getenv("PRICE_COLUMNS_DIR", "").strip() or None
+
+
+def _paths(directory: Path, stock_id: int) -> tuple[Path, Path]:
+    return directory / f"{stock_id}.ts", directory / f"{stock_id}.price"
+
+
+def _read_manifest(directory: Path) -> dict[str, Any]:
+    try:
+        with open(directory / MANIFEST, encoding="utf-8") as fh:
+            manifest = json.load(fh)
+    except FileNotFoundError:
+        return {}
+    if manifest.get("version") != FORMAT_VERSION or manifest.get("byteorder") != sys.byteorder:
+        return {}  # Different layout: rebuild from scratch
+    return manifest
+
+
+def _write_manifest(directory: Path, manifest: dict[str, Any]) -> None:
+    tmp = directory / f"{MANIFEST}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, indent=1, sort_keys=True)
+    os.replace(tmp, directory / MANIFEST)
+
+
+def _rows(conn: sqlite3.Connection, stock_id: int, from_ts: Optional[int] = None) -> tuple[array, array]:
+    query = "SELECT ts, price FROM stock_prices WHERE stock_id = ?"
+    values: tuple = (stock_id,)
+    if from_ts is not None:
+        query += " AND ts >= ?"
+        values += (from_ts,)
+    ts, prices = array(_TS_CODE), array(_PRICE_CODE)
+    for row_ts, price in conn.execute(query + " ORDER BY ts", values):
+        ts.append(row_ts)
+        prices.append(price)
+    return ts, prices
+
+
+def _rewrite(directory: Path, stock_id: int, ts: array, prices: array) -> None:
+    for path, column in zip(_paths(directory, stock_id), (ts, prices)):
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as fh:
+            column.tofile(fh)
+        os.replace(tmp, path)
+
+
+def _append(directory: Path, stock_id: int, keep: int, ts: array, prices: array) -> None:
+    """Write both columns from row ``keep`` on.
+
+    Never truncates: a reader may have the file mapped, and touching a page past
+    EOF is a SIGBUS. Bytes past the manifest row count are ignored.
+    """
+    for path, column in zip(_paths(directory, stock_id), (ts, prices)):
+        with open(path, "r+b" if path.exists() else "w+b") as fh:
+            fh.seek(keep * column.itemsize)
+            column.tofile(fh)
+
+
+def export_price_columns(db_name: str, directory: str, *, full: bool = False, log: Optional[logging.Logger] = None) -> dict[str, int]:
+    """
+    Bring the columnar export in ``directory`` up to date with ``stock_prices``.
+
+    Args:
+        db_name: SQLite database.
+        directory: Export directory (created if missing).
+        full: Rewrite every ticker instead of only the changed ones.
+
+    Returns:
+        Counts: tickers, appended, rewritten, removed, rows (total exported).
+    """
+    log = log or logger
+    out = Path(directory)
+    out.mkdir(parents=True, exist_ok=True)
+    manifest = {} if full else _read_manifest(out)
+    watermark = int(manifest.get("watermark", 0))
+    exported: dict[str, dict[str, int]] = manifest.get("tickers", {})
+    report = {"tickers": 0, "appended": 0, "rewritten": 0, "removed": 0, "rows": 0}
+
+    conn = sqlite3.connect(db_name, timeout=30)
+    try:
+        conn.execute("BEGIN")  # One read snapshot for the whole export
+        stocks = {int(sid): str(ticker) for sid, ticker in conn.execute("SELECT stock_id, ticker FROM stocks")}
+        # AUTOINCREMENT high-water mark: unlike MAX(price_id) it never goes back when rows are deleted.
+        seq = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'stock_prices'").fetchone()
+        new_max = int(seq[0]) if seq else 0
+        changed = {
+            int(sid): int(min_ts)
+            for sid, min_ts in conn.execute(
+                "SELECT stock_id, MIN(ts) FROM stock_prices WHERE price_id > ? GROUP BY stock_id",
+                (watermark if new_max >= watermark else 0,),
+            )
+        }
+        reuse = exported if new_max >= watermark else {}  # Else the DB was reset/restored: start over
+
+        tickers: dict[str, dict[str, int]] = {}
+        for stock_id, ticker in stocks.items():
+            entry = reuse.get(ticker)
+            if entry is not None and entry["stock_id"] != stock_id:
+                entry = None  # Ticker was deleted and re-added
+            if entry is not None and stock_id not in changed:
+                tickers[ticker] = entry
+                continue
+            if entry is None or entry["rows"] == 0 or changed[stock_id] <= entry["last_ts"]:
+                ts, prices = _rows(conn, stock_id)
+                if not ts:
+                    continue
+                _rewrite(out, stock_id, ts, prices)
+                tickers[ticker] = {"stock_id": stock_id, "rows": len(ts), "last_ts": ts[-1]}
+                report["rewritten"] += 1
+            else:
+                # Only newer rows: re-read from the last exported minute (the stream may have refined it).
+                ts, prices = _rows(conn, stock_id, entry["last_ts"])
+                keep = entry["rows"] - 1
+                _append(out, stock_id, keep, ts, prices)
+                tickers[ticker] = {"stock_id": stock_id, "rows": keep + len(ts), "last_ts": ts[-1] if ts else entry["last_ts"]}
+                report["appended"] += 1
+    finally:
+        conn.close()
+
+    live_ids = {entry["stock_id"] for entry in tickers.values()}
+    for ticker, entry in exported.items():
+        if ticker not in tickers:
+            report["removed"] += 1
+        if entry["stock_id"] not in live_ids:
+            for path in _paths(out, entry["stock_id"]):
+                path.unlink(missing_ok=True)
+
+    _write_manifest(
+        out,
+        {"version": FORMAT_VERSION, "byteorder": sys.byteorder, "watermark": int(new_max), "tickers": tickers},
+    )
+    report["tickers"] = len(tickers)
+    report["rows"] = sum(entry["rows"] for entry in tickers.values())
+    log.info(
+        "Price columns: %s tickers / %s rows (appended=%s rewritten=%s removed=%s)",
+        report["tickers"],
+        report["rows"],
+        report["appended"],
+        report["rewritten"],
+        report["removed"],
+    )
+    return report
+
+
+@dataclass
+class PriceSeries:
+    """One ticker's history as zero-copy columns over the mapped files."""
+
+    ticker: str
+    ts: memoryview  # int64 epoch minutes, ascending
+    prices: memoryview  # float64
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    def window(self, start: Optional[int] = None, end: Optional[int] = None) -> "PriceSeries":
+        """Rows with ``start <= ts <= end`` (either bound optional), still zero-copy."""
+        lo = 0 if start is None else bisect_left(self.ts, start)
+        hi = len(self.ts) if end is None else bisect_right(self.ts, end)
+        return PriceSeries(self.ticker, self.ts[lo:hi], self.prices[lo:hi])
+
+    def returns(self) -> array:
+        """Period-over-period simple returns (``len - 1`` values)."""
+        p = self.prices
+        return array(_PRICE_CODE, (b / a - 1.0 if a else math.nan for a, b in zip(p[:-1], p[1:])))
+
+    def total_return(self) -> Optional[float]:
+        """First-to-last simple return, or None with fewer than two prices."""
+        if len(self.prices) < 2 or not self.prices[0]:
+            return None
+        return self.prices[-1] / self.prices[0] - 1.0
+
+
+class PriceColumns:
+    """Read-only, memory-mapped view of an :func:`export_price_columns` directory.
+
+    Use as a context manager (or call :meth:`close`). A map stays open while
+    any series (or buffer taken from one) still references it.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        manifest = _read_manifest(self.directory)
+        if not manifest:
+            raise FileNotFoundError(f"No compatible price column export in {directory}")
+        self.watermark: int = int(manifest["watermark"])
+        self._entries: dict[str, dict[str, int]] = manifest["tickers"]
+        self._maps: list[mmap.mmap] = []
+        self._series: dict[str, PriceSeries] = {}
+
+    def __enter__(self) -> "PriceColumns":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def __contains__(self, ticker: object) -> bool:
+        return isinstance(ticker, str) and ticker.upper() in self._entries
+
+    @property
+    def tickers(self) -> list[str]:
+        return sorted(self._entries)
+
+    def _map(self, path: Path, code: str, rows: int) -> "memoryview[Any]":
+        with open(path, "rb") as fh:
+            mapped = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps.append(mapped)
+        # Ignore anything past the manifest row count (a newer append, or a torn one)
+        raw = memoryview(mapped)[: rows * array(code).itemsize]
+        return raw.cast(_TS_CODE) if code == _TS_CODE else raw.cast(_PRICE_CODE)
+
+    def series(self, ticker: str) -> PriceSeries:
+        """
+        Raises:
+            LookupError: Ticker not in the export.
+        """
+        ticker = ticker.upper()
+        if ticker in self._series:
+            return self._series[ticker]
+        entry = self._entries.get(ticker)
+        if entry is None:
+            raise LookupError(f"No exported prices for {ticker}.")
+        ts_path, price_path = _paths(self.directory, entry["stock_id"])
+        rows = int(entry["rows"])
+        series = PriceSeries(ticker, self._map(ts_path, _TS_CODE, rows), self._map(price_path, _PRICE_CODE, rows))
+        self._series[ticker] = series
+        return series
+
+    def period_returns(self, tickers: Iterable[str], start: Any = None, end: Any = None) -> dict[str, Optional[float]]:
+        """Simple return per ticker between the first price at/after ``start`` and the last at/before ``end``.
+
+        ``start``/``end`` take anything :func:`helpers.price_time.to_ts` does. Tickers
+        that aren't exported map to None.
+        """
+        lo = None if start is None else to_ts(start)
+        hi = None if end is None else to_ts(end)
+        result: dict[str, Optional[float]] = {}
+        for ticker in tickers:
+            result[ticker] = self.series(ticker).window(lo, hi).total_return() if ticker in self else None
+        return result
+
+    def close(self) -> None:
+        self._series.clear()
+        for mapped in self._maps:
+            try:
+                mapped.close()
+            except BufferError:
+                pass  # Still referenced by a live series; unmapped when that is collected
+        self._maps.clear()
@@ -0,0 +1,225 @@
+"""Tiered retention for ``stock_prices``.
+
+Every update cycle stores one row per ticker, so the table grows without bound
+and date-prefix lookups and backups slow down with it. Compaction keeps three
+tiers:
+
+* rows newer than ``raw_days`` stay as polled (``raw``);
+* older rows, up to ``hourly_days``, collapse to one ``hourly`` OHLC row per
+  stock per hour;
+* anything older collapses to one ``daily`` OHLC row per stock per day.
+
+Each downsampled row keeps the close in ``price`` and is stamped with the
+``ts`` of the last row it replaces, so "latest price on day X" lookups still
+answer the same. Work is done a bucket batch at a time in short transactions
+(at most ~``batch_size`` rows deleted per commit) so the bot's own writes are
+never blocked for long. Re-running is a no-op once a range is compacted.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from helpers.price_time import MINUTES_PER_DAY, MINUTES_PER_HOUR, to_ts
+
+logger = logging.getLogger("PriceRetention")
+
+# Bucket width (minutes of ``ts``) per tier, and which stored types roll up into it.
+_TIERS = {
+    "hourly": (MINUTES_PER_HOUR, ("raw", "hourly")),
+    "daily": (MINUTES_PER_DAY, ("raw", "hourly", "daily")),
+}
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """Retention windows, in days of age (from the start of today, local time).
+
+    ``hourly_days == raw_days`` skips the hourly tier (raw goes straight to daily).
+    """
+
+    raw_days: int = 30
+    hourly_days: int = 180
+    batch_size: int = 5000
+    vacuum: bool = False
+
+    def __post_init__(self) -> None:
+        if self.raw_days < 1:
+            raise ValueError("`raw_days` must be at least 1 (today's prices are always kept raw).")
+        if self.hourly_days < self.raw_days:
+            raise ValueError("`hourly_days` must be >= `raw_days`.")
+        if self.batch_size < 1:
+            raise ValueError("`batch_size` must be positive.")
+
+    @classmethod
+    def from_env(cls) -> "RetentionPolicy":
+        """Build from ``PRICE_RETENTION_*`` env vars (unset ones keep the defaults)."""
+        defaults = cls()
+        return cls(
+            raw_days=int(os.getenv("PRICE_RETENTION_RAW_DAYS", defaults.raw_days)),
+            hourly_days=int(os.getenv("PRICE_RETENTION_HOURLY_DAYS", defaults.hourly_days)),
+            batch_size=int(os.getenv("PRICE_RETENTION_BATCH_SIZE", defaults.batch_size)),
+            vacuum=os.getenv("PRICE_RETENTION_VACUUM", "").strip().lower() in ("1", "true", "yes", "on"),
+        )
+
+
+def retention_enabled() -> bool:
+    """``PRICE_RETENTION_ENABLED`` (default on) gates the automatic daily run."""
+    return os.getenv("PRICE_RETENTION_ENABLED", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+def _space(conn: sqlite3.Connection, db_name: str) -> tuple[int, int]:
+    """(file bytes, free-page bytes) for the main DB file."""
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    return Path(db_name).stat().st_size, int(page_size) * int(free_pages)
+
+
+def _days(conn: sqlite3.Connection, start: Optional[int], end: int, types: tuple[str, ...]) -> list[int]:
+    """Distinct days (``ts // 1440``) in ``[start, end)`` that still hold rows of ``types``."""
+    placeholders = ", ".join("?" for _ in types)
+    query = f"""SELECT DISTINCT ts / {MINUTES_PER_DAY} FROM stock_prices
+        WHERE ts < ? AND ts >= ? AND price_type IN ({placeholders})
+        ORDER BY 1"""
+    return [int(row[0]) for row in conn.execute(query, (end, start or 0, *types))]
+
+
+def _buckets(conn: sqlite3.Connection, day: int, tier: str) -> list[tuple[int, int, int]]:
+    """``(stock_id, bucket, rows)`` for one day that still need compacting into ``tier``.
+
+    A bucket needs work if it has more than one row or its only row is of a lower tier.
+    """
+    width, types = _TIERS[tier]
+    placeholders = ", ".join("?" for _ in types)
+    query = f"""SELECT stock_id, ts / {width} AS bucket, COUNT(*) AS n
+        FROM stock_prices
+        WHERE ts >= ? AND ts < ? AND price_type IN ({placeholders})
+        GROUP BY stock_id, bucket
+        HAVING n > 1 OR SUM(price_type != ?) > 0"""
+    start = day * MINUTES_PER_DAY
+    rows = conn.execute(query, (start, start + MINUTES_PER_DAY, *types, tier))
+    return [(int(r[0]), int(r[1]), int(r[2])) for r in rows]
+
+
+def _batches(buckets: list[tuple[int, int, int]], batch_size: int) -> Iterator[list[tuple[int, int]]]:
+    batch: list[tuple[int, int]] = []
+    rows = 0
+    for stock_id, bucket, count in buckets:
+        if batch and rows + count > batch_size:
+            yield batch
+            batch, rows = [], 0
+        batch.append((stock_id, bucket))
+        rows += count
+    if batch:
+        yield batch
+
+
+def _compact_batch(conn: sqlite3.Connection, keys: list[tuple[int, int]], tier: str) -> tuple[int, int]:
+    """Replace every row in ``keys`` buckets with one ``tier`` OHLC row. Returns (deleted, written)."""
+    width, types = _TIERS[tier]
+    placeholders = ", ".join("?" for _ in types)
+    select = f"""SELECT price_id, price, ts, open, high, low FROM stock_prices
+        WHERE stock_id = ? AND ts >= ? AND ts < ? AND price_type IN ({placeholders})
+        ORDER BY ts"""
+    deleted = written = 0
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for stock_id, bucket in keys:
+            rows = conn.execute(select, (stock_id, bucket * width, (bucket + 1) * width, *types)).fetchall()
+            if not rows:
+                continue
+            first, last = rows[0], rows[-1]
+            open_ = first[3] if first[3] is not None else first[1]
+            high = max(r[4] if r[4] is not None else r[1] for r in rows)
+            low = min(r[5] if r[5] is not None else r[1] for r in rows)
+            conn.executemany("DELETE FROM stock_prices WHERE price_id = ?", [(r[0],) for r in rows])
+            conn.execute(
+                """INSERT INTO stock_prices (stock_id, price, ts, price_type, open, high, low)
+                VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                (stock_id, last[1], last[2], tier, open_, high, low),
+            )
+            deleted += len(rows)
+            written += 1
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return deleted, written
+
+
+def compact_stock_prices(
+    db_name: str,
+    policy: Optional[RetentionPolicy] = None,
+    *,
+    now: Optional[datetime] = None,
+    log: Optional[logging.Logger] = None,
+) -> dict[str, Any]:
+    """
+    Downsample old ``stock_prices`` rows per ``policy`` (default: from env).
+
+    Returns a report: rows_before, rows_after, rows_deleted, hourly_written,
+    daily_written, batches, file_bytes_before/after, free_bytes_before/after and
+    bytes_reclaimed (file shrink + newly free pages SQLite will reuse; the file
+    itself only shrinks when ``policy.vacuum`` is set).
+    """
+    log = log or logger
+    policy = policy or RetentionPolicy.from_env()
+    today = (now or datetime.now()).replace(hour=0, minute=0, second=0, microsecond=0)
+    raw_cutoff = to_ts(today - timedelta(days=policy.raw_days))
+    hourly_cutoff = to_ts(today - timedelta(days=policy.hourly_days))
+
+    conn = sqlite3.connect(db_name, isolation_level=None, timeout=30)
+    try:
+        rows_before = conn.execute("SELECT COUNT(*) FROM stock_prices").fetchone()[0]
+        file_before, free_before = _space(conn, db_name)
+        report: dict[str, Any] = {
+            "rows_before": rows_before,
+            "rows_deleted": 0,
+            "hourly_written": 0,
+            "daily_written": 0,
+            "batches": 0,
+        }
+
+        plan: list[tuple[str, Optional[int], int]] = [("daily", None, hourly_cutoff), ("hourly", hourly_cutoff, raw_cutoff)]
+        for tier, start, end in plan:
+            if start is not None and start >= end:
+                continue  # hourly tier disabled
+            for day in _days(conn, start, end, _TIERS[tier][1]):
+                for keys in _batches(_buckets(conn, day, tier), policy.batch_size):
+                    deleted, written = _compact_batch(conn, keys, tier)
+                    report["rows_deleted"] += deleted
+                    report[f"{tier}_written"] += written
+                    report["batches"] += 1
+
+        if policy.vacuum and report["batches"]:
+            conn.execute("VACUUM")
+        report["rows_after"] = conn.execute("SELECT COUNT(*) FROM stock_prices").fetchone()[0]
+        file_after, free_after = _space(conn, db_name)
+    finally:
+        conn.close()
+
+    report.update(
+        file_bytes_before=file_before,
+        file_bytes_after=file_after,
+        free_bytes_before=free_before,
+        free_bytes_after=free_after,
+        bytes_reclaimed=max(0, (file_before - file_after) + (free_after - free_before)),
+    )
+    log.info(
+        "Price retention (raw<%s, hourly<%s): %s -> %s rows in %s batch(es); hourly=%s daily=%s; reclaimed %s bytes",
+        (today - timedelta(days=policy.raw_days)).date(),
+        (today - timedelta(days=policy.hourly_days)).date(),
+        report["rows_before"],
+        report["rows_after"],
+        report["batches"],
+        report["hourly_written"],
+        report["daily_written"],
+        report["bytes_reclaimed"],
+    )
+    return report
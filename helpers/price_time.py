@@ -0,0 +1,70 @@
+"""``stock_prices.ts`` conversions.
+
+Prices are stored as integer minutes since ``1970-01-01 00:00`` so point and
+range lookups are index seeks on ``(stock_id, ts)``. Like every other datetime
+in the DB the value is wall-clock time on the bot host (it is *not* shifted to
+UTC), so a day is always ``1440`` minutes and ``ts // 1440`` is the calendar
+day. Everything above ``Backend`` keeps using ``YYYY-MM-DD HH:MM:SS``; these
+helpers are the only place the two meet.
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+
+from dateutil.relativedelta import relativedelta
+
+MINUTES_PER_HOUR = 60
+MINUTES_PER_DAY = 1440
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def to_ts(value: str | datetime | date) -> int:
+    """Epoch minute for a ``YYYY-MM-DD[ HH:MM[:SS]]`` string, datetime or date (seconds are dropped).
+
+    Aware datetimes are converted to the host's local time first.
+
+    Raises:
+        ValueError: Unparseable string.
+    """
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.strip())
+    elif not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    if value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    return (value - _EPOCH) // timedelta(minutes=1)
+
+
+def from_ts(ts: int) -> datetime:
+    """Naive datetime for an epoch minute."""
+    return _EPOCH + timedelta(minutes=int(ts))
+
+
+def prefix_range(prefix: str) -> tuple[int, int]:
+    """Half-open ``[start, end)`` epoch-minute range covered by a datetime prefix.
+
+    Accepts the prefixes ``get_many_stock_prices`` has always taken: ``YYYY``,
+    ``YYYY-MM``, ``YYYY-MM-DD``, ``YYYY-MM-DD HH`` (optionally with a trailing
+    ``:``), ``YYYY-MM-DD HH:MM`` and a full ``YYYY-MM-DD HH:MM:SS`` (that minute).
+
+    Raises:
+        ValueError: Not a supported prefix.
+    """
+    text = prefix.strip().rstrip(":").strip()
+    spans: list[tuple[str, timedelta | relativedelta]] = [
+        ("%Y-%m-%d %H:%M:%S", timedelta(minutes=1)),
+        ("%Y-%m-%d %H:%M", timedelta(minutes=1)),
+        ("%Y-%m-%d %H", timedelta(hours=1)),
+        ("%Y-%m-%d", timedelta(days=1)),
+        ("%Y-%m", relativedelta(months=1)),
+        ("%Y", relativedelta(years=1)),
+    ]
+    for fmt, span in spans:
+        try:
+            start = datetime.strptime(text, fmt).replace(second=0)
+        except ValueError:
+            continue
+        return to_ts(start), to_ts(start + span)
+    raise ValueError(f"Unsupported datetime prefix: {prefix!r}")
@@ -14,7 +14,7 @@ from typing import Any, Dict, List, Optional, Sequence, Union
 
 from PIL import Image, ImageDraw, ImageFont
 
-from helpers.views import LeaderboardImageGenerator
+from helpers.views import UNRANKED, LeaderboardImageGenerator
 
 LEADERBOARD_N_CANDIDATES = (5, 10, 15, 20, 25, 30)
 DEFAULT_MAX_IMAGE_HEIGHT = 3500
@@ -299,12 +299,12 @@ class RecurringLeaderboardImageGenerator:
         row_bg = self.colors["row_bg_1"] if idx % 2 == 0 else self.colors["row_bg_2"]
         draw.rectangle([0, y, self.width, y + block_h], fill=row_bg)
 
-        place = int(player.get("rank") or idx + 1)
-        rank = f"{place}."
+        place = player.get("rank")  # None for pending/inactive players
+        rank = f"{int(place)}." if place else UNRANKED
         draw.text(
             (18, y + 9),
             rank,
-            fill=self._simple._get_rank_color(place - 1),
+            fill=self._simple._get_rank_color(int(place) - 1) if place else self.colors["text"],
             font=self.fonts["name"],
         )
         name_x = 18 + max(self._width(rank, self.fonts["name"]), 22) + 10
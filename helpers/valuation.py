@@ -0,0 +1,182 @@
+"""Portfolio valuation in one pass over a game's holdings.
+
+``Backend.get_valuation_inputs`` loads every active participant's picks (with
+the game's money/pick settings and the latest price of the day) as flat rows;
+:func:`value_picks` reprices them and :func:`value_totals` rolls them up into
+participant and game totals. Both are pure functions over plain rows and
+return write-ready updates for ``Backend.apply_valuation`` (one
+``executemany`` per table), so the update cycle does a handful of queries per
+run instead of several per pick.
+
+The formulas are the ones ``GameLogic`` has always used:
+
+* ``pending_buy`` fills at ``start_money / pick_count``:
+  ``shares = allocation / price``, ``start_value = current_value = round(shares * price, 2)``;
+* ``owned``/``pending_sell`` revalue at ``shares * price`` (``pending_sell`` becomes ``sold``);
+* a participant is worth their unsold picks (a still-pending buy counts at its
+  allocation) + the realised ``change_dollars`` of sold picks + uninvested cash;
+* a game's aggregate is the sum of its active participants.
+
+Stored ``change_dollars``/``change_percent`` are rounded to two places, as
+``Backend.update_*`` always did.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass, field, replace
+from typing import Iterable, Optional
+
+
+@dataclass(frozen=True)
+class Holding:
+    """One row of ``Backend.get_valuation_inputs``: an active participant and (optionally) one of their picks."""
+
+    game_id: str
+    start_money: float
+    pick_count: int
+    participation_id: int
+    pick_id: Optional[int] = None  # None: participant without picks
+    status: Optional[str] = None
+    shares: Optional[float] = None
+    start_value: Optional[float] = None
+    current_value: Optional[float] = None
+    change_dollars: Optional[float] = None
+    change_percent: Optional[float] = None
+    price: Optional[float] = None  # Latest price today; None leaves the pick as stored
+    # Only used by GameLogic's repricing/settlement rules
+    update_frequency: str = "alpaca"
+    start_date: Optional[str] = None  # Game's
+    stock_id: Optional[int] = None
+    datetime_created: Optional[str] = None  # Pick's
+    last_updated: Optional[str] = None  # Pick's
+
+
+@dataclass(frozen=True)
+class PickUpdate:
+    pick_id: int
+    shares: Optional[float]  # None: unchanged
+    start_value: Optional[float]  # None: unchanged
+    current_value: float
+    change_dollars: float
+    change_percent: float
+    status: Optional[str]  # None: unchanged
+
+
+@dataclass(frozen=True)
+class TotalUpdate:
+    """Participant (``id`` = participation_id) or game (``id`` = game_id) totals."""
+
+    id: int | str
+    current_value: float
+    change_dollars: float
+    change_percent: float
+
+
+@dataclass
+class Valuation:
+    picks: list[PickUpdate] = field(default_factory=list)
+    participants: list[TotalUpdate] = field(default_factory=list)
+    games: list[TotalUpdate] = field(default_factory=list)
+    uninvested_cash: dict[int, float] = field(default_factory=dict)  # participation_id -> cash
+
+
+def _round2(value: float) -> float:
+    return round(value, 2)
+
+
+def value_picks(holdings: Iterable[Holding]) -> tuple[list[PickUpdate], list[Holding]]:
+    """
+    Reprice every pick that has a price.
+
+    Returns:
+        (updates to write, holdings as they will be stored afterwards).
+    """
+    updates: list[PickUpdate] = []
+    after: list[Holding] = []
+    for h in holdings:
+        if h.pick_id is None or h.price is None or h.status not in ("pending_buy", "owned", "pending_sell"):
+            after.append(h)
+            continue
+        if h.status == "pending_buy":
+            shares = (h.start_money / h.pick_count) / h.price
+            value = _round2(shares * h.price)
+            update = PickUpdate(h.pick_id, shares, value, value, 0.0, 0.0, "owned")
+        else:
+            if h.shares is None or not h.start_value:
+                after.append(h)  # Never filled properly; nothing to revalue against
+                continue
+            value = h.shares * h.price
+            change = value - h.start_value
+            update = PickUpdate(
+                h.pick_id,
+                None,
+                None,
+                value,
+                _round2(change),
+                _round2(change / h.start_value * 100),
+                "sold" if h.status == "pending_sell" else None,
+            )
+        updates.append(update)
+        after.append(
+            replace(
+                h,
+                status=update.status or h.status,
+                shares=update.shares if update.shares is not None else h.shares,
+                start_value=update.start_value if update.start_value is not None else h.start_value,
+                current_value=update.current_value,
+                change_dollars=update.change_dollars,
+                change_percent=update.change_percent,
+            )
+        )
+    return updates, after
+
+
+def value_totals(holdings: Iterable[Holding]) -> Valuation:
+    """Participant and game totals (``picks`` is left empty)."""
+    result = Valuation()
+    settings: dict[str, tuple[float, int]] = {}
+    players: dict[str, list[int]] = defaultdict(list)
+    invested: dict[int, float] = defaultdict(float)
+    active: dict[int, int] = defaultdict(int)
+    realised: dict[int, float] = defaultdict(float)
+
+    for h in holdings:
+        settings.setdefault(h.game_id, (h.start_money, h.pick_count))
+        if h.participation_id not in invested:
+            players[h.game_id].append(h.participation_id)
+            invested[h.participation_id] = 0.0
+        if h.pick_id is None:
+            continue
+        if h.status == "sold":
+            realised[h.participation_id] += h.change_dollars or 0.0
+        elif h.status == "pending_buy":
+            active[h.participation_id] += 1
+            invested[h.participation_id] += h.start_money / h.pick_count
+        elif h.status in ("owned", "pending_sell"):
+            active[h.participation_id] += 1
+            invested[h.participation_id] += h.current_value or 0.0
+
+    for game_id, participation_ids in players.items():
+        start_money, pick_count = settings[game_id]
+        allocation = start_money / pick_count
+        aggregate = 0.0
+        for pid in participation_ids:
+            cash = start_money - allocation * active[pid]
+            value = invested[pid] + realised[pid] + cash
+            change = value - start_money
+            result.uninvested_cash[pid] = cash
+            result.participants.append(TotalUpdate(pid, value, _round2(change), _round2(change / start_money * 100)))
+            aggregate += value
+        baseline = start_money * len(participation_ids)
+        change = aggregate - baseline
+        result.games.append(TotalUpdate(game_id, aggregate, _round2(change), _round2(change / baseline * 100)))
+    return result
+
+
+def value_portfolios(holdings: Iterable[Holding]) -> Valuation:
+    """Reprice picks and roll up totals in one go."""
+    picks, after = value_picks(holdings)
+    result = value_totals(after)
+    result.picks = picks
+    return result
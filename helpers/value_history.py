@@ -0,0 +1,96 @@
+"""Retention for ``participant_value_history``.
+
+``GameLogic.update_participants_and_games`` appends one row per active
+participant per update cycle, so charts and "rank over time" views are plain
+range reads on ``(participation_id, ts)`` / ``(game_id, ts)``. Cycle rows are
+only worth keeping for recent days: older days collapse to their last cycle
+(the day's close), re-tagged ``daily``. Work is done one day per short
+transaction, and re-running is a no-op once a day is compacted.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Optional
+
+from helpers.price_time import MINUTES_PER_DAY, to_ts
+
+logger = logging.getLogger("ValueHistory")
+
+
+def cycle_days() -> int:
+    """``VALUE_HISTORY_CYCLE_DAYS`` (default 30, minimum 1): days of per-cycle rows kept before collapsing to daily."""
+    return max(1, int(os.getenv("VALUE_HISTORY_CYCLE_DAYS", "30")))
+
+
+def compact_value_history(
+    db_name: str,
+    keep_days: Optional[int] = None,
+    *,
+    now: Optional[datetime] = None,
+    log: Optional[logging.Logger] = None,
+) -> dict[str, int]:
+    """
+    Collapse ``cycle`` rows older than ``keep_days`` to one ``daily`` row per participant per day.
+
+    Args:
+        db_name: SQLite database.
+        keep_days: Days (from the start of today, local time) kept per cycle. Defaults to :func:`cycle_days`.
+
+    Returns:
+        Counts: days, rows_deleted, rows_kept (re-tagged ``daily``).
+    """
+    log = log or logger
+    keep_days = cycle_days() if keep_days is None else max(1, keep_days)
+    today = (now or datetime.now()).replace(hour=0, minute=0, second=0, microsecond=0)
+    cutoff = to_ts(today - timedelta(days=keep_days))
+    report = {"days": 0, "rows_deleted": 0, "rows_kept": 0}
+
+    conn = sqlite3.connect(db_name, isolation_level=None, timeout=30)
+    try:
+        days = [
+            int(row[0])
+            for row in conn.execute(
+                f"""SELECT DISTINCT ts / {MINUTES_PER_DAY} FROM participant_value_history
+                WHERE resolution = 'cycle' AND ts < ? ORDER BY 1""",
+                (cutoff,),
+            )
+        ]
+        for day in days:
+            start, end = day * MINUTES_PER_DAY, (day + 1) * MINUTES_PER_DAY
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                deleted = conn.execute(
+                    """DELETE FROM participant_value_history
+                    WHERE ts >= ? AND ts < ? AND (participation_id, ts) NOT IN (
+                        SELECT participation_id, MAX(ts) FROM participant_value_history
+                        WHERE ts >= ? AND ts < ? GROUP BY participation_id
+                    )""",
+                    (start, end, start, end),
+                ).rowcount
+                kept = conn.execute(
+                    """UPDATE participant_value_history SET resolution = 'daily'
+                    WHERE ts >= ? AND ts < ? AND resolution = 'cycle'""",
+                    (start, end),
+                ).rowcount
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            report["days"] += 1
+            report["rows_deleted"] += deleted
+            report["rows_kept"] += kept
+    finally:
+        conn.close()
+
+    log.info(
+        "Value history (cycle<%s): %s day(s) compacted, %s row(s) deleted, %s daily row(s)",
+        (today - timedelta(days=keep_days)).date(),
+        report["days"],
+        report["rows_deleted"],
+        report["rows_kept"],
+    )
+    return report
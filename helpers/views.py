@@ -11,6 +11,8 @@ from io import BytesIO
 if TYPE_CHECKING:
     from helpers.datatype_validation import GameInfo
 
+UNRANKED = "-" # Rank shown for players without a stored rank (pending/inactive).  ASCII, so the fallback bitmap font can draw it
+
 class Pagination(discord.ui.View):
     def __init__(self, interaction: discord.Interaction, page_len:int, embed: discord.Embed, games: Sequence[tuple[str, str] | str], mode: str = 'field', ephemeral: bool = True):
         # Mode field or codeblock
@@ -297,10 +299,10 @@ class LeaderboardImageGenerator:
             row_rect = [0, y_offset, self.width, y_offset + self.row_height]
             draw.rectangle(row_rect, fill=row_color)
             
-            # Rank indicator with special colors for top 3
-            rank = int(player_data.get('rank', idx + 1))
-            rank_text = f"{rank}."
-            rank_color = self._get_rank_color(rank - 1)
+            # Rank indicator with special colors for top 3 (pending/inactive players have no rank)
+            rank = player_data.get('rank')
+            rank_text = f"{int(rank)}." if rank else UNRANKED
+            rank_color = self._get_rank_color(int(rank) - 1) if rank else self.colors['text']
             draw.text((20, y_offset + 15), rank_text, fill=rank_color, font=self.fonts['text'])
             
             # Player name
@@ -0,0 +1,62 @@
+"""Backfill historical prices from Alpaca bars into ``stock_prices``.
+
+Safe to re-run: rows that already exist for a stock/datetime are skipped.
+
+Usage:
+  python scripts/backfill_prices.py --start 2026-01-01 --end 2026-01-31
+  python scripts/backfill_prices.py --start 2026-01-02 --end 2026-01-02 --timeframe 15Min --tickers MSFT BRK-B
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+
+from dotenv import load_dotenv
+
+current_script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root_dir = os.path.dirname(current_script_dir)
+if project_root_dir not in sys.path:
+    sys.path.insert(0, project_root_dir)
+
+from helpers.alpaca_client import AlpacaMarketData
+from helpers.price_backfill import backfill_stock_prices
+from stocks import Backend
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Backfill historical prices from Alpaca bars.")
+    parser.add_argument("--start", required=True, help="First day to load (YYYY-MM-DD)")
+    parser.add_argument("--end", required=True, help="Last day to load (YYYY-MM-DD)")
+    parser.add_argument("--timeframe", default="1Day", help="Alpaca bar timeframe, e.g. 1Day, 1Hour, 15Min")
+    parser.add_argument("--tickers", nargs="*", help="Tickers to load (default: every stock in the DB)")
+    args = parser.parse_args()
+
+    load_dotenv()
+    db_name = os.getenv("DB_NAME")
+    if not db_name:
+        raise SystemExit("Set DB_NAME in .env before running.")
+
+    alpaca = AlpacaMarketData()
+    if not alpaca.configured:
+        raise SystemExit("Set ALPACA_API_KEY and ALPACA_SECRET_KEY in .env before running.")
+
+    be = Backend(db_name=db_name)
+    stats = backfill_stock_prices(
+        be,
+        alpaca,
+        start=args.start,
+        end=args.end,
+        tickers=args.tickers or None,
+        timeframe=args.timeframe,
+    )
+    print(
+        "Done: "
+        f"tickers={stats['tickers']} bars={stats['bars']} inserted={stats['inserted']} "
+        f"skipped={stats['skipped']} unknown={stats['unknown']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Benchmark ``Frontend.buy_stock`` (what ``/buy-stock`` runs) end to end.
+
+Builds a throwaway database with N tickers and one open game full of players,
+then times every buy and counts the SQL statements each one runs. Tickers are
+seeded up front, so no Alpaca access is needed.
+
+Usage:
+  python scripts/benchmark_buy_stock.py
+  python scripts/benchmark_buy_stock.py --players 200 --picks 10 --draft
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Optional
+
+current_script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root_dir = os.path.dirname(current_script_dir)
+if project_root_dir not in sys.path:
+    sys.path.insert(0, project_root_dir)
+
+from stocks import Frontend
+
+
+def seed_database(fe: Frontend, *, tickers: int, players: int, picks: int, draft: bool) -> tuple[str, list[int], list[str]]:
+    """One open game with ``players`` joined players and ``tickers`` known stocks."""
+    symbols = [f"B{i:04d}" for i in range(tickers)]
+    resp = fe.be.sql.send_query(
+        "INSERT OR IGNORE INTO stocks (ticker, exchange, company_name) VALUES (?, ?, ?)",
+        values=[(symbol, "NASDAQ", f"{symbol} Inc.") for symbol in symbols],
+        mode="insert_multi",
+    )
+    if resp.status != "success":
+        raise RuntimeError(f"Failed to seed stocks: {resp}")
+    owner = fe.owner_id
+    game_id = fe.new_game(
+        user_id=owner,
+        name="Buy benchmark",
+        start_date="2099-01-01",
+        pick_date="2099-01-01" if draft else None,
+        total_picks=picks,
+        exclusive_picks=draft,
+    )
+    user_ids = [owner] + list(range(2_000_000, 2_000_000 + players - 1))
+    for user_id in user_ids[1:]:
+        fe.join_game(user_id, game_id)
+    return game_id, user_ids, symbols
+
+
+def run_benchmark(*, tickers: int = 2000, players: int = 50, picks: int = 5, draft: bool = False, db_path: Optional[str] = None) -> dict[str, Any]:
+    """Seed a DB, have every player fill their picks and return per-buy timings (seconds) and statement counts."""
+    if db_path is None:
+        db_path = os.path.join(tempfile.mkdtemp(prefix="stockgame-bench-"), "bench.sqlite")
+    fe = Frontend(database_name=db_path, owner_user_id=1)
+    game_id, user_ids, symbols = seed_database(fe, tickers=tickers, players=players, picks=picks, draft=draft)
+
+    statements = 0
+    original = fe.be.sql._run_query
+
+    def counted(*args: Any, **kwargs: Any) -> Any:
+        nonlocal statements
+        statements += 1
+        return original(*args, **kwargs)
+
+    fe.be.sql._run_query = counted  # type: ignore[method-assign]
+    seconds: list[float] = []
+    per_buy: list[int] = []
+    try:
+        for n, user_id in enumerate(user_ids):
+            for p in range(picks):
+                ticker = symbols[(n * picks + p) % len(symbols)]
+                before = statements
+                t0 = time.perf_counter()
+                fe.buy_stock(user_id, game_id, ticker)
+                seconds.append(time.perf_counter() - t0)
+                per_buy.append(statements - before)
+    finally:
+        fe.be.sql._run_query = original  # type: ignore[method-assign]
+
+    ordered = sorted(seconds)
+    return {
+        "buys": len(seconds),
+        "mean_seconds": statistics.fmean(seconds),
+        "p50_seconds": ordered[len(ordered) // 2],
+        "p95_seconds": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        "statements_per_buy": max(per_buy),
+        "db_path": db_path,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark Frontend.buy_stock.")
+    parser.add_argument("--tickers", type=int, default=2000)
+    parser.add_argument("--players", type=int, default=50)
+    parser.add_argument("--picks", type=int, default=5, help="Picks per player")
+    parser.add_argument("--draft", action="store_true", help="Draft mode game (exclusive picks)")
+    parser.add_argument("--db", help="Database path (default: a temp file)")
+    args = parser.parse_args()
+
+    result = run_benchmark(tickers=args.tickers, players=args.players, picks=args.picks, draft=args.draft, db_path=args.db)
+    print(f"DB: {result['db_path']}")
+    print(f"{result['buys']} buys: mean {result['mean_seconds'] * 1000:.2f}ms, p50 {result['p50_seconds'] * 1000:.2f}ms, p95 {result['p95_seconds'] * 1000:.2f}ms")
+    print(f"SQL statements per buy (max): {result['statements_per_buy']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Benchmark ``GameLogic.update_all`` end to end against the local fake Alpaca server.
+
+Builds a throwaway database with N tickers and some active games, points the
+Alpaca client at ``scripts/fake_alpaca_server.py`` and times each phase of the
+update cycle. No network access or real keys are needed.
+
+Usage:
+  python scripts/benchmark_update_cycle.py --tickers 5000
+  python scripts/benchmark_update_cycle.py --tickers 5000 --latency 0.08 --error-rate 0.02 --rate-limit-rate 0.01 --cycles 3
+  python scripts/benchmark_update_cycle.py --tickers 5000 --batch-sleep 0.35   # real free-tier pacing
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Any, Optional
+
+current_script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root_dir = os.path.dirname(current_script_dir)
+if project_root_dir not in sys.path:
+    sys.path.insert(0, project_root_dir)
+
+import helpers.alpaca_client as alpaca_client
+from scripts.fake_alpaca_server import FakeAlpacaServer, load_fixture
+from stocks import GameLogic
+
+BENCH_ENV = ("ALPACA_API_KEY", "ALPACA_SECRET_KEY", "ALPACA_BASE_URL", "ALPACA_DATA_URL")
+PHASES = (
+    "recurring_games",
+    "update_game_statuses",
+    "update_stock_prices",
+    "update_stock_picks",
+    "update_participants_and_games",
+    "record_days_in_first",
+)
+
+
+def seed_database(logic: GameLogic, *, tickers: int, games: int, players: int, picks: int, seed: int = 0) -> list[str]:
+    """Bulk-load synthetic tickers, then create active games whose players each hold ``picks`` stocks."""
+    be = logic.be
+    symbols = [f"B{i:05d}" for i in range(tickers)]
+    resp = be.sql.send_query(
+        "INSERT OR IGNORE INTO stocks (ticker, exchange, company_name) VALUES (?, ?, ?)",
+        values=[(symbol, "NASDAQ", f"{symbol} Inc.") for symbol in symbols],
+        mode="insert_multi",
+    )
+    if resp.status != "success":
+        raise RuntimeError(f"Failed to seed stocks: {resp}")
+    stock_ids = [stock.id for stock in be.get_many_stocks()]
+
+    rng = random.Random(seed)
+    user_id = 1_000_000
+    for g in range(games):
+        owner = user_id
+        user_ids = list(range(user_id, user_id + players))
+        user_id += players
+        for uid in user_ids:
+            be.add_user(uid, "benchmark")
+        game_id = be.add_game(user_id=owner, name=f"Benchmark {g}", start_date="2000-01-01", total_picks=picks)
+        be.update_game(game_id, status="active")
+        for uid in user_ids:
+            be.add_participant(uid, game_id)
+        for participant in be.get_many_participants(game_id=game_id):
+            be.update_participant(participant.id, status="active")
+            for stock_id in rng.sample(stock_ids, min(picks, len(stock_ids))):
+                be.add_stock_pick(participant.id, stock_id)
+    return symbols
+
+
+def run_benchmark(
+    *,
+    tickers: int = 5000,
+    games: int = 10,
+    players: int = 10,
+    picks: int = 10,
+    cycles: int = 1,
+    batch_sleep: float = 0.0,
+    db_path: Optional[str] = None,
+    server_options: Optional[dict[str, Any]] = None,
+) -> dict[str, Any]:
+    """Seed a DB, run ``cycles`` update cycles against a fake server and return timings (seconds)."""
+    if db_path is None:
+        db_path = os.path.join(tempfile.mkdtemp(prefix="stockgame-bench-"), "bench.sqlite")
+
+    original_sleep = alpaca_client.SLEEP_BETWEEN_BATCHES
+    alpaca_client.SLEEP_BETWEEN_BATCHES = batch_sleep
+    previous_env = {name: os.environ.get(name) for name in BENCH_ENV}
+    try:
+        with FakeAlpacaServer(**(server_options or {})) as server:
+            # Same env the bot reads, so GameLogic builds its own client against the fake server.
+            os.environ.update(
+                ALPACA_API_KEY="benchmark",
+                ALPACA_SECRET_KEY="benchmark",
+                ALPACA_BASE_URL=server.trading_base,
+                ALPACA_DATA_URL=server.data_base,
+            )
+            logic = GameLogic(db_path)
+            started = time.perf_counter()
+            seed_database(logic, tickers=tickers, games=games, players=players, picks=picks)
+            seed_seconds = time.perf_counter() - started
+
+            phase_totals = {name: 0.0 for name in PHASES}
+            for name in PHASES:
+                original = getattr(logic, name)
+
+                def timed(*args: Any, _original=original, _name=name, **kwargs: Any) -> Any:
+                    t0 = time.perf_counter()
+                    try:
+                        return _original(*args, **kwargs)
+                    finally:
+                        phase_totals[_name] += time.perf_counter() - t0
+
+                setattr(logic, name, timed)
+
+            cycle_seconds: list[float] = []
+            for _ in range(cycles):
+                t0 = time.perf_counter()
+                logic.update_all(force=True)
+                cycle_seconds.append(time.perf_counter() - t0)
+
+            resp = logic.be.sql.send_query("SELECT COUNT(*) AS total FROM stock_prices")
+            price_rows = int(resp.result[0]["total"]) if isinstance(resp.result, tuple) else 0
+            server_stats = dict(server.stats)
+    finally:
+        alpaca_client.SLEEP_BETWEEN_BATCHES = original_sleep
+        for name, value in previous_env.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+    return {
+        "tickers": tickers,
+        "participants": games * players,
+        "seed_seconds": seed_seconds,
+        "cycle_seconds": cycle_seconds,
+        "phase_seconds": {name: total / cycles for name, total in phase_totals.items()},
+        "price_rows": price_rows,
+        "server": server_stats,
+        "db_path": db_path,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the update cycle against a fake Alpaca server.")
+    parser.add_argument("--tickers", type=int, default=5000)
+    parser.add_argument("--games", type=int, default=10)
+    parser.add_argument("--players", type=int, default=10, help="Players per game")
+    parser.add_argument("--picks", type=int, default=10, help="Picks per player")
+    parser.add_argument("--cycles", type=int, default=1)
+    parser.add_argument("--batch-sleep", type=float, default=0.0, help="Seconds between snapshot batches (client uses 0.35)")
+    parser.add_argument("--fixture", help="Recorded fixture JSON for the fake server")
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--missing-rate", type=float, default=0.0)
+    parser.add_argument("--db", help="Database path (default: a temp file)")
+    args = parser.parse_args()
+
+    result = run_benchmark(
+        tickers=args.tickers,
+        games=args.games,
+        players=args.players,
+        picks=args.picks,
+        cycles=args.cycles,
+        batch_sleep=args.batch_sleep,
+        db_path=args.db,
+        server_options={
+            "fixture": load_fixture(args.fixture) if args.fixture else None,
+            "latency": args.latency,
+            "error_rate": args.error_rate,
+            "rate_limit_rate": args.rate_limit_rate,
+            "retry_after": args.retry_after,
+            "missing_rate": args.missing_rate,
+        },
+    )
+    print(f"DB: {result['db_path']}")
+    print(f"Seeded {result['tickers']} tickers / {result['participants']} participants in {result['seed_seconds']:.2f}s")
+    for i, seconds in enumerate(result["cycle_seconds"], start=1):
+        print(f"Cycle {i}: {seconds:.2f}s")
+    print("Average per phase:")
+    for name, seconds in result["phase_seconds"].items():
+        print(f"  {name:<32} {seconds:8.3f}s")
+    print(f"Price rows stored: {result['price_rows']}")
+    print(f"Fake server: {result['server']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Downsample old ``stock_prices`` rows (raw -> hourly -> daily OHLC).
+
+The bot already runs this once a day from the update loop; use this to run it
+by hand, e.g. with a one-off VACUUM to shrink the file. Settings default to the
+``PRICE_RETENTION_*`` values in .env; flags override them.
+
+Usage:
+  python scripts/compact_prices.py
+  python scripts/compact_prices.py --raw-days 14 --hourly-days 90 --vacuum
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from dataclasses import replace
+
+from dotenv import load_dotenv
+
+current_script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root_dir = os.path.dirname(current_script_dir)
+if project_root_dir not in sys.path:
+    sys.path.insert(0, project_root_dir)
+
+from db_schema import ensure_database
+from helpers.price_retention import RetentionPolicy, compact_stock_prices
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Downsample old stock prices into hourly/daily OHLC rows.")
+    parser.add_argument("--raw-days", type=int, help="Keep every row newer than this many days")
+    parser.add_argument("--hourly-days", type=int, help="Keep hourly rows newer than this many days; older become daily")
+    parser.add_argument("--batch-size", type=int, help="Max rows deleted per transaction")
+    parser.add_argument("--vacuum", action="store_true", help="VACUUM afterwards to return freed space to the OS")
+    args = parser.parse_args()
+
+    load_dotenv()
+    db_name = os.getenv("DB_NAME")
+    if not db_name:
+        raise SystemExit("Set DB_NAME in .env before running.")
+    ensure_database(db_name)
+
+    policy = RetentionPolicy.from_env()
+    overrides = {
+        "raw_days": args.raw_days,
+        "hourly_days": args.hourly_days,
+        "batch_size": args.batch_size,
+        "vacuum": True if args.vacuum else None,
+    }
+    policy = replace(policy, **{k: v for k, v in overrides.items() if v is not None})
+
+    report = compact_stock_prices(db_name, policy)
+    print(
+        "Done: "
+        f"rows {report['rows_before']} -> {report['rows_after']} "
+        f"(deleted={report['rows_deleted']} hourly={report['hourly_written']} daily={report['daily_written']}) "
+        f"in {report['batches']} batch(es); reclaimed {report['bytes_reclaimed']:,} bytes "
+        f"(file {report['file_bytes_before']:,} -> {report['file_bytes_after']:,})"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+"""
+Local stand-in for the Alpaca REST endpoints the bot uses (offline load testing).
+
+Serves snapshots, the market clock and assets from a recorded fixture, with
+configurable latency, 5xx error rate and 429 rate. Symbols missing from the
+fixture are synthesized from the recorded ones, so a handful of recorded
+snapshots can stand in for thousands of tickers.
+
+Point the client at it with:
+  ALPACA_DATA_URL=http://127.0.0.1:8765/v2
+  ALPACA_BASE_URL=http://127.0.0.1:8765
+
+Usage:
+  python scripts/fake_alpaca_server.py --port 8765 --latency 0.05 --error-rate 0.01 --rate-limit-rate 0.02
+  python scripts/fake_alpaca_server.py --fixture recorded.json
+  python scripts/fake_alpaca_server.py --record recorded.json --symbols AAPL MSFT BRK.B   # needs real keys
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+from urllib.parse import parse_qs, unquote, urlparse
+
+DEFAULT_CLOCK = {
+    "timestamp": "2026-03-02T10:30:00-05:00",
+    "is_open": True,
+    "next_open": "2026-03-03T09:30:00-05:00",
+    "next_close": "2026-03-02T16:00:00-05:00",
+}
+
+
+def default_snapshot(price: float = 100.0) -> dict[str, Any]:
+    """A snapshot shaped like Alpaca's (IEX feed) with every field the client may read."""
+    bar = {"t": "2026-03-02T05:00:00Z", "o": price, "h": price, "l": price, "c": price, "v": 1000, "n": 10, "vw": price}
+    return {
+        "latestTrade": {"t": "2026-03-02T15:29:59.123Z", "x": "V", "p": price, "s": 100, "c": ["@"], "i": 1, "z": "C"},
+        "latestQuote": {"t": "2026-03-02T15:29:59.456Z", "ax": "V", "ap": price + 0.01, "as": 1, "bx": "V", "bp": price - 0.01, "bs": 1, "c": ["R"], "z": "C"},
+        "minuteBar": bar,
+        "dailyBar": bar,
+        "prevDailyBar": bar,
+    }
+
+
+def default_asset(symbol: str) -> dict[str, Any]:
+    return {
+        "id": f"fake-{symbol}",
+        "class": "us_equity",
+        "exchange": "NASDAQ",
+        "symbol": symbol,
+        "name": f"{symbol} Inc.",
+        "status": "active",
+        "tradable": True,
+    }
+
+
+class FakeAlpacaServer:
+    """Threaded HTTP server replaying Alpaca responses.
+
+    Args:
+        fixture: ``{"snapshots": {sym: snap}, "clock": {...}, "assets": {sym: asset}}``; any key may be missing.
+        latency: Seconds added to every response.
+        error_rate: Fraction of requests answered with a 500.
+        rate_limit_rate: Fraction of requests answered with a 429 (``Retry-After: retry_after``).
+        missing_rate: Fraction of requested snapshot symbols silently left out of the response.
+        unknown_symbols: Symbols that never get a snapshot or asset (like a delisted ticker).
+        seed: Seed for the error/429/missing draws so runs are repeatable.
+    """
+
+    def __init__(
+        self,
+        fixture: Optional[dict[str, Any]] = None,
+        *,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after: float = 1.0,
+        missing_rate: float = 0.0,
+        unknown_symbols: Optional[set[str]] = None,
+        seed: int = 0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        fixture = fixture or {}
+        self.snapshots: dict[str, dict[str, Any]] = dict(fixture.get("snapshots") or {})
+        self.assets: dict[str, dict[str, Any]] = dict(fixture.get("assets") or {})
+        self.clock: dict[str, Any] = dict(fixture.get("clock") or DEFAULT_CLOCK)
+        self._templates = list(self.snapshots.values()) or [default_snapshot()]
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.missing_rate = missing_rate
+        self.unknown_symbols = {s.upper() for s in unknown_symbols or ()}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "errors": 0, "rate_limited": 0, "symbols": 0}
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def data_base(self) -> str:
+        return f"{self.url}/v2"
+
+    @property
+    def trading_base(self) -> str:
+        return self.url
+
+    def start(self) -> "FakeAlpacaServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-alpaca", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> "FakeAlpacaServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    def _draw(self) -> float:
+        with self._lock:
+            return self._random.random()
+
+    def snapshot_for(self, symbol: str) -> Optional[dict[str, Any]]:
+        """Recorded snapshot, or one synthesized from a recorded template with a per-symbol price."""
+        if symbol in self.unknown_symbols:
+            return None
+        if symbol in self.snapshots:
+            return self.snapshots[symbol]
+        seed = sum(ord(ch) * (i + 1) for i, ch in enumerate(symbol))
+        template = self._templates[seed % len(self._templates)]
+        base = default_snapshot()["latestTrade"]["p"]
+        recorded = (template.get("latestTrade") or {}).get("p") or base
+        price = round(float(recorded) * (0.5 + (seed % 1000) / 1000), 2)
+        snap = json.loads(json.dumps(template))
+        if isinstance(snap.get("latestTrade"), dict):
+            snap["latestTrade"]["p"] = price
+        if isinstance(snap.get("latestQuote"), dict):
+            snap["latestQuote"].update(ap=price + 0.01, bp=price - 0.01)
+        for section in ("minuteBar", "dailyBar", "prevDailyBar"):
+            if isinstance(snap.get(section), dict):
+                snap[section]["c"] = price
+        return snap
+
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format: str, *args: Any) -> None:  # keep benchmark output clean
+                pass
+
+            def _send(self, status: int, body: Any, headers: Optional[dict[str, str]] = None) -> None:
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self) -> None:  # noqa: N802 (http.server API)
+                with server._lock:
+                    server.stats["requests"] += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                if server.rate_limit_rate and server._draw() < server.rate_limit_rate:
+                    with server._lock:
+                        server.stats["rate_limited"] += 1
+                    self._send(429, {"message": "too many requests."}, {"Retry-After": str(server.retry_after)})
+                    return
+                if server.error_rate and server._draw() < server.error_rate:
+                    with server._lock:
+                        server.stats["errors"] += 1
+                    self._send(500, {"message": "internal server error"})
+                    return
+
+                parsed = urlparse(self.path)
+                query = parse_qs(parsed.query)
+                path = parsed.path.rstrip("/")
+                if path == "/v2/stocks/snapshots":
+                    symbols = [s for s in (query.get("symbols") or [""])[0].upper().split(",") if s]
+                    body = {}
+                    for symbol in symbols:
+                        if server.missing_rate and server._draw() < server.missing_rate:
+                            continue
+                        snap = server.snapshot_for(symbol)
+                        if snap is not None:
+                            body[symbol] = snap
+                    with server._lock:
+                        server.stats["symbols"] += len(symbols)
+                    self._send(200, body)
+                elif path == "/v2/clock":
+                    self._send(200, server.clock)
+                elif path.startswith("/v2/assets/"):
+                    symbol = unquote(path.rsplit("/", 1)[1]).upper()
+                    if symbol in server.unknown_symbols:
+                        self._send(404, {"message": "asset not found"})
+                    else:
+                        self._send(200, server.assets.get(symbol) or default_asset(symbol))
+                else:
+                    self._send(404, {"message": "not found"})
+
+        return Handler
+
+
+def load_fixture(path: str) -> dict[str, Any]:
+    with open(path, encoding="utf-8") as fh:
+        data = json.load(fh)
+    if not isinstance(data, dict):
+        raise ValueError(f"{path}: fixture must be a JSON object")
+    return data
+
+
+def record_fixture(path: str, symbols: list[str]) -> dict[str, Any]:
+    """Record real snapshot/clock/asset responses (needs Alpaca keys) into ``path``."""
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if project_root not in sys.path:
+        sys.path.insert(0, project_root)
+    from helpers.alpaca_client import AlpacaMarketData, to_alpaca_symbol
+
+    alpaca = AlpacaMarketData()
+    alpaca._require_configured()
+    wanted = [to_alpaca_symbol(s) for s in symbols]
+    fixture: dict[str, Any] = {"snapshots": alpaca.fetch_snapshots(wanted, compact=False), "assets": {}}
+    clock = alpaca._get(f"{alpaca.trading_base}/v2/clock")
+    if clock.ok:
+        fixture["clock"] = clock.json()
+    for symbol in wanted:
+        try:
+            fixture["assets"][symbol] = alpaca.get_us_equity(symbol)
+        except Exception as exc:
+            print(f"Skipping asset {symbol}: {exc}")
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(fixture, fh, indent=2, sort_keys=True)
+    return fixture
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve recorded Alpaca responses locally.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fixture", help="Recorded fixture JSON to replay")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--missing-rate", type=float, default=0.0, help="Fraction of snapshot symbols left out")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--record", metavar="PATH", help="Record a fixture from the real API instead of serving")
+    parser.add_argument("--symbols", nargs="*", default=["AAPL", "MSFT", "BRK.B"], help="Symbols to record")
+    args = parser.parse_args()
+
+    if args.record:
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        fixture = record_fixture(args.record, args.symbols)
+        print(f"Recorded {len(fixture['snapshots'])} snapshot(s) to {args.record}")
+        return
+
+    server = FakeAlpacaServer(
+        load_fixture(args.fixture) if args.fixture else None,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        missing_rate=args.missing_rate,
+        seed=args.seed,
+        host=args.host,
+        port=args.port,
+    )
+    print(f"Fake Alpaca listening on {server.url}")
+    print(f"  ALPACA_DATA_URL={server.data_base}")
+    print(f"  ALPACA_BASE_URL={server.trading_base}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+        print(f"Stats: {server.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""Recompute every user's career stats (wins, change $ / %) from all ended games.
+
+The bot adds each game's results as it ends; run this after editing results by
+hand, re-opening an ended game, or if an update was interrupted part-way.
+
+Usage:
+  python scripts/rebuild_career_stats.py
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+
+from dotenv import load_dotenv
+
+current_script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root_dir = os.path.dirname(current_script_dir)
+if project_root_dir not in sys.path:
+    sys.path.insert(0, project_root_dir)
+
+from stocks import Backend
+
+
+def main() -> None:
+    load_dotenv()
+    db_name = os.getenv("DB_NAME")
+    if not db_name:
+        raise SystemExit("Set DB_NAME in .env before running.")
+    Backend(db_name).rebuild_career_stats()  # Creates/migrates the DB first
+    print("Done: career stats rebuilt from ended games.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,14 @@
 # BUILT-IN
+from collections import Counter
+from dataclasses import replace
 from datetime import datetime, timedelta, date
 import logging
 import os
 import random
 import string
 import re
-from typing import Any, Optional, Type, cast, get_args
+import sqlite3
+from typing import Any, Iterable, Optional, Type, cast, get_args
 
 # EXTERNAL
 from dateutil.relativedelta import relativedelta
@@ -20,12 +23,22 @@ import helpers.exceptions as bexc
 from helpers.alpaca_client import AlpacaMarketData, to_alpaca_symbol, to_db_ticker
 from helpers.sqlhelper import SqlHelper, _iso8601, Status
 from helpers.db_backup import maybe_daily_backup, maybe_hourly_backup
-from db_schema import create as create_db
+from helpers import game_cache
+from helpers.game_archive import archive_after_days, archive_enabled, archive_ended_games, archive_path, archived_game_ids, query_archive, run_with_archive
+from helpers.price_columns import columns_dir, export_price_columns
+from helpers.price_retention import compact_stock_prices, retention_enabled
+from helpers.price_time import prefix_range, to_ts
+from helpers.valuation import Holding, TotalUpdate, Valuation, value_picks, value_totals
+from helpers.value_history import compact_value_history
+from db_schema import FREEZE_GAME_RESULTS, RANKED_PARTICIPANTS, REBUILD_CAREER_STATS, REBUILD_CAREER_STATS_WITH_ARCHIVE, create as create_db
 
 load_dotenv() 
 
 version = "???" #TODO should frontend and backend have different versions?
 
+GAME_ID_ATTEMPTS = 10 # Random game IDs tried before `add_game` gives up
+
+
 class Backend:
     # Raise Exceptions if bad data is passed in
     # Most of these expect that the data being sent has been checked or otherwise verified.  End users should not interact directly with this
@@ -43,6 +56,11 @@ class Backend:
         create_db(db_name) # Try to create DB
         self.logger = logging.getLogger('StockBackend')
         self.sql = SqlHelper(db_name)
+        self.archive_db = archive_path(db_name) # Archived (old, ended) games, see `helpers.game_archive`
+        self._known_users: Optional[set[int]] = None # Registered user IDs, loaded on first use (see `is_registered`)
+        self.game_cache = game_cache.for_db(db_name) # Validated games, shared with every Backend on this DB
+        self.repair_queue = game_cache.repair_queue_for(db_name) # Invalid games skipped by listings, see `repair_queued_games`
+        self.game_ids = game_cache.id_stats_for(db_name) # `add_game`'s ID counters, shared with every Backend on this DB
         self.logger.info('Initiated new Backend instance.')
         
 
@@ -99,6 +117,91 @@ class Backend:
         else:
             raise Exception(f'Failed to get items.', resp)
         
+    def _many_get_games(self, resp:Status, archived:bool=False)-> tuple[dtv.Game, ...]:
+        """`_many_get` for game rows, validated one row at a time
+
+        A row that fails validation is skipped (and queued for `repair_queued_games` unless it's `archived`) instead of failing the whole list.
+
+        Raises:
+            LookupError(No items found):  Raised if no valid games are found.
+        """
+        if resp.status != 'success':
+            return self._many_get(typeadapter=dtv.Games, resp=resp) # Raises
+        assert isinstance(resp.result, tuple)
+        games = []
+        for row in resp.result:
+            try:
+                games.append(dtv.Game.model_validate(row))
+            except ValidationError as exc:
+                self.logger.warning(f"Skipping invalid game: {row.get('game_id')}.  {exc.error_count()} validation error(s)")
+                if not archived:
+                    self.repair_queue.add(row['game_id'])
+        if not games:
+            raise LookupError('No items found')
+        return tuple(games)
+
+    def _archive_get(self, query:str, values:Optional[list]=None) -> Status:
+        """Run a read on the archive file (see `helpers.game_archive`).  Answers like `self.sql.send_query`"""
+        return query_archive(self.archive_db, query, values)
+
+    def _is_archived(self, game_id:int | str) -> bool:
+        """Whether a game was moved to the archive file.  In memory after the first call (see `archived_game_ids`)"""
+        return str(game_id) in archived_game_ids(self.archive_db)
+
+    def _keyset_select(self, table:str, key:str, where:list[str], values:list, order:Optional[list[str]]=None, descending:bool=False, limit:Optional[int]=None, after:Optional[int | str]=None, join:str='', cursor:Optional[list]=None) -> tuple[str, list]:
+        """Build a `SELECT *`, keyset paginated when `limit` or `after` is given
+
+        Pages are sorted by `order`, then `key` (all in one direction).  `after` is the `key` of the last row of the previous page, and the page starts right after wherever that row sorts now.  Unlike `OFFSET`, the rows before the page are never read.
+
+        Args:
+            table (str): Table name.  Not injection safe.
+            key (str): Unique column, used as the cursor and tiebreaker.
+            where (list[str]): Conditions (with `?` placeholders), joined with AND.
+            values (list): Values for `where`.
+            order (Optional[list[str]], optional): Sort expressions before `key`.  They can't be NULL (wrap nullable columns in `COALESCE`).
+            descending (bool, optional): Sort descending.
+            limit (Optional[int], optional): Page size.
+            after (Optional[int | str], optional): Cursor (`key` of the last row already shown).
+            join (str, optional): JOIN clause.
+            cursor (Optional[list], optional): `order` values of the `after` row, when it may not be in this database (merging with the archive).  Looked up with a subquery by default.
+
+        Returns:
+            tuple: Query and its values.
+        """
+        if limit is not None and limit < 1:
+            raise ValueError('`limit` must be atleast `1`.')
+        where, values = list(where), list(values)
+        columns = [*(order or []), f'{table}.{key}']
+        if after is not None:
+            if order and cursor is None:
+                bound = f"(SELECT {', '.join(columns)} FROM {table} WHERE {table}.{key} = ?)"
+            else:
+                bound = f"({', '.join('?' for _ in columns)})"
+                values.extend(cursor or [])
+            where.append(f"({', '.join(columns)}) {'<' if descending else '>'} {bound}")
+            values.append(after)
+        query = f"SELECT * FROM {table}{' ' + join if join else ''}"
+        if where:
+            query += ' WHERE ' + ' AND '.join(where)
+        paged = limit is not None or after is not None
+        if order or paged: # Unpaged lists keep their old order, the key only breaks ties between pages
+            query += ' ORDER BY ' + ', '.join(f"{column} {'DESC' if descending else 'ASC'}" for column in (columns if paged else order or []))
+        if limit is not None:
+            query += ' LIMIT ?'
+            values.append(int(limit))
+        return query, values
+
+    def _count(self, table:str, where:list[str], values:list, archive:bool=False) -> int:
+        """`COUNT(*)` of a table's matching rows (in the archive file when `archive`)"""
+        query = f"SELECT COUNT(*) AS total FROM {table}{' WHERE ' + ' AND '.join(where) if where else ''}"
+        resp = self._archive_get(query, values) if archive else self.sql.send_query(query, values=values)
+        if resp.status != 'success':
+            if archive and resp.reason == 'NO ROWS RETURNED': # No archive yet
+                return 0
+            raise Exception(f'Failed to count {table}.', resp)
+        assert isinstance(resp.result, tuple)
+        return int(resp.result[0]['total'])
+
     def _validate_date(self, date:str, format:str='%Y-%m-%d')-> bool: # #TODO is this really needed anymore?
         """Attempt to validate a string formatted date
 
@@ -159,6 +262,8 @@ class Backend:
         if resp.status != 'success': #TODO errors
             if resp.reason == 'SQLITE_CONSTRAINT_PRIMARYKEY': # User already in the database
                 self.logger.debug(f'User {user_id} already registered.')
+                if self._known_users is not None:
+                    self._known_users.add(int(user_id))
                 raise bexc.UserExistsError(user_id=user_id)
             self.logger.error(f'Failed to add user: {user_id}. Reason: {resp}')
             if resp.reason == 'SQLITE_MISMATCH': # Invalid data in one of the fields
@@ -167,6 +272,8 @@ class Backend:
                 raise Exception(f'Failed to add user.', resp)
         else:
             self.logger.debug(f'Added user {user_id}.')
+            if self._known_users is not None:
+                self._known_users.add(int(user_id))
             
         
     def get_user(self, user_id:int) -> dtv.User:
@@ -252,16 +359,37 @@ class Backend:
         """
         
         self._delete_single(table="users", id_column='user_id', item_id=user_id)
+        if self._known_users is not None:
+            self._known_users.discard(int(user_id))
+
+    def is_registered(self, user_id:int) -> bool:
+        """Whether a user is in the database, without a query once the known IDs are loaded
+
+        IDs are loaded once, then kept up to date by `add_user` / `remove_user`.  Users added by another
+        process read as unregistered until `add_user` is tried for them.
+
+        Args:
+            user_id (int): User ID.
+        """
+        if self._known_users is None:
+            resp = self.sql.send_query("SELECT user_id FROM users")
+            if resp.status != 'success' and resp.reason != 'NO ROWS RETURNED':
+                raise Exception('Failed to load user IDs.', resp)
+            self._known_users = {int(row['user_id']) for row in resp.result} if isinstance(resp.result, tuple) else set()
+        return int(user_id) in self._known_users
     
     
     def generate_alnum_id(self) -> str:
-        chars = chars = string.ascii_uppercase + string.digits
-        id = ''.join(random.choices(chars, k=5))
-        try:
-            self.get_game(id)
-            return self.generate_alnum_id()
-        except LookupError:
-            return id
+        """Random 5 character game ID candidate (A-Z, 0-9)
+
+        Not checked against the database, `add_game` retries the INSERT on a collision.
+        """
+        chars = string.ascii_uppercase + string.digits
+        return ''.join(random.choices(chars, k=5))
+
+    def game_id_stats(self) -> dict[str, int | float]:
+        """Game ID allocation counters for monitoring, across every Backend on this database: allocated, collisions (random IDs already taken) and collision_rate (collisions per allocated game)"""
+        return self.game_ids.stats()
 
     # # GAME ACTIONS # #
     def add_game(self, user_id:int, name:str, start_date:str | date, end_date:Optional[str | date]=None, starting_money:float=10000.00, pick_date:Optional[str | date]=None, private_game:bool=False, total_picks:int=10, exclusive_picks:bool=False, sell_during_game:bool=False, update_frequency:dtv.UpdateFrequency='alpaca', template_id:Optional[int]=None) -> str:
@@ -337,11 +465,8 @@ class Backend:
         if total_picks < 1:
             raise ValueError('`total_picks` must be atleast `1`.')
         
-        game_id = self.generate_alnum_id()
-
         items = {
             'name': name,
-            'game_id': game_id,
             'template_id': template_id,
             'owner_user_id': user_id,
             'start_money': starting_money,
@@ -356,13 +481,22 @@ class Backend:
             'datetime_created': _iso8601()
             }
 
-        resp = self.sql.insert(table='games', items=items)
-        if resp.status != 'success': #TODO errors
+        for _ in range(GAME_ID_ATTEMPTS): # Taken IDs are rejected by the primary key, so just try another
+            game_id = self.generate_alnum_id()
+            if game_id in archived_game_ids(self.archive_db): # Read once, then kept in memory
+                resp = Status(status='error', reason='SQLITE_CONSTRAINT_PRIMARYKEY', result='games.game_id', more_info='Archived game ID')
+            else:
+                resp = self.sql.insert(table='games', items=items | {'game_id': game_id})
+            if resp.status == 'success':
+                self.game_ids.record_allocation()
+                return game_id
             if resp.reason == 'SQLITE_CONSTRAINT_UNIQUE' and str(resp.result).strip() == 'games.name':
                 raise bexc.AlreadyExistsError(table='games', duplicate=name, message='Cannot add multiple games with the same name')
-
-            raise Exception(f'Failed to add game.', resp) 
-        return game_id
+            if resp.reason != 'SQLITE_CONSTRAINT_PRIMARYKEY':
+                raise Exception(f'Failed to add game.', resp) 
+            self.game_ids.record_collision()
+            self.logger.warning(f'Game ID {game_id} already taken ({self.game_ids.collisions} collision(s) in {self.game_ids.allocated} game(s)), retrying')
+        raise Exception(f'Failed to add game, no free game ID after {GAME_ID_ATTEMPTS} attempts.')
     
     def get_game(self, game_id:int | str)-> dtv.Game: # Its always a Games object, but its being a fucking baby
         """Get a single game by ID
@@ -374,13 +508,20 @@ class Backend:
             dict: Game information.
         """
         
+        cached = self.game_cache.get(game_id)
+        if cached is not None:
+            return cached
         self.logger.debug(f'Getting game: {game_id}')
         tobsi_loop = 0 # Issue originally found by @tobsi on discord
         while tobsi_loop < 4: # Should allow it to fix some issues
             tobsi_loop += 1
             resp = self.sql.get(table='games',filters={'game_id': game_id})
+            if resp.reason == 'NO ROWS RETURNED': # Maybe archived
+                resp = self._archive_get("SELECT * FROM games WHERE game_id = ?", [str(game_id)])
             try:
-                return self._single_get(model=dtv.Game, resp=resp)
+                game = self._single_get(model=dtv.Game, resp=resp)
+                self.game_cache.put(game_id, game)
+                return game
             except ValidationError as exc: # Something has gone terribly wrong
                 self.logger.exception(f'Game exists, but validation failed', exc_info=exc)
                 # Reset values back to their defaults #TODO add more
@@ -417,7 +558,21 @@ class Backend:
 
         raise ValidationError('Failed to recover from a validation error loop.')
     
-    def get_many_games(self, name:Optional[str]=None, owner_id:Optional[int]=None, include_public:bool=True, include_private:bool=False, include_open:bool=True, include_active:bool=True, include_ended:bool=False)-> tuple[dtv.Game]: # List all games
+    def _games_where(self, name:Optional[str]=None, owner_id:Optional[int]=None, include_public:bool=True, include_private:bool=False, include_open:bool=True, include_active:bool=True, include_ended:bool=False) -> tuple[list[str], list]:
+        """`get_many_games` filters as SQL conditions and values"""
+        privacy = [value for value, included in ((0, include_public), (1, include_private)) if included]
+        statuses = [value for value, included in (('open', include_open), ('active', include_active), ('ended', include_ended)) if included]
+        where = [f"private_game IN ({', '.join('?' for _ in privacy)})", f"status IN ({', '.join('?' for _ in statuses)})"]
+        values: list = [*privacy, *statuses]
+        if name:
+            where.append('name LIKE ?')
+            values.append(name)
+        if owner_id:
+            where.append('owner_user_id = ?')
+            values.append(owner_id)
+        return where, values
+
+    def get_many_games(self, name:Optional[str]=None, owner_id:Optional[int]=None, include_public:bool=True, include_private:bool=False, include_open:bool=True, include_active:bool=True, include_ended:bool=False, limit:Optional[int]=None, after:Optional[str]=None)-> tuple[dtv.Game, ...]: # List all games
         """Get multiple games
 
         Args:
@@ -428,49 +583,67 @@ class Backend:
             include_open (bool, optional): Include open games in results. Defaults to True.
             include_active (bool, optional): Include active games in results. Defaults to True.
             include_ended (bool, optional): Include ended games in results. Defaults to False.
+            limit (Optional[int], optional): Page size.  Pages are ordered by game ID.
+            after (Optional[str], optional): Game ID of the last game on the previous page.
 
         Returns:
             tuple: Matching games.
         """
-           
-        query = """WHERE private_game IN ({privacy})
-        AND STATUS IN ({statuses})
+        where, values = self._games_where(name, owner_id, include_public, include_private, include_open, include_active, include_ended)
+        archived: tuple = ()
+        if include_ended and (include_public or include_private): # Old ended games live in the archive
+            try:
+                archive_where, archive_values = self._games_where(name, owner_id, include_public, include_private, False, False, True)
+                archived = self._many_get_games(self._archive_get(*self._keyset_select('games', 'game_id', archive_where, archive_values, limit=limit, after=after)), archived=True)
+            except LookupError:
+                pass
+
+        query, values = self._keyset_select('games', 'game_id', where, values, limit=limit, after=after)
+        try:
+            games = self._many_get_games(self.sql.send_query(query, values=values)) + archived # Invalid games are skipped and queued for repair
+        except LookupError:
+            if not archived:
+                raise
+            games = archived
+        if limit is not None and archived: # Merge the two pages
+            games = tuple(sorted(games, key=lambda game: str(game.id))[:limit])
+        return games
+
+    def count_many_games(self, name:Optional[str]=None, owner_id:Optional[int]=None, include_public:bool=True, include_private:bool=False, include_open:bool=True, include_active:bool=True, include_ended:bool=False) -> int:
+        """Number of games `get_many_games` matches with these filters (for page counts)"""
+        where, values = self._games_where(name, owner_id, include_public, include_private, include_open, include_active, include_ended)
+        total = self._count('games', where, values)
+        if include_ended and (include_public or include_private):
+            total += self._count('games', *self._games_where(name, owner_id, include_public, include_private, False, False, True), archive=True)
+        return total
+
+    def get_games(self, game_ids:Iterable[int | str])-> tuple[dtv.Game, ...]:
+        """Get several games by ID in one query (archived games are looked up in the archive)
+
+        Args:
+            game_ids (Iterable[int | str]): Game IDs.  Unknown IDs are skipped.
+
+        Returns:
+            tuple: Games found, in no particular order.
         """
-        
-        values =[]
-        if name:
-            query += 'AND name LIKE ?'
-            values.append(name)
-        if owner_id:
-            query += 'AND owner_user_id = ?'
-            values.append(owner_id)
-        
-        privacy = [] # privacy
-
-        if include_public:
-            privacy.append('0')
-        if include_private:
-            privacy.append('1')
-        
-        statuses = [] # status
-        if include_open:
-            statuses.append('"open"')
-        if include_active:
-            statuses.append('"active"')
-        if include_ended:
-            statuses.append('"ended"')
-        
-        repair= 0
-        e = ''
-        while repair < 2: # Try this twice
-            resp = self.sql.get(table='games', filters=(query.format(statuses='' +','.join(statuses), privacy='' +','.join(privacy)), values))
-            repair +=1
+        ids = list(dict.fromkeys(str(game_id) for game_id in game_ids))
+        if not ids:
+            return ()
+        resp = self.sql.send_query(f"SELECT * FROM games WHERE game_id IN ({', '.join('?' for _ in ids)})", values=ids)
+        try:
+            games = self._many_get_games(resp)
+        except LookupError:
+            games = ()
+        missing = set(ids) - {str(game.id) for game in games}
+        if missing:
             try:
-                return self._many_get(typeadapter=dtv.Games, resp=resp)
-            except ValidationError as e: # Something bad happened
-                self.repair_games() # Repair games and loop again
-        
-        raise Exception('Failed to repair games', e)
+                games += self._many_get_games(
+                    self._archive_get(f"SELECT * FROM games WHERE game_id IN ({', '.join('?' for _ in missing)})", list(missing)),
+                    archived=True,
+                )
+            except LookupError:
+                pass
+        return games
         
     def update_game(self, game_id:int | str, owner:Optional[int]=None, name:Optional[str]=None, start_date:Optional[str]=None, end_date:Optional[str]=None, status:Optional[str]=None, starting_money:Optional[float]=None, pick_date:Optional[str]=None, private_game:Optional[bool]=None, total_picks:Optional[int]=None, exclusive_picks:Optional[bool]=None, sell_during_game:Optional[bool]=None, update_frequency:Optional[dtv.UpdateFrequency]=None, aggregate_value:Optional[float]=None, change_dollars:Optional[float]=None, change_percent:Optional[float]=None, leaderboard_message_id:Optional[str]=None, clear_leaderboard_message:bool=False, clear_end_date:bool=False, clear_pick_date:bool=False):
         """Update an existing game
@@ -481,7 +654,7 @@ class Backend:
             name (Optional[str], optional): New game name.  Maximum 35 chatacters.
             start_date (Optional[str], optional): New start date.  Format: `YYYY-MM-DD`.  Cannot be changed once game has started.
             end_date (Optional[str], optional): New end date.  Format: `YYYY-MM-DD`.
-            status (Optional[str], optional): Status ('open', 'active', 'ended').  Once start date has passed, game will become 'active'.  Shouldn't be changed manually.
+            status (Optional[str], optional): Status ('open', 'active', 'ended').  Once start date has passed, game will become 'active'.  Shouldn't be changed manually.  Cannot be changed once the game is finalized.
             starting_money (Optional[float], optional): Starting money.  Cannot be changed once game has started.
             pick_date (Optional[str], optional): Pick date.  Format: `YYYY-MM-DD`.  Cannot be changed once game has started.
             private_game (Optional[bool], optional): Game privacy. 
@@ -505,6 +678,8 @@ class Backend:
         if game.start_date < datetime.today().date():
             if any(value is not None for value in (start_date, starting_money, pick_date, exclusive_picks)) or clear_pick_date:
                 raise ValueError('Cannot update `start_date`, `starting_money`, `pick_date`, or `exclusive_picks` once game has started.')
+        if game.finalized and status is not None and status != game.status: # Results are frozen and counted in career stats
+            raise ValueError('Cannot change `status` once game results are finalized.')
             
         if end_date: # Enddate stuff
             if not self._validate_date(end_date):
@@ -548,6 +723,8 @@ class Backend:
         except ValueError as e: # Raised when Constraint check fails
             if 'CHECK constraint failed:' in str(e):
                 raise ValueError(str(e).strip('IntegrityError(\'CHECK constraint failed:').strip(')')) # Pass on just the field that failed #TODO regex
+        finally:
+            self.game_cache.invalidate([game_id])
 
     def remove_game(self, game_id:int | str):
         """Remove a game
@@ -556,8 +733,27 @@ class Backend:
             game_id (int): Game ID.
         """
         
-        self._delete_single(table='games', id_column='game_id', item_id=game_id)
+        try:
+            self._delete_single(table='games', id_column='game_id', item_id=game_id)
+        finally:
+            self.game_cache.invalidate([game_id])
     
+    def repair_queued_games(self) -> int:
+        """Repair the games listings skipped as invalid (see `_many_get_games`), using `get_game`'s fixes
+
+        Returns:
+            int: Games that validate now.
+        """
+        repaired = 0
+        for game_id in self.repair_queue.drain():
+            self.game_cache.invalidate([game_id])
+            try:
+                self.get_game(game_id)
+                repaired += 1
+            except Exception as e:
+                self.logger.exception(f'Unable to repair game: {game_id}', exc_info=e)
+        return repaired
+
     def repair_games(self):
         # Repair games in database
         resp = self.sql.get(table='games', columns=['game_id']) # Get ALL games
@@ -712,6 +908,7 @@ class Backend:
             filters={'template_id': int(template_id)},
             force=False,
         )
+        self.game_cache.clear() # Whichever games were detached
         if clear.status != 'success' and clear.reason not in ('NO ROWS RETURNED', 'NO ROWS EFFECTED'):
             raise Exception(f'Failed to detach games from template {template_id}.', clear)
         resp = self.sql.delete(table='game_templates', filters={'template_id': int(template_id)})
@@ -800,29 +997,39 @@ class Backend:
             raise last_error
         raise LookupError(f'Stock not found: {ticker_or_id}')
         
-    def get_many_stocks(self, company_name:Optional[str]=None, exchange:Optional[str]=None, tickers_only:bool=False)-> tuple[dtv.Stock]:
+    def _stocks_where(self, company_name:Optional[str]=None, exchange:Optional[str]=None) -> tuple[list[str], list]:
+        """`get_many_stocks` filters as SQL conditions and values"""
+        filters = {
+            'company_name': company_name,
+            'exchange': exchange
+            }
+        return [f'{column} = ?' for column, value in filters.items() if value is not None], [value for value in filters.values() if value is not None]
+
+    def get_many_stocks(self, company_name:Optional[str]=None, exchange:Optional[str]=None, tickers_only:bool=False, limit:Optional[int]=None, after:Optional[int]=None)-> tuple[dtv.Stock]:
         """Get multiple stocks
 
         Args:
             company_name (Optional[str], optional): Filter by company name.
             exchange (Optional[str], optional): Filter by exchange.
             tickers_only (bool, optional): Only return tickers. Defaults to False.
+            limit (Optional[int], optional): Page size.  Pages are ordered by stock ID.
+            after (Optional[int], optional): Stock ID of the last stock on the previous page.
 
         Returns:
             tuple: Matching stocks.
         """
-        filters = {
-            'company_name': company_name,
-            'exchange': exchange
-            }
-
-        resp = self.sql.get(table='stocks', filters=filters)
+        query, values = self._keyset_select('stocks', 'stock_id', *self._stocks_where(company_name, exchange), limit=limit, after=after)
+        resp = self.sql.send_query(query, values=values)
         stocks = self._many_get(typeadapter=dtv.Stocks, resp=resp)
         if tickers_only:
             tickers = tuple(stock.ticker for stock in stocks)
             return tickers
         else:
             return stocks
+
+    def count_many_stocks(self, company_name:Optional[str]=None, exchange:Optional[str]=None) -> int:
+        """Number of stocks `get_many_stocks` matches with these filters (for page counts)"""
+        return self._count('stocks', *self._stocks_where(company_name, exchange))
     
     def remove_stock(self, ticker_or_id:str | int): 
         """Remove a stock
@@ -843,28 +1050,103 @@ class Backend:
         Args:
             ticker_or_id (str | int): Stock ID (int) or ticker (str).
             price (float): Stock price.
-            datetime (str, optional): Price datetime Format:`YYYY-MM-DD HH:MM:SS`.  If not provided, current datetime will be used.
+            datetime (str, optional): Price datetime Format:`YYYY-MM-DD HH:MM:SS`.  If not provided, current datetime will be used.  Stored to the minute.
         
         Raises:
+            ValueError: Invalid `datetime` format.
             LookupError: Invalid Stock ID/Ticker.
         """
-        if datetime and not self._validate_date(datetime, '%Y-%m-%d %H:%M:%S'): #Try to validate date
+        try:
+            ts = to_ts(datetime or _iso8601()) # Current datetime if date was not provided
+        except ValueError:
             raise ValueError('Invalid `datetime` format.')
-        elif not datetime:
-            datetime = _iso8601() # Current datetime as string if date was not provided
             
         stock_id = self.get_stock(ticker_or_id).id #If stock is invalid, an error will be thrown anyway.
         
         items = {
             'stock_id':int(stock_id), 
             'price': float(price), 
-            'datetime': str(datetime)
+            'ts': ts
             }
         
         resp = self.sql.insert(table='stock_prices', items=items)
         if resp.status != 'success': #TODO errors
                 raise Exception(f'Failed to add stock price for {ticker_or_id}.', resp)
-    
+
+    def add_many_stock_prices(self, prices:list[dict], replace:bool=False) -> int:
+        """Bulk add price rows in a single statement (idempotent)
+
+        Rows that already exist for the same stock and minute are skipped, so re-running a load is safe.
+
+        Args:
+            prices (list[dict]): Rows with `stock_id` (int), `price` (float) and either `datetime` (`YYYY-MM-DD HH:MM:SS` or a datetime) or `ts` (epoch minute), optionally `price_type` (default `raw`) and `open`/`high`/`low`.  Rows are expected to be pre-validated.
+            replace (bool, optional): Overwrite the price of rows that already exist instead of skipping them (used by the streaming feed, which refines the current minute). Defaults to False.
+
+        Returns:
+            int: Rows written (inserted, or updated with `replace`), from the statement's own row count.
+        """
+        if not prices:
+            return 0
+        columns = "(stock_id, price, ts, price_type, open, high, low) VALUES (?, ?, ?, ?, ?, ?, ?)"
+        if replace:
+            query = f"""INSERT INTO stock_prices {columns}
+            ON CONFLICT (stock_id, ts) DO UPDATE SET price = excluded.price"""
+        else:
+            query = f"INSERT OR IGNORE INTO stock_prices {columns}"
+        values = [
+            (
+                int(row['stock_id']),
+                float(row['price']),
+                int(row['ts']) if row.get('ts') is not None else to_ts(row['datetime']),
+                str(row.get('price_type') or 'raw'),
+                row.get('open'),
+                row.get('high'),
+                row.get('low'),
+            )
+            for row in prices
+        ]
+        conn = sqlite3.connect(self.sql.db, timeout=30) # SqlHelper doesn't report executemany's row count
+        try:
+            conn.execute("PRAGMA foreign_keys = ON")
+            with conn:
+                return conn.executemany(query, values).rowcount
+        except sqlite3.Error as e:
+            raise Exception('Failed to add stock prices.', e)
+        finally:
+            conn.close()
+
+    def get_stream_holdings(self, update_frequencies:tuple[dtv.UpdateFrequency, ...]=('realtime', 'minute')) -> tuple[dict, ...]:
+        """List the stocks held in active games with the given update frequencies
+
+        Covers every pick that still needs a price (`pending_buy`, `owned`, `pending_sell`) for active players.
+
+        Args:
+            update_frequencies (tuple, optional): Game update frequencies to include. Defaults to ('realtime', 'minute').
+
+        Returns:
+            tuple[dict, ...]: Rows with `game_id`, `stock_id` and `ticker`, one per game/stock pair.  Empty if nothing is held.
+        """
+        if not update_frequencies:
+            return ()
+        placeholders = ', '.join('?' for _ in update_frequencies)
+        query = f"""SELECT DISTINCT g.game_id, s.stock_id, s.ticker
+            FROM stock_picks sp
+            JOIN stocks s ON s.stock_id = sp.stock_id
+            JOIN game_participants gp ON gp.participation_id = sp.participation_id
+            JOIN games g ON g.game_id = gp.game_id
+            WHERE g.status = 'active'
+            AND g.update_frequency IN ({placeholders})
+            AND gp.status = 'active'
+            AND sp.status IN ('pending_buy', 'owned', 'pending_sell')
+            ORDER BY s.ticker, g.game_id"""
+        resp = self.sql.send_query(query, values=list(update_frequencies))
+        if resp.status == 'success':
+            assert isinstance(resp.result, tuple)
+            return resp.result
+        if resp.reason == 'NO ROWS RETURNED':
+            return ()
+        raise Exception('Failed to list streamed holdings.', resp)
+
     def get_stock_price(self, price_id:int) -> dtv.StockPrice:
         """Get a single stock price by ID.
 
@@ -884,63 +1166,165 @@ class Backend:
             stock_id (str, optional): Filter by a stock ID. Defaults to None.
             date (str, optional): Filter by a date.  Formats:  `YYYY-MM-DD HH:MM:SS`, `YYYY-MM-DD`, `YYYY-MM-DD HH:`, etc..  Will use todays DATE if blank.
 
+        Raises:
+            ValueError: Unsupported `datetime` prefix.
+            LookupError: No prices found.
+
         Returns:
-            list: Stock price info
+            list: Stock price info (most recent first)
         """
-        if not datetime:
-            datetime = _iso8601('date')
-        order = {'datetime': 'DESC'}  # Sort by price date (recent first)
-        filters = {
-            'stock_id': stock_id, 
-            ('LIKE', 'datetime'): datetime + '%' # Match like objects #TODO NOT 100% INJECTION SAFE
-            } 
+        start, end = prefix_range(datetime or _iso8601('date'))
+        query = "SELECT * FROM stock_prices WHERE ts >= ? AND ts < ?"
+        values: list = [start, end]
+        if stock_id is not None:
+            query += " AND stock_id = ?"
+            values.append(int(stock_id))
+        query += " ORDER BY ts DESC"
 
-        resp = self.sql.get(table='stock_prices',filters=filters, order=order) 
+        resp = self.sql.send_query(query, values=values)
         return self._many_get(typeadapter=dtv.StockPrices, resp=resp)
+
+    def get_prices_between(self, stock_id:int, start:str | datetime, end:str | datetime)-> tuple[dtv.StockPrice]:
+        """List a stock's prices in a datetime range (oldest first).
+
+        Args:
+            stock_id (int): Stock ID.
+            start (str | datetime): Inclusive start, `YYYY-MM-DD[ HH:MM:SS]` or a datetime.
+            end (str | datetime): Exclusive end, same formats.
+
+        Raises:
+            ValueError: Invalid `start`/`end`.
+            LookupError: No prices in range.
+        """
+        query = """SELECT * FROM stock_prices
+            WHERE stock_id = ? AND ts >= ? AND ts < ?
+            ORDER BY ts"""
+        resp = self.sql.send_query(query, values=[int(stock_id), to_ts(start), to_ts(end)])
+        return self._many_get(typeadapter=dtv.StockPrices, resp=resp)
+
+    def get_price_at_or_before(self, stock_id:int, when:Optional[str | datetime]=None)-> dtv.StockPrice:
+        """Get the latest price for a stock at or before a moment.
+
+        Args:
+            stock_id (int): Stock ID.
+            when (str | datetime, optional): `YYYY-MM-DD[ HH:MM:SS]` or a datetime.  A bare date means the start of that day.  Defaults to now.
+
+        Raises:
+            ValueError: Invalid `when`.
+            LookupError: No price at or before `when`.
+        """
+        query = """SELECT * FROM stock_prices
+            WHERE stock_id = ? AND ts <= ?
+            ORDER BY ts DESC LIMIT 1"""
+        resp = self.sql.send_query(query, values=[int(stock_id), to_ts(when or _iso8601())])
+        return self._single_get(model=dtv.StockPrice, resp=resp)
     
     
     # # STOCK PICK ACTIONS # #
-    def add_stock_pick(self, participant_id:int, stock_id:int,): # This is essentially putting in a buy order. End users should not be interacting with this directly    
+    def get_pick_context(self, participant_id:Optional[int]=None, user_id:Optional[int]=None, game_id:Optional[int | str]=None, ticker:Optional[str]=None)-> dtv.PickContext:
+        """Participant, game rules, open pick count and (optionally) a stock, from one query
+
+        Args:
+            participant_id (Optional[int], optional): Participant ID.  Or use `user_id` and `game_id`.
+            user_id (Optional[int], optional): User ID.
+            game_id (Optional[int | str], optional): Game ID.
+            ticker (Optional[str], optional): Also look up this stock (any class-share spelling, see `get_stock`).
+
+        Raises:
+            bexc.DoesntExistError: Player not in game.
+        """
+        columns = """p.participation_id, p.user_id, p.game_id, p.status, g.pick_date, g.pick_count, g.draft_mode,
+            (SELECT COUNT(*) FROM stock_picks sp WHERE sp.participation_id = p.participation_id
+                AND sp.status IN ('pending_buy', 'owned', 'pending_sell')) AS open_picks"""
+        join = ''
+        values: list = []
+        if ticker is not None:
+            raw = str(ticker).strip().upper()
+            candidates = list(dict.fromkeys([raw, to_db_ticker(raw), to_alpaca_symbol(raw)]))
+            columns += ', s.stock_id, s.ticker, s.exchange, s.company_name'
+            join = f"""LEFT JOIN stocks s ON s.stock_id = (SELECT stock_id FROM stocks WHERE ticker IN ({', '.join('?' for _ in candidates)})
+                ORDER BY {' '.join(['CASE ticker'] + [f'WHEN ? THEN {n}' for n in range(len(candidates))] + ['END'])} LIMIT 1)"""
+            values += candidates + candidates
+        if participant_id is not None:
+            where = 'p.participation_id = ?'
+            values.append(int(participant_id))
+        else:
+            where = 'p.user_id = ? AND p.game_id = ?'
+            values += [user_id, str(game_id)]
+        resp = self.sql.send_query(
+            f"SELECT {columns} FROM game_participants p JOIN games g ON g.game_id = p.game_id {join} WHERE {where}",
+            values=values,
+        )
+        try:
+            return self._single_get(model=dtv.PickContext, resp=resp)
+        except LookupError:
+            raise bexc.DoesntExistError(table='game_participants', item=participant_id or user_id, message='Player not in game')
+
+    def _check_pick(self, context:dtv.PickContext):
+        """Raise the `add_stock_pick` error for a participant that can't pick right now"""
+        if context.status != 'active':
+            raise bexc.NotAllowedError(action='add_stock_pick', reason='Not active', message=f'Player status is {context.status}.  Must be active to pick stocks')
+        if context.pick_date and context.pick_date < datetime.today().date(): # Check that pick date hasn't passed
+            raise bexc.NotAllowedError(action='add_stock_pick', reason='Past pick_date', message='Cannot pick stock once pick date has passed')
+        if context.open_picks >= context.pick_count:
+            raise bexc.NotAllowedError(action='add_stock_pick', reason='Maximum picks reached', message='Player already has maximum amount of picks')
+
+    def _held_by_other(self, participant_id:int, stock_id:int, game_id:int | str) -> bool:
+        """Whether another participant in the game has an open pick on the stock"""
+        resp = self.sql.send_query(
+            """SELECT 1 FROM stock_picks sp JOIN game_participants p ON p.participation_id = sp.participation_id
+            WHERE sp.stock_id = ? AND sp.status IN ('pending_buy', 'owned', 'pending_sell')
+            AND p.game_id = ? AND sp.participation_id != ? LIMIT 1""",
+            values=[stock_id, str(game_id), participant_id],
+        )
+        return resp.status == 'success' and bool(resp.result)
+
+    def add_stock_pick(self, participant_id:int, stock_id:int, context:Optional[dtv.PickContext]=None): # This is essentially putting in a buy order. End users should not be interacting with this directly    
         """Add a stock pick
 
+        The rules are checked up front (for a clear error) and again by the insert itself, so
+        concurrent buys can't go over the pick limit or, in draft mode, share a stock.
+
         Args:
             participant_id (int): Participant ID.
             stock_id (int): Stock ID.
+            context (Optional[dtv.PickContext], optional): Already loaded `get_pick_context` for this participant.
         
         Raises:
             bexc.NotAllowedError: reason=Not active.  Player status isn't active, so cannot pick stocks
-            get_participant > bexc.DoesntExistError: Player not in game
+            get_pick_context > bexc.DoesntExistError: Player not in game
             bexc.NotAllowedError: reason=Past pick_date.  (only possible if a pick date is set).
             bexc.NotAllowedError: reason=Maximum picks reached.  Player already has the maximum amount of stock picks.
             bexc.AlreadyExistsError: Cannot buy the same stock twice.
+            bexc.AlreadyExistsError: Draft mode game and another player already holds the stock.
+            bexc.NotAllowedError: reason=Changed while picking.  The insert's checks failed but the rules pass again on a re-read.
             Exception: Some other issues ocurred
         """
         
-        player = self.get_participant(participant_id)
-        if player.status != 'active':
-            raise bexc.NotAllowedError(action='add_stock_pick', reason='Not active', message=f'Player status is {player.status}.  Must be active to pick stocks')
-
-        
-        game = self.get_game(game_id=player.game_id) 
-        if game.pick_date and game.pick_date < datetime.today().date(): # Check that pick date hasn't passed
-            raise bexc.NotAllowedError(action='add_stock_pick', reason='Past pick_date', message='Cannot pick stock once pick date has passed')
-        
-        try:
-            picks = self.get_many_stock_picks(participant_id=participant_id, status=['pending_buy', 'owned', 'pending_sell'])
-            if len(picks) >= game.pick_count: 
-                raise bexc.NotAllowedError(action='add_stock_pick', reason='Maximum picks reached', message='Player already has maximum amount of picks')
-            
-        except LookupError as e: # Should only be raised if no stocks are present
-            pass
-            
-        items = {
-            'participation_id':participant_id,
-            'stock_id':stock_id,
-            'datetime_created': _iso8601(),
-            'last_updated': _iso8601()
-            }
-        
-        resp = self.sql.insert(table='stock_picks', items=items)
+        if context is None or context.participation_id != participant_id:
+            context = self.get_pick_context(participant_id=participant_id)
+        self._check_pick(context)
+
+        now = _iso8601()
+        resp = self.sql.send_query( # One statement: the checks and the insert can't be split by another buy
+            """INSERT INTO stock_picks (participation_id, stock_id, datetime_created, last_updated)
+            SELECT ?, ?, ?, ? WHERE (SELECT status FROM game_participants WHERE participation_id = ?) = 'active'
+            AND (SELECT COUNT(*) FROM stock_picks WHERE participation_id = ? AND status IN ('pending_buy', 'owned', 'pending_sell')) < ?
+            AND (NOT ? OR NOT EXISTS ( -- Draft mode: nobody else in the game holds the stock
+                SELECT 1 FROM stock_picks sp JOIN game_participants p ON p.participation_id = sp.participation_id
+                WHERE sp.stock_id = ? AND sp.status IN ('pending_buy', 'owned', 'pending_sell')
+                AND p.game_id = ? AND sp.participation_id != ?
+            ))""",
+            values=[participant_id, stock_id, now, now, participant_id, participant_id, context.pick_count,
+                    int(context.draft_mode), stock_id, str(context.game_id), participant_id],
+            mode='insert',
+        )
+        if resp.reason == 'NO ROWS EFFECTED': # Something changed since the context was read
+            context = self.get_pick_context(participant_id=participant_id)
+            self._check_pick(context)
+            if context.draft_mode and self._held_by_other(participant_id, stock_id, context.game_id):
+                raise bexc.AlreadyExistsError(table='stock_picks', duplicate={'stock_id': stock_id}, message='Draft mode: ticker already picked by another participant')
+            raise bexc.NotAllowedError(action='add_stock_pick', reason='Changed while picking', message='Player status or picks changed while picking, try again')
         if resp.status != 'success': #TODO errors
             if resp.reason =='SQLITE_CONSTRAINT_UNIQUE':
                 raise bexc.AlreadyExistsError(table='add_picks', duplicate={'participant_id': participant_id, 'stock_id':stock_id }, message='Cannot buy the same stock twice')
@@ -977,7 +1361,25 @@ class Backend:
                     resp=self.sql.get(table='stock_picks', filters={'pick_id': pick_id}),
                 )
 
-    def get_many_stock_picks(self, participant_id:Optional[int]=None, status:Optional[str | list]=None, stock_id:Optional[int]=None, include_tickers:bool=False)-> tuple[dtv.StockPick]: 
+    def _stock_picks_where(self, participant_id:Optional[int]=None, status:Optional[str | list]=None, stock_id:Optional[int]=None) -> tuple[list[str], list]:
+        """`get_many_stock_picks` filters as SQL conditions and values"""
+        valid_statuses = ['pending_buy', 'owned', 'pending_sell', 'sold']
+        where, values = [], []
+        for column, value in (('participation_id', participant_id), ('stock_id', stock_id)):
+            if value is not None:
+                where.append(f'stock_picks.{column} = ?')
+                values.append(value)
+        if status: # validate statuses
+            if isinstance(status, str):
+                status = [status]
+            for st in status: # Chec kthat 
+                if st not in valid_statuses:
+                    raise ValueError(f'invalid `status` {st}.')
+            where.append(f"stock_picks.status IN ({', '.join('?' for _ in status)})")
+            values.extend(status)
+        return where, values
+
+    def get_many_stock_picks(self, participant_id:Optional[int]=None, status:Optional[str | list]=None, stock_id:Optional[int]=None, include_tickers:bool=False, limit:Optional[int]=None, after:Optional[int]=None)-> tuple[dtv.StockPick]: 
         """List stock picks.  Optionally, filter by a status or participant ID
         
         Stocks will be ordered from best performance to worst (by percent)
@@ -987,32 +1389,30 @@ class Backend:
             status (str | list, optional): Filter by a status(es) ('pending_buy', 'owned', 'pending_sell', 'sold').
             stock_id(int, optional): Filter by stock ID.
             include_tickers(bool, optional):  Include the ticker when getting the stocks
+            limit (int, optional): Page size.
+            after (int, optional): Pick ID of the last pick on the previous page.
             
         Returns:
             list: List of stock picks
         """
-        valid_statuses = ['pending_buy', 'owned', 'pending_sell', 'sold']
-        left_str = None
-        filters: dict[Any, Any] = {
-            'participation_id': participant_id,
-            'stock_id': stock_id
-            }
-        if status: # validate statuses
-            statuses = []
-            if isinstance(status, str):
-                status = [status]
-            for st in status: # Chec kthat 
-                if st not in valid_statuses:
-                    raise ValueError(f'invalid `status` {st}.')
-                statuses.append(f'"{st}"') # Add valid statues
-            filters.update({('IN', 'status'): "" + ",".join(statuses)})
-            
-        if include_tickers: # Run a left_join
-            left_str = 'LEFT JOIN stocks ON stocks.stock_id = stock_picks.stock_id\n'#IDK if the \n is needed
-        
-        resp = self.sql.get(table='stock_picks', left_join=left_str, filters=filters, order={'change_percent': 'DESC', 'change_dollars': 'DESC'})
+        join = 'LEFT JOIN stocks ON stocks.stock_id = stock_picks.stock_id' if include_tickers else ''
+        query, values = self._keyset_select(
+            'stock_picks',
+            'pick_id',
+            *self._stock_picks_where(participant_id, status, stock_id),
+            order=['COALESCE(stock_picks.change_percent, -1e308)', 'COALESCE(stock_picks.change_dollars, -1e308)'], # Unvalued picks last
+            descending=True,
+            limit=limit,
+            after=after,
+            join=join,
+        )
+        resp = self.sql.send_query(query, values=values)
         return self._many_get(typeadapter=dtv.StockPicks, resp=resp)
 
+    def count_many_stock_picks(self, participant_id:Optional[int]=None, status:Optional[str | list]=None, stock_id:Optional[int]=None) -> int:
+        """Number of picks `get_many_stock_picks` matches with these filters (for page counts)"""
+        return self._count('stock_picks', *self._stock_picks_where(participant_id, status, stock_id))
+
     def update_stock_pick(self, pick_id:int, current_value:Optional[float]=None, shares:Optional[float]=None, start_value:Optional[float]=None, status:Optional[str]=None, change_dollars:Optional[float]=None, change_percent:Optional[float]=None): #Update a single stock pick
         """Update a stock pick
 
@@ -1053,6 +1453,397 @@ class Backend:
         self._delete_single(table="stock_picks", id_column='pick_id', item_id=pick_id)
         
 
+    def get_valuation_inputs(self, game_ids:Optional[list[int | str]]=None) -> list[Holding]:
+        """Load everything portfolio valuation needs for active games in one query
+
+        One row per pick (any status) of each active participant, or a single pick-less row for participants without picks, with the game's `start_money`/`pick_count` and the stock's latest price today (None if it has none yet).
+
+        Args:
+            game_ids (Optional[list[int | str]], optional): Only these games (they must still be `active`).  If blank, every active game.
+
+        Returns:
+            list[Holding]: Rows ordered by game, participant and pick.  Empty if there is nothing to value.
+        """
+        start, end = prefix_range(_iso8601('date'))
+        query = """WITH latest AS (
+                SELECT p.stock_id, p.price
+                FROM stock_prices p
+                JOIN (SELECT stock_id, MAX(ts) AS ts FROM stock_prices WHERE ts >= ? AND ts < ? GROUP BY stock_id) m
+                    ON m.stock_id = p.stock_id AND m.ts = p.ts
+            )
+            SELECT g.game_id, g.start_money, g.pick_count, g.update_frequency, g.start_date, gp.participation_id,
+                sp.pick_id, sp.status, sp.shares, sp.start_value, sp.current_value, sp.change_dollars, sp.change_percent,
+                sp.stock_id, sp.datetime_created, sp.last_updated, latest.price
+            FROM games g
+            JOIN game_participants gp ON gp.game_id = g.game_id AND gp.status = 'active'
+            LEFT JOIN stock_picks sp ON sp.participation_id = gp.participation_id
+            LEFT JOIN latest ON latest.stock_id = sp.stock_id
+            WHERE g.status = 'active'"""
+        values: list = [start, end]
+        if game_ids is not None:
+            if not game_ids:
+                return []
+            query += f" AND g.game_id IN ({', '.join('?' for _ in game_ids)})"
+            values += [str(game_id) for game_id in game_ids]
+        query += " ORDER BY g.game_id, gp.participation_id, sp.pick_id"
+
+        resp = self.sql.send_query(query, values=values)
+        if resp.status != 'success':
+            if resp.reason == 'NO ROWS RETURNED':
+                return []
+            raise Exception('Failed to load valuation inputs.', resp)
+        assert isinstance(resp.result, tuple)
+        return [Holding(**{**row, 'game_id': str(row['game_id'])}) for row in resp.result]
+
+    def capture_settlement_prices(self, keys:list[tuple[str, int, int]]) -> None:
+        """Record the official fill price for each `(game_id, stock_id, settle_ts)` that doesn't have one yet
+
+        The official price is the first stored price at or after `settle_ts`.  Keys with no such price yet are skipped (retried next cycle); captured prices never change.
+
+        Args:
+            keys (list[tuple[str, int, int]]): Game ID, stock ID and settlement moment (epoch minute).
+        """
+        if not keys:
+            return
+        query = """INSERT OR IGNORE INTO settlement_prices (game_id, stock_id, settle_ts, price, price_ts, datetime_captured)
+            SELECT ?, stock_id, ?, price, ts, ? FROM stock_prices
+            WHERE stock_id = ? AND ts >= ?
+            ORDER BY ts LIMIT 1"""
+        now = _iso8601()
+        values = [(str(game_id), int(settle_ts), now, int(stock_id), int(settle_ts)) for game_id, stock_id, settle_ts in keys]
+        resp = self.sql.send_query(query, values=values, mode='insert_multi')
+        if resp.status != 'success':
+            raise Exception('Failed to capture settlement prices.', resp)
+
+    def get_settlement_prices(self, game_ids:Optional[list[int | str]]=None) -> dict[tuple[str, int, int], float]:
+        """Captured settlement prices keyed by `(game_id, stock_id, settle_ts)`
+
+        Args:
+            game_ids (Optional[list[int | str]], optional): Only these games.  If blank, every game.
+        """
+        query = "SELECT game_id, stock_id, settle_ts, price FROM settlement_prices"
+        values: list = []
+        if game_ids is not None:
+            if not game_ids:
+                return {}
+            query += f" WHERE game_id IN ({', '.join('?' for _ in game_ids)})"
+            values = [str(game_id) for game_id in game_ids]
+        resp = self.sql.send_query(query, values=values)
+        if resp.status != 'success':
+            if resp.reason == 'NO ROWS RETURNED':
+                return {}
+            raise Exception('Failed to get settlement prices.', resp)
+        assert isinstance(resp.result, tuple)
+        return {(str(r['game_id']), int(r['stock_id']), int(r['settle_ts'])): float(r['price']) for r in resp.result}
+
+    def apply_valuation(self, valuation:Valuation):
+        """Write a `helpers.valuation` result back with one `executemany` per table
+
+        Args:
+            valuation (Valuation): Pick, participant and game updates.  `None` pick fields are left unchanged.
+        """
+        now = _iso8601()
+        statements = [
+            (
+                """UPDATE stock_picks SET shares = COALESCE(?, shares), start_value = COALESCE(?, start_value),
+                current_value = ?, change_dollars = ?, change_percent = ?, status = COALESCE(?, status), last_updated = ?
+                WHERE pick_id = ?""",
+                [(u.shares, u.start_value, u.current_value, u.change_dollars, u.change_percent, u.status, now, u.pick_id) for u in valuation.picks],
+            ),
+            (
+                """UPDATE game_participants SET current_value = ?, change_dollars = ?, change_percent = ?, last_updated = ?
+                WHERE participation_id = ?""",
+                [(u.current_value, u.change_dollars, u.change_percent, now, u.id) for u in valuation.participants],
+            ),
+            (
+                """UPDATE games SET aggregate_value = ?, change_dollars = ?, change_percent = ?, last_updated = ?
+                WHERE game_id = ?""",
+                [(u.current_value, u.change_dollars, u.change_percent, now, str(u.id)) for u in valuation.games],
+            ),
+        ]
+        for query, values in statements:
+            if not values:
+                continue
+            resp = self.sql.send_query(query, values=values, mode='insert_multi')
+            if resp.status != 'success':
+                raise Exception('Failed to write valuation.', resp)
+        self.game_cache.invalidate(update.id for update in valuation.games)
+
+    def update_ranks(self, game_ids:Optional[list[int | str]]=None) -> None:
+        """Store each player's leaderboard `rank` with one windowed `UPDATE`
+
+        Active players are ranked by `current_value` (ties go to whoever joined first); everyone else gets no rank.  Only rows whose rank moved are written, and they keep the old one in `previous_rank`.
+
+        Args:
+            game_ids (Optional[list[int | str]], optional): Only these games.  If blank, every active game.
+        """
+        if game_ids is None:
+            scope, values = "WHERE game_id IN (SELECT game_id FROM games WHERE status = 'active')", []
+        elif not game_ids:
+            return
+        else:
+            scope, values = f"WHERE game_id IN ({', '.join('?' for _ in game_ids)})", [str(game_id) for game_id in game_ids]
+        query = f"""UPDATE game_participants SET previous_rank = rank, rank = ranked.new_rank
+            FROM ({RANKED_PARTICIPANTS} {scope}) AS ranked
+            WHERE game_participants.participation_id = ranked.participation_id AND game_participants.rank IS NOT ranked.new_rank"""
+        resp = self.sql.send_query(query, values=values, mode='update')
+        if resp.status != 'success' and resp.reason != 'NO ROWS EFFECTED':
+            raise Exception('Failed to update ranks.', resp)
+
+    def finalize_game(self, game_id:int | str) -> bool:
+        """Freeze an ended game's results and add them to its players' career stats
+
+        - Final standings and picks are copied into `game_results`/`pick_results`, which serve ended-game views from then on
+        - The game is marked `results_recorded` (finalized), which also gates the career stats: a repeat call is a no-op
+        - `users.overall_wins`/`change_dollars`/`change_percent` get the game's final standings (a crash right after marking under-counts, which `rebuild_career_stats` fixes)
+
+        Args:
+            game_id (int | str): Game ID.
+
+        Returns:
+            bool: True if the game was finalized now, False if it isn't ended or was already finalized.
+        """
+        game = self.get_game(game_id)
+        if game.status != 'ended' or game.finalized:
+            return False
+        self.update_ranks([game_id]) # Final standings
+        for statement in FREEZE_GAME_RESULTS:
+            resp = self.sql.send_query(statement.format(scope='g.game_id = ?'), values=[str(game_id)], mode='insert')
+            if resp.status != 'success' and resp.reason != 'NO ROWS EFFECTED':
+                raise Exception('Failed to freeze game results.', resp)
+        resp = self.sql.send_query(
+            "UPDATE games SET results_recorded = 1 WHERE game_id = ? AND status = 'ended' AND results_recorded = 0",
+            values=[str(game_id)],
+            mode='update',
+        )
+        self.game_cache.invalidate([game_id])
+        if resp.status != 'success':
+            if resp.reason == 'NO ROWS EFFECTED':
+                return False # Finalized meanwhile
+            raise Exception('Failed to finalize game.', resp)
+        query = """UPDATE users SET
+                overall_wins = overall_wins + r.win,
+                change_dollars = ROUND(COALESCE(users.change_dollars, 0) + r.change, 2),
+                change_percent = ROUND((COALESCE(users.change_dollars, 0) + r.change) * 100 / (career_start_money + r.start_money), 2),
+                career_start_money = career_start_money + r.start_money
+            FROM (
+                SELECT gp.user_id, gp.status = 'active' AND gp.rank = 1 AS win, COALESCE(gp.change_dollars, 0) AS change, g.start_money
+                FROM game_participants gp JOIN games g ON g.game_id = gp.game_id
+                WHERE gp.game_id = ? AND gp.status != 'pending'
+            ) AS r
+            WHERE users.user_id = r.user_id"""
+        resp = self.sql.send_query(query, values=[str(game_id)], mode='update')
+        if resp.status != 'success' and resp.reason != 'NO ROWS EFFECTED':
+            raise Exception('Failed to finalize game.', resp)
+        return True
+
+    def get_game_results(self, game_id:int | str)-> tuple[dtv.GameParticipant]:
+        """Final standings of a finalized game, best first (unranked players last)
+
+        Args:
+            game_id (int | str): Game ID.
+
+        Raises:
+            LookupError: Game not finalized (or had no players).
+        """
+        query = """SELECT * FROM game_results WHERE game_id = ?
+            ORDER BY rank IS NULL, rank, current_value DESC"""
+        resp = self.sql.send_query(query, values=[str(game_id)])
+        if resp.reason == 'NO ROWS RETURNED': # Maybe archived
+            resp = self._archive_get(query, [str(game_id)])
+        return self._many_get(typeadapter=dtv.GameParticipants, resp=resp)
+
+    def get_leaderboard(self, game_id:int | str, finalized:bool=False, limit:Optional[int]=None, offset:int=0)-> tuple[dtv.GameLeaderboard, ...]:
+        """Leaderboard rows with display names, from one `game_participants JOIN users` query
+
+        Args:
+            game_id (int | str): Game ID.
+            finalized (bool, optional): Read the frozen `game_results` (best rank first) instead of live values (highest value first).
+            limit (Optional[int], optional): Only this many rows (a rank page).
+            offset (int, optional): Skip this many rows first.
+
+        Raises:
+            LookupError: No players (or none on this page).
+        """
+        columns = """p.participation_id, p.user_id, COALESCE(p.current_value, 0) AS current_value, p.datetime_joined AS joined,
+            COALESCE(p.change_dollars, 0) AS change_dollars, COALESCE(p.change_percent, 0) AS change_percent,
+            COALESCE(p.days_in_first, 0) AS days_in_first, p.rank, p.previous_rank, p.last_updated"""
+        table = 'game_results' if finalized else 'game_participants'
+        order = 'p.rank IS NULL, p.rank, p.current_value DESC' if finalized else 'p.current_value DESC, p.participation_id'
+        page = ''
+        values: list = [str(game_id)]
+        if limit is not None or offset:
+            page = ' LIMIT ? OFFSET ?'
+            values += [-1 if limit is None else limit, offset]
+        resp = self.sql.send_query(
+            f"""SELECT {columns}, COALESCE(u.display_name, 'ID(' || p.user_id || ')') AS display_name
+            FROM {table} p LEFT JOIN users u ON u.user_id = p.user_id
+            WHERE p.game_id = ? ORDER BY {order}{page}""",
+            values=values,
+        )
+        if resp.reason == 'NO ROWS RETURNED' and self._is_archived(game_id): # Users stay in the main file
+            resp = self._archive_get(f"SELECT {columns} FROM {table} p WHERE p.game_id = ? ORDER BY {order}{page}", values)
+            if resp.status == 'success' and isinstance(resp.result, tuple):
+                user_ids = list({row['user_id'] for row in resp.result})
+                users = self.sql.send_query(
+                    f"SELECT user_id, display_name FROM users WHERE user_id IN ({', '.join('?' for _ in user_ids)})",
+                    values=user_ids,
+                )
+                names = {row['user_id']: row['display_name'] for row in users.result} if isinstance(users.result, tuple) else {}
+                resp.result = tuple({**row, 'display_name': names.get(row['user_id']) or f"ID({row['user_id']})"} for row in resp.result)
+        return self._many_get(typeadapter=dtv.GameLeaderboards, resp=resp)
+
+    def count_leaderboard(self, game_id:int | str, finalized:bool=False) -> int:
+        """Number of rows `get_leaderboard` has for a game (for page counts)"""
+        table = 'game_results' if finalized else 'game_participants'
+        query = f"SELECT COUNT(*) AS players FROM {table} WHERE game_id = ?"
+        resp = self.sql.send_query(query, values=[str(game_id)])
+        players = int(resp.result[0]['players']) if resp.status == 'success' and isinstance(resp.result, tuple) else 0
+        if not players and self._is_archived(game_id):
+            archived = self._archive_get(query, [str(game_id)])
+            if archived.status == 'success' and isinstance(archived.result, tuple):
+                players = int(archived.result[0]['players'])
+        return players
+
+    def get_pick_results(self, game_id:int | str, participant_id:Optional[int]=None, status:Optional[list[str]]=None)-> tuple[dtv.StockPick]:
+        """Final picks of a finalized game (with tickers), best first
+
+        Args:
+            game_id (int | str): Game ID.
+            participant_id (Optional[int], optional): Only this participant's picks.
+            status (Optional[list[str]], optional): Only these pick statuses.
+
+        Raises:
+            LookupError: No matching picks.
+        """
+        query = "SELECT * FROM pick_results WHERE game_id = ?"
+        values: list = [str(game_id)]
+        if participant_id is not None:
+            query += " AND participation_id = ?"
+            values.append(int(participant_id))
+        if status:
+            query += f" AND status IN ({', '.join('?' for _ in status)})"
+            values.extend(status)
+        query += " ORDER BY change_percent DESC, change_dollars DESC"
+        resp = self.sql.send_query(query, values=values)
+        if resp.reason == 'NO ROWS RETURNED': # Maybe archived
+            resp = self._archive_get(query, values)
+        return self._many_get(typeadapter=dtv.StockPicks, resp=resp)
+
+    def get_picks_for_game(self, game_id:int | str, participant_ids:Optional[Iterable[int]]=None, status:Optional[list[str]]=None, finalized:bool=False)-> dict[int, list[dtv.StockPick]]:
+        """Every player's picks in a game (with tickers and company names) from one joined query
+
+        Args:
+            game_id (int | str): Game ID.
+            participant_ids (Optional[Iterable[int]], optional): Only these participants.  If blank, everyone in the game.
+            status (Optional[list[str]], optional): Only these pick statuses.
+            finalized (bool, optional): Read the frozen `pick_results` instead of live picks.
+
+        Returns:
+            dict: participation_id -> picks, best first.  Participants without picks are left out.
+        """
+        if finalized:
+            query = "SELECT * FROM pick_results sp WHERE sp.game_id = ?"
+        else:
+            query = """SELECT sp.*, s.ticker, s.company_name FROM stock_picks sp
+            JOIN game_participants p ON p.participation_id = sp.participation_id
+            LEFT JOIN stocks s ON s.stock_id = sp.stock_id
+            WHERE p.game_id = ?"""
+        values: list = [str(game_id)]
+        if participant_ids is not None:
+            ids = [int(participant_id) for participant_id in participant_ids]
+            if not ids:
+                return {}
+            query += f" AND sp.participation_id IN ({', '.join('?' for _ in ids)})"
+            values.extend(ids)
+        if status:
+            query += f" AND sp.status IN ({', '.join('?' for _ in status)})"
+            values.extend(status)
+        query += " ORDER BY sp.change_percent DESC, sp.change_dollars DESC"
+        resp = self.sql.send_query(query, values=values)
+        if resp.reason == 'NO ROWS RETURNED' and finalized: # Maybe archived
+            resp = self._archive_get(query, values)
+        try:
+            picks = self._many_get(typeadapter=dtv.StockPicks, resp=resp)
+        except LookupError:
+            return {}
+        grouped: dict[int, list[dtv.StockPick]] = {}
+        for pick in picks:
+            grouped.setdefault(pick.participation_id, []).append(pick)
+        return grouped
+
+    def rebuild_career_stats(self) -> None:
+        """Recompute every user's career stats from all ended games
+
+        Every ended game is marked finalized; ones that never went through `finalize_game` get their results frozen too.  Games moved to the archive file (see `helpers.game_archive`) still count.
+        """
+        for statement in FREEZE_GAME_RESULTS:
+            resp = self.sql.send_query(statement.format(scope="g.status = 'ended' AND g.results_recorded = 0"), mode='insert')
+            if resp.status != 'success' and resp.reason != 'NO ROWS EFFECTED':
+                raise Exception('Failed to freeze game results.', resp)
+        if os.path.isfile(self.archive_db):
+            run_with_archive(self.sql.db, self.archive_db, REBUILD_CAREER_STATS_WITH_ARCHIVE)
+            self.game_cache.clear() # `results_recorded` may have changed
+            return
+        for query in REBUILD_CAREER_STATS:
+            resp = self.sql.send_query(query, mode='update')
+            if resp.status != 'success' and resp.reason != 'NO ROWS EFFECTED':
+                raise Exception('Failed to rebuild career stats.', resp)
+        self.game_cache.clear() # `results_recorded` may have changed
+
+    def add_value_history(self, participants:list[TotalUpdate], when:Optional[str | datetime]=None) -> None:
+        """Append participant totals to `participant_value_history` with one `executemany`
+
+        A second write in the same minute replaces that minute's row.
+
+        Args:
+            participants (list[TotalUpdate]): Participant totals (`id` = participation ID), as written by `apply_valuation`.
+            when (str | datetime, optional): Moment of the cycle.  Defaults to now.
+        """
+        if not participants:
+            return
+        ts = to_ts(when or _iso8601())
+        query = """INSERT INTO participant_value_history (participation_id, game_id, ts, current_value, change_dollars, change_percent)
+            SELECT participation_id, game_id, ?, ?, ?, ? FROM game_participants WHERE participation_id = ?
+            ON CONFLICT (participation_id, ts) DO UPDATE SET
+                current_value = excluded.current_value, change_dollars = excluded.change_dollars, change_percent = excluded.change_percent"""
+        values = [(ts, u.current_value, u.change_dollars, u.change_percent, u.id) for u in participants]
+        resp = self.sql.send_query(query, values=values, mode='insert_multi')
+        if resp.status != 'success':
+            raise Exception('Failed to write value history.', resp)
+
+    def get_value_history(self, participant_id:Optional[int]=None, game_id:Optional[int | str]=None, start:Optional[str | datetime]=None, end:Optional[str | datetime]=None)-> tuple[dtv.ParticipantValue]:
+        """List participant values over time (oldest first)
+
+        Args:
+            participant_id (int, optional): One participant.
+            game_id (int | str, optional): Every participant in a game.
+            start (str | datetime, optional): Inclusive start, `YYYY-MM-DD[ HH:MM:SS]` or a datetime.
+            end (str | datetime, optional): Exclusive end, same formats.
+
+        Raises:
+            ValueError: Neither `participant_id` nor `game_id` passed, or invalid `start`/`end`.
+            LookupError: No history in range.
+        """
+        if participant_id is None and game_id is None:
+            raise ValueError('Pass `participant_id` or `game_id`.')
+        filters, values = [], []
+        if participant_id is not None:
+            filters.append('participation_id = ?')
+            values.append(int(participant_id))
+        if game_id is not None:
+            filters.append('game_id = ?')
+            values.append(str(game_id))
+        if start is not None:
+            filters.append('ts >= ?')
+            values.append(to_ts(start))
+        if end is not None:
+            filters.append('ts < ?')
+            values.append(to_ts(end))
+        query = f"SELECT * FROM participant_value_history WHERE {' AND '.join(filters)} ORDER BY ts, participation_id"
+        resp = self.sql.send_query(query, values=values)
+        return self._many_get(typeadapter=dtv.ParticipantValues, resp=resp)
+
     # # GAME PARTICIPATION ACTIONS # #
     def add_participant(self, user_id:int, game_id:int | str, force_active: bool = False):
         """Add a game participant
@@ -1105,7 +1896,19 @@ class Backend:
         except LookupError:
             raise bexc.DoesntExistError(table='game_participants', item=participant_id, message='Player not in game')
 
-    def get_many_participants(self, game_id:Optional[int | str]=None, user_id:Optional[int]=None, status:Optional[str]=None, sort_by_value:bool=False)-> tuple[dtv.GameParticipant]:
+    def _participants_where(self, game_id:Optional[int | str]=None, user_id:Optional[int]=None, status:Optional[str]=None) -> tuple[list[str], list]:
+        """`get_many_participants` filters as SQL conditions and values"""
+        if status and status not in ['pending', 'active', 'inactive']: # TODO support multiple statuses
+            raise ValueError('Invalid status!')
+        
+        filters = {
+            'user_id': user_id,
+            'game_id': game_id,
+            'status':status
+            }
+        return [f'{column} = ?' for column, value in filters.items() if value is not None], [value for value in filters.values() if value is not None]
+
+    def get_many_participants(self, game_id:Optional[int | str]=None, user_id:Optional[int]=None, status:Optional[str]=None, sort_by_value:bool=False, limit:Optional[int]=None, after:Optional[int]=None)-> tuple[dtv.GameParticipant]:
         """Get multiple participants
 
         Args:
@@ -1113,26 +1916,87 @@ class Backend:
             user_id (Optional[int], optional): Filter by user ID.
             status (Optional[str], optional): Filter by status ('pending', 'active', 'inactive').
             sort_by_value (bool, optional): Whether results should be sorted by value.
+            limit (Optional[int], optional): Page size.
+            after (Optional[int], optional): Participation ID of the last participant on the previous page.
 
         Returns:
             tuple: Matching participants.
         """
-        if status and status not in ['pending', 'active', 'inactive']: # TODO support multiple statuses
-            raise ValueError('Invalid status!')
-        
-        filters = {
-            'user_id': user_id,
-            'game_id': game_id,
-            'status':status
-            }
-        
-        order={'game_id': 'DESC'}
+        where, values = self._participants_where(game_id, user_id, status)
+        order = ['game_participants.game_id']
         if sort_by_value:
-            order['current_value'] = 'DESC'
-        
-        resp = self.sql.get(table='game_participants', order=order, filters=filters, ) 
-        return self._many_get(typeadapter=dtv.GameParticipants, resp=resp)
+            order.append('COALESCE(game_participants.current_value, -1e308)')
+        if game_id is not None or user_id is None: # Archived games are only looked up by game or user
+            query, values = self._keyset_select('game_participants', 'participation_id', where, values, order=order, descending=True, limit=limit, after=after)
+            resp = self.sql.send_query(query, values=values)
+            if resp.reason == 'NO ROWS RETURNED' and game_id is not None: # Maybe an archived game
+                resp = self._archive_get(query, values)
+            return self._many_get(typeadapter=dtv.GameParticipants, resp=resp)
+
+        # A user's games can be in both files, so both are read and merged
+        cursor = None
+        if after is not None: # The last row shown may be in either file
+            lookup = f"SELECT {', '.join(f'{column} AS c{n}' for n, column in enumerate(order))} FROM game_participants WHERE participation_id = ?"
+            found = self.sql.send_query(lookup, values=[after])
+            if found.status != 'success':
+                found = self._archive_get(lookup, [after])
+            if found.status != 'success' or not isinstance(found.result, tuple):
+                raise LookupError('No items found')
+            cursor = [found.result[0][f'c{n}'] for n in range(len(order))]
+        query, values = self._keyset_select('game_participants', 'participation_id', where, values, order=order, descending=True, limit=limit, after=after, cursor=cursor)
+        participants: tuple = ()
+        for resp in (self.sql.send_query(query, values=values), self._archive_get(query, values)):
+            try:
+                participants += self._many_get(typeadapter=dtv.GameParticipants, resp=resp)
+            except LookupError:
+                pass
+        if not participants:
+            raise LookupError('No items found')
+        def sort_key(participant:dtv.GameParticipant) -> tuple:
+            value = participant.current_value if participant.current_value is not None else -1e308
+            return (str(participant.game_id), value if sort_by_value else 0, participant.id if limit is not None or after is not None else 0)
+        participants = tuple(sorted(participants, key=sort_key, reverse=True)) # Stable, so unpaged ties keep their old order
+        return participants[:limit] if limit is not None else participants
+
+    def count_many_participants(self, game_id:Optional[int | str]=None, user_id:Optional[int]=None, status:Optional[str]=None) -> int:
+        """Number of participants `get_many_participants` matches with these filters (for page counts)"""
+        where, values = self._participants_where(game_id, user_id, status)
+        total = self._count('game_participants', where, values)
+        if game_id is None and user_id is not None: # Their archived games too
+            total += self._count('game_participants', where, values, archive=True)
+        elif not total and game_id is not None: # Maybe an archived game
+            total = self._count('game_participants', where, values, archive=True)
+        return total
     
+    def get_player_counts(self, game_ids:Optional[Iterable[int | str]]=None) -> dict[str, int]:
+        """Active + pending players per game, from one grouped query
+
+        Args:
+            game_ids (Optional[Iterable[int | str]], optional): Only these games (archived ones are counted from the archive).  If blank, every game in the main database.
+
+        Returns:
+            dict: game_id -> player count.  Games without players are left out.
+        """
+        query = "SELECT game_id, COUNT(*) AS players FROM game_participants WHERE status IN ('active', 'pending'){scope} GROUP BY game_id"
+        ids: list[str] = []
+        if game_ids is not None:
+            ids = list(dict.fromkeys(str(game_id) for game_id in game_ids))
+            if not ids:
+                return {}
+        scope = f" AND game_id IN ({', '.join('?' for _ in ids)})" if game_ids is not None else ''
+        resp = self.sql.send_query(query.format(scope=scope), values=ids)
+        if resp.status != 'success' and resp.reason != 'NO ROWS RETURNED':
+            raise Exception('Failed to count players.', resp)
+        counts: dict[str, int] = {}
+        if isinstance(resp.result, tuple):
+            counts = {str(row['game_id']): int(row['players']) for row in resp.result}
+        missing = [game_id for game_id in ids if game_id not in counts and self._is_archived(game_id)] # Not games that simply have no players
+        if missing:
+            archived = self._archive_get(query.format(scope=f" AND game_id IN ({', '.join('?' for _ in missing)})"), missing)
+            if archived.status == 'success' and isinstance(archived.result, tuple):
+                counts.update({str(row['game_id']): int(row['players']) for row in archived.result})
+        return counts
+
     def update_participant(self, participant_id:int, status:Optional[str]=None, current_value:Optional[float]=None, change_dollars:Optional[float]=None, change_percent:Optional[float]=None, days_in_first:Optional[int]=None):
         """Update a game participant
 
@@ -1189,6 +2053,8 @@ class GameLogic: # Might move some of the control/running actions here
         # owner so `/game-list owner:@Bot` can filter to recurring series.
         # Defaults to each template's owner_id when unset (tests / non-Discord).
         self.recurring_game_owner_id: Optional[int] = None
+        self._last_price_retention: Optional[date] = None  # Local date of the last compaction run
+        self._last_game_archive: Optional[date] = None  # Local date of the last archive run
         if not self.alpaca.configured:
             self.logger.warning(
                 'Alpaca credentials missing; stock price updates will fail until '
@@ -1382,6 +2248,7 @@ class GameLogic: # Might move some of the control/running actions here
                 self.be.update_game(game_id=game.id, status='active')
             if game.status == 'active' and game.end_date and game.end_date < today: #Game has ended
                 self.be.update_game(game_id=game.id, status='ended')
+                self.be.finalize_game(game.id) # Freeze results, career stats
 
     def update_stock_prices(self, game_id:Optional[int | str]=None, force:bool=False):
         """Fetch and store latest prices for every equity ticker in the database.
@@ -1425,25 +2292,29 @@ class GameLogic: # Might move some of the control/running actions here
             )
 
         # Floor to the minute so repeated polls in the same minute don't collide
-        # on UNIQUE(stock_id, datetime). 15-minute schedule still fits this.
+        # on UNIQUE(stock_id, ts). 15-minute schedule still fits this.
         price_dt = datetime.now().strftime("%Y-%m-%d %H:%M:00")
-        updated = 0
+        ts = to_ts(price_dt) # Once per cycle, not per ticker
+        stock_ids = {to_db_ticker(stock.ticker): stock.id for stock in stocks if stock.ticker}
+        rows: list[dict] = []
         write_failures: list[str] = []
         for ticker, price in prices.items():
-            try:
-                self.be.add_stock_price(ticker_or_id=ticker, price=price, datetime=price_dt)
-                updated += 1
-            except Exception as e:
-                reason = ''
-                if len(e.args) > 1 and hasattr(e.args[1], 'reason'):
-                    reason = str(e.args[1].reason)
-                blob = f'{e} {reason}'.upper()
-                if 'UNIQUE' in blob or 'CONSTRAINT' in blob:
-                    self.logger.debug('Price already stored for %s at %s', ticker, price_dt)
-                    updated += 1  # already present this minute — not a drop
-                else:
-                    write_failures.append(ticker)
-                    self.logger.exception('Failed to update price for %s', ticker, exc_info=e)
+            stock_id = stock_ids.get(to_db_ticker(ticker))
+            if stock_id is None:
+                write_failures.append(ticker)
+                self.logger.error('No stock row for priced ticker %s', ticker)
+                continue
+            rows.append({'stock_id': stock_id, 'price': price, 'ts': ts})
+
+        updated = 0
+        try:
+            inserted = self.be.add_many_stock_prices(rows) # One statement; rows already stored this minute are skipped
+            if inserted < len(rows):
+                self.logger.debug('Price already stored for %s ticker(s) at %s', len(rows) - inserted, price_dt)
+            updated = len(rows)  # Skipped rows were already stored this minute, not dropped
+        except Exception as e:
+            write_failures += [ticker for ticker in prices if to_db_ticker(ticker) in stock_ids]
+            self.logger.exception('Failed to update prices for %s ticker(s)', len(rows), exc_info=e)
 
         if write_failures:
             self.logger.error(
@@ -1452,154 +2323,106 @@ class GameLogic: # Might move some of the control/running actions here
                 ', '.join(write_failures[:50]),
             )
 
+        source_counts = Counter(self.alpaca.last_price_sources.values())
         self.logger.info(
-            'Alpaca price update: %s/%s tickers priced (%s missing from feed, %s write failures) at %s',
+            'Alpaca price update: %s/%s tickers priced (%s missing from feed, %s write failures) at %s; sources: %s',
             updated,
             len(tickers),
             len(missing_tickers),
             len(write_failures),
             price_dt,
+            ', '.join(f'{source}={count}' for source, count in sorted(source_counts.items())) or 'none',
         )
     
+    def _market_open_ts(self, day:date) -> int:
+        """Epoch minute (see `helpers.price_time`) of the market open on `day`, in the bot's local time."""
+        open_et = pytz.timezone('America/New_York').localize(datetime.combine(day, self.market_open_est.time()))
+        return to_ts(open_et)
+
+    def _settle_pending_buys(self, holdings:list[Holding]) -> list[Holding]:
+        """Price pending_buy picks at their official settlement price instead of the latest one
+
+        A pick made before its game opened settles at the first price at/after market open on the game's `start_date`; a late pick settles at the first price after it was made (the next cycle).  One price per game/stock/moment is captured into `settlement_prices`, so every pick sharing it fills identically, whenever the update runs.  Picks without a settlement price yet stay pending.
+        """
+        open_ts: dict[str, int] = {}
+        settle: dict[int, tuple[str, int, int]] = {}  # pick_id -> key
+        for holding in holdings:
+            if holding.status != 'pending_buy' or holding.pick_id is None or holding.stock_id is None:
+                continue
+            if holding.start_date and holding.start_date not in open_ts:
+                open_ts[holding.start_date] = self._market_open_ts(date.fromisoformat(str(holding.start_date)))
+            moments = [open_ts.get(str(holding.start_date), 0)]
+            if holding.datetime_created:
+                moments.append(to_ts(str(holding.datetime_created)))
+            settle[holding.pick_id] = (holding.game_id, int(holding.stock_id), max(moments))
+        if not settle:
+            return holdings
+
+        self.be.capture_settlement_prices(sorted(set(settle.values()))) # Already-captured keys are left alone
+        prices = self.be.get_settlement_prices(sorted({key[0] for key in settle.values()}))
+        return [
+            replace(holding, price=prices.get(settle[holding.pick_id])) if holding.pick_id in settle else holding
+            for holding in holdings
+        ]
+
     def update_stock_picks(self, game_id:Optional[int | str]=None, force:bool=False) -> None:
         """Update all owned and pending stock picks with current prices
         
-        - Validates game type of daily, but nothing else for now
-        - Adds pending_buy stock picks for users (depending on time)
-        - Update owned stock pick values
+        - Fills pending_buy picks in one batch at their settlement price (see `_settle_pending_buys`)
+        - Settles pending_sell picks and revalues owned picks at the latest price (see `helpers.valuation`)
+        - Daily games are skipped during market hours, and their owned picks are revalued at most every 8 hours
 
         Args:
-            game_id (Optional[int], optional): Game ID.  If blank, all games will be checked/run
+            game_id (Optional[int], optional): Game ID.  If blank, all active games will be checked/run
             force (bool, optional): Skip market-hours and 8-hour throttle checks.
         """
-        
-        try:        
-            if game_id:
-                self.logger.debug(f'Updating stock picks for single game: {game_id}')
-                games = [self.be.get_game(game_id=game_id)] # TODO flag that the checked game specifically did not update
-            else:
-                self.logger.debug(f'Updating stock picks for games')
-                games = self.be.get_many_games(include_open=False, include_active=True, include_private=True) # Only active games
-            
-        except LookupError as e:
-            self.logger.exception(f'Failed to update stock picks', exc_info=e)
-            return # No games
-        
-        for game in games:
-            if not force and game.update_frequency == 'daily' and self._is_market_hours():
-                self.logger.info(f'Not updating stock picks for game: {game.id} because update_frequency is daily and market is still open')
-                continue # daily game, currently in market hours, don't run
-            self.logger.debug(f'Updating stock picks for game: {game.id}')
-            pending_and_owned_query = """
-            WHERE status IN ("pending_buy", "owned", "pending_sell")
-            AND participation_id IN (SELECT participation_id
-                FROM game_participants
-                WHERE status = "active"
-                AND game_id = ?
-                )
-            """ #TODO instead of setting games to active, just use start and end date?
-            try:
-                resp = self.be.sql.get(table='stock_picks', filters=(pending_and_owned_query, [game.id]))
-                picks:tuple[dtv.StockPick, ...] = self.be._many_get(typeadapter=dtv.StockPicks, resp=resp)
-                pass
-            except LookupError:
-                self.logger.debug(f'No stock picks to update for game: {game.id}')
-                continue # No picks
-            
-            for pick in picks:
-                assert isinstance(pick.id, int)
-                assert isinstance(pick.stock_id, int)
-                if not force and game.update_frequency == 'daily' and pick.status == 'owned' and pick.last_updated and datetime.strptime(str(pick.last_updated), "%Y-%m-%d %H:%M:%S") + timedelta(hours=8) > datetime.now():
-                    self.logger.debug(f'Skipping stock pick: {pick.id} in game: {game_id} because update_frequency is daily, and it was last updated less than 8 hours ago')
-                    continue # Skip picks with daily update frequency that have been updated in the last 12 hours
-                try:
-                    price = self.be.get_many_stock_prices(stock_id=int(pick.stock_id),datetime=_iso8601('date'))[0]
-                except LookupError as e:
-                    self.logger.exception(e) #TODO any change this causes more problems?
-                    continue
-                
-                #TODO check datetime here and decide if price should be used
-                buying_power = None
-                shares = None
-                start_value = None
-                status = None
-                
-                if pick.status == 'pending_buy':
-                    buying_power = float(game.start_money / game.pick_count) # Amount available to buy this stock (starting money divided by picks)
-                    shares = buying_power / price.price# Total shares owned
-                    start_value = current_value = round(float(shares * price.price), 2)
-                    dollar_change = 0
-                    percent_change = 0
-                    status = 'owned'
-                
-                else: # Stock is owned or awaiting sale
-                    assert isinstance(pick.shares, float) # Owned stocks would have to have this
-                    assert isinstance(pick.start_value, float) # Owned stocks would have to have this
-                    current_value = float(pick.shares * price.price)
-                    dollar_change = current_value - pick.start_value
-                    percent_change = (dollar_change / pick.start_value) * 100
-                    if pick.status == 'pending_sell':
-                        status = 'sold'
-                self.be.update_stock_pick(pick_id=pick.id,shares=shares, start_value=start_value, current_value=current_value, status=status, change_dollars=dollar_change, change_percent=percent_change) # Update
+        holdings = self.be.get_valuation_inputs([game_id] if game_id else None)
+        if not holdings:
+            self.logger.debug(f'No stock picks to update for game: {game_id or "all"}')
+            return
+        holdings = self._settle_pending_buys(holdings)
+
+        daily_blocked = not force and self._is_market_hours()
+        throttle_cutoff = (datetime.now() - timedelta(hours=8)).strftime("%Y-%m-%d %H:%M:%S")
+        repriced: list[Holding] = []
+        unpriced = 0
+        for holding in holdings:
+            if holding.pick_id is not None and holding.status in ('owned', 'pending_sell') and holding.price is None:
+                unpriced += 1
+            if holding.price is not None and not force and holding.update_frequency == 'daily':
+                if daily_blocked or (holding.status == 'owned' and holding.last_updated and str(holding.last_updated) > throttle_cutoff):
+                    holding = replace(holding, price=None) # Keep as stored
+            repriced.append(holding)
+        if unpriced:
+            self.logger.warning(f'{unpriced} stock pick(s) have no price for today and were not updated')
+
+        updates, _ = value_picks(repriced)
+        self.be.apply_valuation(Valuation(picks=updates))
+        self.logger.debug(f'Updated {len(updates)} stock pick(s)')
 
     def update_participants_and_games(self, game_id:Optional[int | str]=None):
         """Update game participant and game information
         
-        - Participant portfolio value
+        - Participant portfolio value (also appended to `participant_value_history`)
+        - Participant rank (see `Backend.update_ranks`)
         - Game Aggregate value
 
         Args:
             game_id (Optional[int], optional): Game ID.  If blank, all active games will be updated.
         """
-        try:        
-            if game_id:
-                games = [self.be.get_game(game_id=game_id)] # TODO flag that the checked game specifically did not update
-            else:
-                games = self.be.get_many_games(include_open=False, include_active=True) # Only active games
-                
-        except LookupError:
-            return # No games
-        for game in games:
-            aggr_val = 0
-            if game.status != 'active':
-                continue
-            try:
-                players = self.be.get_many_participants(game_id=game.id, status='active')
-            except LookupError:
-                continue # No players
-                
-            for player in players:
-                portfolio_value = 0.0
-                try:
-                    picks = self.be.get_many_stock_picks(participant_id=player.id, status=['owned', 'pending_buy', 'pending_sell', 'sold'])
-                except LookupError:
-                    picks = []  # No picks, all cash uninvested
-
-                allocation = game.start_money / game.pick_count
-                active_picks = [pick for pick in picks if pick.status != 'sold']
-                for pick in active_picks:
-                    if pick.status == 'pending_buy':
-                        portfolio_value += allocation
-                    elif pick.current_value is not None:
-                        portfolio_value += pick.current_value
-                portfolio_value += sum(pick.change_dollars or 0 for pick in picks if pick.status == 'sold')
-
-                active_count = len(active_picks)
-                invested_cash = (game.start_money / game.pick_count) * active_count
-                uninvested_cash = game.start_money - invested_cash
-                portfolio_value += uninvested_cash
-
-                dollar_change = portfolio_value - game.start_money
-                percent_change = (dollar_change / game.start_money) * 100
-                self.be.update_participant(participant_id=player.id, current_value=portfolio_value, change_dollars=dollar_change, change_percent=percent_change)
-                aggr_val += portfolio_value
-            
-            game_dollar_change = aggr_val - (game.start_money * len(players))
-            game_percent_change =  (game_dollar_change / (game.start_money * len(players))) * 100 
-            self.be.update_game(game_id=game.id, aggregate_value=aggr_val, change_dollars=game_dollar_change, change_percent=game_percent_change)
+        holdings = self.be.get_valuation_inputs([game_id] if game_id else None)
+        if not holdings:
+            return # No games/players
+        valuation = value_totals(holdings)
+        self.be.apply_valuation(valuation)
+        self.be.update_ranks([game_id] if game_id else None)
+        self.be.add_value_history(valuation.participants)
 
     def record_days_in_first(self, game_id: Optional[int | str] = None) -> None:
-        """Award +1 ``days_in_first`` to each active game's #1 after NYSE close (idempotent per trade date)."""
+        """Award +1 ``days_in_first`` to each active game's #1 after NYSE close (idempotent per trade date).
+
+        The #1 is the stored ``rank`` from the last participant update (see ``Backend.update_ranks``).
+        """
         if self._is_market_hours():
             return
         trade_date = self._today_et()
@@ -1607,49 +2430,43 @@ class GameLogic: # Might move some of the control/running actions here
         if trade_date.weekday() >= 5:
             return
         trade_date_str = trade_date.isoformat()
-        try:
-            if game_id:
-                games = [self.be.get_game(game_id=game_id)]
-            else:
-                games = list(self.be.get_many_games(include_open=False, include_active=True))
-        except LookupError:
-            return
-
-        for game in games:
-            if game.status != 'active':
-                continue
-            existing = self.be.sql.get(
-                table='leaderboard_day_snapshots',
-                filters={'game_id': str(game.id), 'trade_date': trade_date_str},
-            )
-            if existing.status == 'success':
-                continue
-            try:
-                players = self.be.get_many_participants(game_id=game.id, status='active', sort_by_value=True)
-            except LookupError:
-                continue
-            if not players:
-                continue
-            leader = players[0]
-            new_days = int(getattr(leader, 'days_in_first', 0) or 0) + 1
-            self.be.update_participant(participant_id=leader.id, days_in_first=new_days)
+        query = """SELECT gp.participation_id, gp.user_id, gp.game_id FROM game_participants gp
+            JOIN games g ON g.game_id = gp.game_id
+            WHERE g.status = 'active' AND gp.status = 'active' AND gp.rank = 1
+            AND NOT EXISTS (SELECT 1 FROM leaderboard_day_snapshots s WHERE s.game_id = gp.game_id AND s.trade_date = ?)"""
+        values: list = [trade_date_str]
+        if game_id:
+            query += " AND gp.game_id = ?"
+            values.append(str(game_id))
+        leaders = self.be.sql.send_query(query, values=values)
+        if leaders.status != 'success':
+            return # No unrecorded leaders
+        assert isinstance(leaders.result, tuple)
+
+        for leader in leaders.result:
             snap = self.be.sql.insert(
                 table='leaderboard_day_snapshots',
                 items={
-                    'game_id': str(game.id),
+                    'game_id': str(leader['game_id']),
                     'trade_date': trade_date_str,
-                    'first_user_id': int(leader.user_id),
+                    'first_user_id': int(leader['user_id']),
                     'datetime_created': _iso8601(),
                 },
             )
             if snap.status != 'success':
-                # Race / duplicate: leave days_in_first as-is if insert lost the race.
+                # Race / duplicate: another run already awarded this date.
                 self.logger.debug(
                     'days_in_first snapshot insert skipped for game %s date %s: %s',
-                    game.id,
+                    leader['game_id'],
                     trade_date_str,
                     snap.reason,
                 )
+                continue
+            self.be.sql.send_query(
+                "UPDATE game_participants SET days_in_first = days_in_first + 1 WHERE participation_id = ?",
+                values=[int(leader['participation_id'])],
+                mode='update',
+            )
 
     def update_all(self, game_id:Optional[int | str]=None, force:bool=False):
         """Run all update commands/logic for games
@@ -1660,6 +2477,13 @@ class GameLogic: # Might move some of the control/running actions here
         """
         maybe_daily_backup(self.be.sql.db)
         maybe_hourly_backup(self.be.sql.db)
+        if len(self.be.repair_queue):
+            self.logger.info(f'Repaired {self.be.repair_queued_games()} invalid game(s)')
+        if game_id is None: # Also picks up games changed outside this process
+            self.logger.debug(f'Game cache before update cycle: {self.be.game_cache.stats()}.  Game IDs: {self.be.game_id_stats()}')
+            self.be.game_cache.clear()
+        else:
+            self.be.game_cache.invalidate([game_id])
         if game_id is None:
             self.recurring_games()
         self.update_game_statuses(game_id=game_id) # Update games statuses (start and stop)
@@ -1667,7 +2491,95 @@ class GameLogic: # Might move some of the control/running actions here
         self.update_stock_picks(game_id=game_id, force=force) # Handle pending stock picks
         self.update_participants_and_games(game_id=game_id) # Update participants (set their total value, etc.)
         self.record_days_in_first(game_id=game_id)
-            
+        if game_id is None:
+            self.apply_price_retention()
+            self.archive_games()
+        self.refresh_price_columns()
+
+    def apply_price_retention(self, force:bool=False) -> Optional[dict]:
+        """Downsample old stock prices (see `helpers.price_retention`) and participant value history (see `helpers.value_history`), at most once per day
+
+        Skipped when `PRICE_RETENTION_ENABLED` is off.  Failures are logged and never stop the update cycle.
+
+        Args:
+            force (bool, optional): Run even if it already ran today (still respects `PRICE_RETENTION_ENABLED`). Defaults to False.
+
+        Returns:
+            Optional[dict]: Compaction report, or None if it did not run.
+        """
+        today = date.today()
+        if not retention_enabled() or (not force and self._last_price_retention == today):
+            return None
+        try:
+            report = compact_stock_prices(self.be.sql.db, log=self.logger)
+            report['value_history'] = compact_value_history(self.be.sql.db, log=self.logger)
+        except Exception as e:
+            self.logger.exception('Stock price retention failed', exc_info=e)
+            return None
+        self._last_price_retention = today
+        return report
+
+    def archive_games(self, force:bool=False) -> Optional[dict]:
+        """Move old finalized games into the archive database (see `helpers.game_archive`), at most once per day
+
+        Skipped when `GAME_ARCHIVE_ENABLED` is off.  Failures are logged and never stop the update cycle.
+
+        Args:
+            force (bool, optional): Run even if it already ran today (still respects `GAME_ARCHIVE_ENABLED`). Defaults to False.
+
+        Returns:
+            Optional[dict]: Archive report, or None if it did not run.
+        """
+        today = date.today()
+        if not archive_enabled() or (not force and self._last_game_archive == today):
+            return None
+        try:
+            report = archive_ended_games(self.be.sql.db, self.be.archive_db, archive_after_days(), log=self.logger)
+        except Exception as e:
+            self.logger.exception('Game archive failed', exc_info=e)
+            return None
+        finally:
+            self.be.game_cache.clear()
+        self._last_game_archive = today
+        return report
+
+    def refresh_price_columns(self) -> Optional[dict]:
+        """Bring the columnar price export (see `helpers.price_columns`) up to date
+
+        Skipped when `PRICE_COLUMNS_DIR` is unset.  Failures are logged and never stop the update cycle.
+
+        Returns:
+            Optional[dict]: Export report, or None if it did not run.
+        """
+        directory = columns_dir()
+        if not directory:
+            return None
+        try:
+            return export_price_columns(self.be.sql.db, directory, log=self.logger)
+        except Exception as e:
+            self.logger.exception('Price column export failed', exc_info=e)
+            return None
+
+    def update_streamed_games(self, tickers:Optional[list[str]]=None) -> list[str]:
+        """Refresh picks and totals for `realtime`/`minute` games after a streaming price flush
+
+        Args:
+            tickers (Optional[list[str]], optional): Only update games holding one of these tickers.  If blank, every streamed game is updated.
+
+        Returns:
+            list[str]: IDs of the games that were updated.
+        """
+        wanted = {ticker.upper() for ticker in tickers} if tickers is not None else None
+        game_ids = sorted({
+            str(row['game_id'])
+            for row in self.be.get_stream_holdings()
+            if wanted is None or str(row['ticker']).upper() in wanted
+        })
+        for game_id in game_ids:
+            self.update_stock_picks(game_id=game_id)
+            self.update_participants_and_games(game_id=game_id)
+        return game_ids
+
     def find_stock(self, ticker:str) -> str: 
         """Find and add a US equity to the database via Alpaca market data.
 
@@ -1783,31 +2695,9 @@ class Frontend: # This will be where a bot (like discord) interacts
         Returns:
             dict: User information.
         """
-        user = self.be.get_user(user_id=user_id)
-        total_change = 0.0
-        total_starting_value = 0.0
-        wins = 0
-        try:
-            participations = self.be.get_many_participants(user_id=user_id)
-        except LookupError:
-            participations = ()
-        for participation in participations:
-            if participation.status == 'pending':
-                continue
-            game = self.be.get_game(participation.game_id)
-            if game.status != 'ended':
-                continue
-            total_change += participation.change_dollars or 0
-            total_starting_value += game.start_money
-            try:
-                players = self.be.get_many_participants(game_id=game.id, status='active', sort_by_value=True)
-            except LookupError:
-                continue
-            if players and players[0].user_id == user_id:
-                wins += 1
-        user.overall_wins = wins
-        user.change_dollars = round(total_change, 2)
-        user.change_percent = round((total_change / total_starting_value) * 100, 2) if total_starting_value else 0
+        user = self.be.get_user(user_id=user_id) # Career stats are kept up to date as games end (see `Backend.finalize_game`)
+        user.change_dollars = user.change_dollars or 0
+        user.change_percent = user.change_percent or 0
         return user
 
     def _user_owns_game(self, user_id:int, game_id:int | str): # Check if a user owns a specific game
@@ -2019,17 +2909,8 @@ class Frontend: # This will be where a bot (like discord) interacts
         if today is None:
             today = self.gl._today_et()
 
-        scored: list[tuple[dtv.Game, int]] = []
-        for game in games:
-            try:
-                participants = self.be.get_many_participants(game_id=game.id)
-                player_count = sum(
-                    1 for p in participants if p.status in ('active', 'pending')
-                )
-            except LookupError:
-                player_count = 0
-            scored.append((game, player_count))
-
+        counts = self.be.get_player_counts([game.id for game in games])
+        scored = [(game, counts.get(str(game.id), 0)) for game in games]
         return self._rank_scored_games(scored, today)
 
     def list_my_games_ranked(
@@ -2053,38 +2934,29 @@ class Frontend: # This will be where a bot (like discord) interacts
         if today is None:
             today = self.gl._today_et()
 
+        game_ids = list(dict.fromkeys(str(p.game_id) for p in players if p.status in ('active', 'pending')))
+        games = {str(game.id): game for game in self.be.get_games(game_ids)}
+        counts = self.be.get_player_counts(game_ids)
         scored: list[tuple[dtv.Game, int]] = []
-        seen: set[str] = set()
-        for player in players:
-            if player.status not in ('active', 'pending'):
-                continue
-            game = self.be.get_game(player.game_id)
-            if game.status == 'ended' and not include_ended:
-                continue
-            game_key = str(game.id)
-            if game_key in seen:
+        for game_id in game_ids:
+            game = games.get(game_id)
+            if game is None or (game.status == 'ended' and not include_ended):
                 continue
-            seen.add(game_key)
-            try:
-                participants = self.be.get_many_participants(game_id=game.id)
-                player_count = sum(
-                    1 for p in participants if p.status in ('active', 'pending')
-                )
-            except LookupError:
-                player_count = 0
-            scored.append((game, player_count))
+            scored.append((game, counts.get(game_id, 0)))
 
         if not scored:
             raise LookupError('Player is not in any games.')
 
         return self._rank_scored_games(scored, today)
     
-    def game_info(self, game_id:int | str, show_leaderboard:bool=True) -> dtv.GameInfo: 
+    def game_info(self, game_id:int | str, show_leaderboard:bool=True, limit:Optional[int]=None, offset:int=0) -> dtv.GameInfo: 
         """Get information and leaderboard for a game.
 
         Args:
             game_id (int): Game ID
             show_leaderboard (bool, optional): Whether to include the leaderboard in the response
+            limit (Optional[int], optional): Only include this many leaderboard rows (`0` only counts them).
+            offset (int, optional): Skip this many leaderboard rows first.
 
         Returns:
             dict: Game information
@@ -2100,23 +2972,17 @@ class Frontend: # This will be where a bot (like discord) interacts
         if show_leaderboard:
             leaderboard = list()
             try:
-                players = self.be.get_many_participants(game_id=game_id, sort_by_value=True)
-                for player in players:
-                    user = self.be.get_user(player.user_id)
-                    leaderboard.append({ 
-                        'user_id': int(player.user_id),
-                        'current_value': round(player.current_value, 2) if player.current_value else 0, # Round to two decimal places
-                        'joined': player.datetime_joined,
-                        'change_dollars': round(player.change_dollars, 2) if player.change_dollars else 0, # Round to two decimal places
-                        'change_percent': round(player.change_percent, 2) if player.change_percent else 0, # Round to two decimal places
-                        'days_in_first': int(getattr(player, 'days_in_first', 0) or 0),
-                        'display_name': user.display_name or f'ID({player.user_id})',
-                        'last_updated': player.last_updated
-                    }) # Should keep order
+                if limit != 0:
+                    leaderboard = list(self.be.get_leaderboard(game_id, finalized=game.finalized, limit=limit, offset=offset)) # Frozen final standings once finalized
             except LookupError: # No players in game
                 self.logger.info(f'No players are currently in game: {game_id}')
-                
+            for entry in leaderboard: # Round to two decimal places
+                entry.current_value = round(entry.current_value, 2)
+                entry.change_dollars = round(entry.change_dollars, 2)
+                entry.change_percent = round(entry.change_percent, 2)
+
             info['leaderboard'] = leaderboard  # type: ignore WAA I DONT FUCKING CARE I KNOW THIS WORKS
+            info['leaderboard_size'] = len(leaderboard) if limit is None and not offset else self.be.count_leaderboard(game_id, finalized=game.finalized) # type: ignore
         return dtv.GameInfo.model_validate(info)
     
     # # USER RELATED
@@ -2131,6 +2997,8 @@ class Frontend: # This will be where a bot (like discord) interacts
         Returns:
             str: Status/result
         """
+        if self.be.is_registered(user_id): # No query for users we've seen
+            return "User already registered"
         try:
             self.be.add_user(user_id=user_id, source=source if source else self.source, display_name=username, permissions=self.default_perms)
             return "Registered"
@@ -2280,29 +3148,30 @@ class Frontend: # This will be where a bot (like discord) interacts
             statuses.append('pending_buy')
         if show_sold:
             statuses.append('sold')
+        if self.be.get_game(game_id).finalized: # Frozen final picks
+            return self.be.get_pick_results(game_id, participant_id=player_id, status=statuses)
         picks = self.be.get_many_stock_picks(participant_id=player_id, status=statuses, include_tickers=True)
         return picks
 
     def pick_capacity(self, user_id:int, game_id:int | str) -> tuple[int, int]:
-        """Return the remaining and total number of picks for a participant."""
-        self.register(user_id)
-        participant_id = self._participant_id(user_id=user_id, game_id=game_id)
-        game = self.be.get_game(game_id)
+        """Return the remaining and total number of picks for a participant.
+
+        Raises:
+            LookupError: Game or player doesn't exist
+        """
         try:
-            picks = self.be.get_many_stock_picks(
-                participant_id=participant_id,
-                status=['pending_buy', 'owned', 'pending_sell'],
-            )
-        except LookupError:
-            picks = ()
-        total = int(game.pick_count)
-        return max(total - len(picks), 0), total
+            context = self.be.get_pick_context(user_id=user_id, game_id=game_id)
+        except bexc.DoesntExistError as exc:
+            raise LookupError('Player not in game.') from exc
+        return max(context.pick_count - context.open_picks, 0), context.pick_count
     
     # # STOCK RELATED
-    def buy_stock(self, user_id:int, game_id:int | str, ticker:str):
+    def buy_stock(self, user_id:int, game_id:int | str, ticker:str) -> tuple[int, int]:
         """Pick/buy a stock
         
         Prevents users from picking too many stocks, or picking stocks if the game has already started and the pick date has passed.
+        The participant, game rules, pick count and stock come from one query (`Backend.get_pick_context`); Alpaca is only
+        asked about tickers that aren't in the database yet.
 
         Args:
             user_id (int): User ID.
@@ -2311,44 +3180,38 @@ class Frontend: # This will be where a bot (like discord) interacts
             
         Raises:
             ValueError: Invalid Ticker, too long!
-            _participant_id > bexc.DoesntExistError: Player not in game
-            _participant_id > LookupError: Game or player doesn't exist
+            LookupError: Game or player doesn't exist
             find_stock > ValueError: Stock is not tradeable.  Stock existed at some point, but cannot be traded
             find_stock > ValueError: Unable to find stock.  HTTP error when searching for stock, assume it doesn't exist
             find_stock > ValueError: Failed to add stock (usually means the stock doesn't exist)
             add_stock_pick > bexc.NotAllowedError: reason='Not active'.  Player status isn't active, so cannot pick stocks
             add_stock_pick > bexc.NotAllowedError: reason='Past pick_date'.  (only possible if a pick date is set).
             add_stock_pick > bexc.NotAllowedError: reason='Maximum picks reached'.  Player already has the maximum amount of stock picks.
-            add_stock_pick > bexc.AlreadyExistsError: Cannot own the same stock twice.
+            add_stock_pick > bexc.AlreadyExistsError: Cannot own the same stock twice (or, in draft mode, a stock another player holds).
             add_stock_pick > Exception: Some other issues ocurred.
-            
-        """ #TODO should this return picks remaining? Could also add that as another function
+
+        Returns:
+            tuple: (picks remaining, total picks) after this one.
+        """
         
         if len(str(ticker)) > 5:
             raise ValueError('Invalid Ticker, too long!')
         
-        self.register(user_id) # Must try to register user
-        player_id = self._participant_id(user_id=user_id, game_id=game_id) # If user doesn't exist in the game, error will be raised
-        resolved_ticker = self.gl.find_stock(ticker=str(ticker))  # Ensures stock exists; returns DB ticker
-        stock = self.be.get_stock(ticker_or_id=resolved_ticker)
+        try:
+            context = self.be.get_pick_context(user_id=user_id, game_id=game_id, ticker=str(ticker))
+        except bexc.DoesntExistError as exc:
+            self.register(user_id) # Must try to register user
+            raise LookupError('Player not in game.') from exc
+        self.be._check_pick(context) # Fail before any Alpaca lookup
+
+        stock = context.stock
+        if stock is None: # New to the database (or not a stock at all)
+            stock = self.be.get_stock(ticker_or_id=self.gl.find_stock(ticker=str(ticker)))
+        else:
+            self.gl._ensure_company_name(stock)
 
-        # Draft mode: prevent duplicate tickers across players
-        game = self.be.get_game(game_id=game_id)
-        if game.draft_mode:
-            try:
-                participants = self.be.get_many_participants(game_id=game_id)
-            except LookupError:
-                participants = []
-            for p in participants:
-                if p.id != player_id:
-                    try:
-                        existing = self.be.get_many_stock_picks(participant_id=p.id, stock_id=stock.id, status=['pending_buy', 'owned', 'pending_sell'])
-                        if len(existing) > 0:
-                            raise bexc.AlreadyExistsError(table='stock_picks', duplicate={'ticker': ticker}, message='Draft mode: ticker already picked by another participant')
-                    except LookupError:
-                        pass
-
-        self.be.add_stock_pick(participant_id=player_id, stock_id=stock.id) # Add the pick
+        self.be.add_stock_pick(participant_id=context.participation_id, stock_id=stock.id, context=context) # Add the pick (draft mode exclusivity is checked by the insert)
+        return max(context.pick_count - context.open_picks - 1, 0), context.pick_count
 
     def sell_stock(self, user_id:int, game_id:int | str, ticker:str) -> str:
         """Sell/cancel a stock pick.
@@ -2451,7 +3314,7 @@ class Frontend: # This will be where a bot (like discord) interacts
             name (str): Name for this game. 
             start_date (str): Start date in ISO8601 (YYYY-MM-DD). Cannot be changed once game has started.
             end_date (str, optional): End date ISO8601 (YYYY-MM-DD). 
-            status (str, optional): Game Status. 
+            status (str, optional): Game Status.  Cannot be changed once the game has ended and been finalized.
             starting_money (float, optional): Starting money. Cannot be changed once game has started.
             pick_date (str, optional): Date stocks must be picked by in ISO8601 (YYYY-MM-DD). Cannot be changed once game has started.
             private_game(bool, optional): Whether the game is private or not. 
@@ -2473,6 +3336,8 @@ class Frontend: # This will be where a bot (like discord) interacts
             raise PermissionError(f'User {user_id} is not allowed to make changes to game {game_id}')
         
         self.be.update_game(game_id=game_id, owner=owner, name=name, start_date=start_date, end_date=end_date, status=status, starting_money=starting_money, pick_date=pick_date, private_game=private_game, total_picks=total_picks, exclusive_picks=exclusive_picks, sell_during_game=sell_during_game, update_frequency=update_frequency, clear_end_date=clear_end_date, clear_pick_date=clear_pick_date)
+        if status == 'ended':
+            self.be.finalize_game(game_id) # Freeze results, career stats
 
     def leave_game(self, user_id:int, game_id:int | str):
         """Remove a participant and their picks from a game.
@@ -1,8 +1,23 @@
-"""Alpaca client: batch retries and no silent ticker drops."""
+"""Alpaca client: batch retries, backoff, circuit breaker and no silent ticker drops."""
+
+import json
+from typing import Optional
+from unittest.mock import MagicMock
 
 import pytest
+import requests
 
-from helpers.alpaca_client import AlpacaMarketData, BATCH_SIZE
+from helpers.alpaca_client import (
+    AlpacaMarketData,
+    BATCH_SIZE,
+    BREAKER_FAILURE_THRESHOLD,
+    MAX_REQUEST_ATTEMPTS,
+    CircuitBreaker,
+    CircuitOpenError,
+    parse_snapshots,
+    price_and_source_from_snapshot,
+    price_from_snapshot,
+)
 
 
 @pytest.fixture
@@ -102,3 +117,176 @@ def test_update_stock_prices_reports_missing_tickers(be, mocker, caplog):
     assert "DROP" in caplog.text
     day = __import__("datetime").datetime.now().strftime("%Y-%m-%d")
     assert be.get_many_stock_prices(stock_id=be.get_stock("KEEP").id, datetime=day)
+
+
+def _http(status: int, payload: Optional[dict] = None, headers: Optional[dict] = None) -> MagicMock:
+    response = MagicMock()
+    response.status_code = status
+    response.headers = headers or {}
+    response.json.return_value = payload or {}
+    return response
+
+
+def test_circuit_breaker_opens_then_allows_single_half_open_probe():
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=lambda: now[0])
+    breaker.record_failure()
+    assert breaker.state == "closed" and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+    now[0] = 31
+    assert breaker.state == "half_open"
+    assert breaker.allow() and not breaker.allow()  # one probe at a time
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    now[0] = 62
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.failures == 0
+
+
+def test_circuit_breaker_is_shared_safely_between_threads():
+    from concurrent.futures import ThreadPoolExecutor
+
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1_000_000, reset_timeout=30, clock=lambda: now[0])
+
+    def fail(_):
+        for _ in range(1_000):
+            breaker.record_failure()
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(fail, range(8)))
+    assert breaker.failures == 8_000  # No lost updates
+
+    breaker.failure_threshold = 1
+    breaker.record_failure()
+    now[0] = 31
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        assert sum(pool.map(lambda _: breaker.allow(), range(32))) == 1  # One half-open probe
+
+
+def test_get_retries_server_errors_with_backoff(alpaca, mocker):
+    session_get = mocker.patch.object(alpaca._session, "get", side_effect=[_http(503), _http(502), _http(200)])
+    sleep = mocker.patch("helpers.alpaca_client.time.sleep")
+    assert alpaca._get("https://example.test").status_code == 200
+    assert session_get.call_count == 3
+    first, second = (c.args[0] for c in sleep.call_args_list)
+    assert 0.5 <= first <= 1.0 and 1.0 <= second <= 2.0
+    assert alpaca.breaker.failures == 0
+
+
+def test_get_honors_retry_after_on_429(alpaca, mocker):
+    mocker.patch.object(alpaca._session, "get", side_effect=[_http(429, headers={"Retry-After": "7"}), _http(200)])
+    sleep = mocker.patch("helpers.alpaca_client.time.sleep")
+    assert alpaca._get("https://example.test").status_code == 200
+    sleep.assert_called_once_with(7.0)
+
+
+def test_get_waits_for_reset_when_rate_limit_exhausted(alpaca, mocker):
+    mocker.patch("helpers.alpaca_client.time.time", return_value=1000.0)
+    sleep = mocker.patch("helpers.alpaca_client.time.sleep")
+    mocker.patch.object(
+        alpaca._session,
+        "get",
+        return_value=_http(200, headers={"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "1012"}),
+    )
+    alpaca._get("https://example.test")
+    sleep.assert_not_called()
+    alpaca._get("https://example.test")
+    sleep.assert_called_once_with(12.0)
+
+
+def test_open_circuit_short_circuits_price_fetch(alpaca, mocker):
+    alpaca.breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    session_get = mocker.patch.object(alpaca._session, "get", side_effect=requests.ConnectionError("down"))
+    tickers = [f"T{i:03d}" for i in range(BATCH_SIZE * 3)]
+
+    assert alpaca.get_latest_prices(tickers) == {}
+    assert alpaca.breaker.state == "open"
+    assert session_get.call_count == 2  # Tripped during the first batch's retries
+
+    with pytest.raises(CircuitOpenError):
+        alpaca._get("https://example.test")
+    assert alpaca.is_market_open() is None
+
+
+def test_outage_opens_circuit_after_threshold_attempts(alpaca, mocker):
+    session_get = mocker.patch.object(alpaca._session, "get", return_value=_http(503))
+    sleep = mocker.patch("helpers.alpaca_client.time.sleep")
+
+    for _ in range(3):
+        try:
+            alpaca._get("https://example.test")
+        except CircuitOpenError:
+            pass
+    assert alpaca.breaker.state == "open"
+    assert session_get.call_count == BREAKER_FAILURE_THRESHOLD  # Not threshold * MAX_REQUEST_ATTEMPTS
+    assert sleep.call_count == MAX_REQUEST_ATTEMPTS - 1  # Only the first call backed off before the circuit opened
+
+
+def test_half_open_probe_gets_a_single_attempt(alpaca, mocker):
+    now = [0.0]
+    alpaca.breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=lambda: now[0])
+    alpaca.breaker.record_failure()
+    now[0] = 11
+    session_get = mocker.patch.object(alpaca._session, "get", return_value=_http(503))
+    assert alpaca._get("https://example.test").status_code == 503
+    assert session_get.call_count == 1
+    assert alpaca.breaker.state == "open"
+
+
+FULL_SNAPSHOT = {
+    "latestTrade": {"t": "2026-03-02T15:29:59Z", "x": "V", "p": 101.5, "s": 100, "c": ["@"], "i": 1, "z": "C"},
+    "latestQuote": {"t": "2026-03-02T15:29:59Z", "ax": "V", "ap": 101.6, "as": 1, "bx": "V", "bp": 101.4, "bs": 1, "c": ["R"], "z": "C"},
+    "minuteBar": {"t": "2026-03-02T15:29:00Z", "o": 101.0, "h": 102.0, "l": 100.5, "c": 101.5, "v": 900, "n": 9, "vw": 101.2},
+    "dailyBar": {"t": "2026-03-02T05:00:00Z", "o": 99.0, "h": 102.0, "l": 98.5, "c": 101.5, "v": 9000, "n": 90, "vw": 100.1},
+    "prevDailyBar": {"t": "2026-02-27T05:00:00Z", "o": 97.0, "h": 99.5, "l": 96.0, "c": 99.0, "v": 8000, "n": 80, "vw": 98.0},
+}
+
+
+def test_parse_snapshots_keeps_only_price_fields():
+    body = json.dumps({"AAA": FULL_SNAPSHOT, "C": FULL_SNAPSHOT, "NONE": None})
+    parsed = parse_snapshots(body)
+    assert parsed["AAA"] == {
+        "latestTrade": {"p": 101.5},
+        "latestQuote": {"ap": 101.6, "bp": 101.4},
+        "dailyBar": {"c": 101.5},
+        "prevDailyBar": {"c": 99.0},
+    }
+    assert parsed["C"] == parsed["AAA"] and parsed["NONE"] is None
+    assert price_from_snapshot(parsed["AAA"]) == price_from_snapshot(FULL_SNAPSHOT)
+
+
+def test_parse_snapshots_can_keep_bars():
+    parsed = parse_snapshots(json.dumps({"AAA": FULL_SNAPSHOT}), include_bars=True)["AAA"]
+    assert parsed["minuteBar"] == {"t": "2026-03-02T15:29:00Z", "o": 101.0, "h": 102.0, "l": 100.5, "c": 101.5, "v": 900}
+    assert set(parsed["dailyBar"]) == {"t", "o", "h", "l", "c", "v"}
+    assert parsed["latestTrade"] == {"p": 101.5}
+
+
+def test_fetch_snapshots_parses_compactly_by_default(alpaca, mocker):
+    response = _http(200)
+    response.content = json.dumps({"AAA": FULL_SNAPSHOT}).encode()
+    response.json.return_value = {"AAA": FULL_SNAPSHOT}
+    mocker.patch.object(alpaca, "_get", return_value=response)
+    assert alpaca.fetch_snapshots(["AAA"])["AAA"]["latestTrade"] == {"p": 101.5}
+    assert alpaca.fetch_snapshots(["AAA"], compact=False)["AAA"] == FULL_SNAPSHOT
+
+
+def test_get_latest_prices_records_price_source(alpaca, mocker):
+    mocker.patch.object(
+        alpaca,
+        "fetch_snapshots",
+        return_value={
+            "TRD": {"latestTrade": {"p": 1.0}},
+            "QTE": {"latestQuote": {"ap": 2.5, "bp": 1.5}},
+            "BAR": {"prevDailyBar": {"c": 3.0}},
+        },
+    )
+    prices = alpaca.get_latest_prices(["TRD", "QTE", "BAR"])
+    assert prices == {"TRD": 1.0, "QTE": 2.0, "BAR": 3.0}
+    assert alpaca.last_price_sources == {"TRD": "trade", "QTE": "quote", "BAR": "bar"}
+    assert price_and_source_from_snapshot({}) == (None, None)
@@ -0,0 +1,166 @@
+"""Streaming price ingestion against a local fake Alpaca websocket server."""
+
+import asyncio
+import json
+
+import pytest
+from aiohttp import WSMsgType, web
+from aiohttp.test_utils import TestServer
+
+from helpers.alpaca_stream import AlpacaPriceStream, StreamError
+from stocks import GameLogic
+
+
+class FakeAlpacaStream:
+    """Speaks enough of Alpaca's v2 stream protocol for the client: auth, subscribe, trades."""
+
+    def __init__(self, key: str = "test-key"):
+        self.key = key
+        self.subscribed: set[str] = set()
+        self.subscribed_event = asyncio.Event()
+        self.sockets: list[web.WebSocketResponse] = []
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/stream", self.handler)
+        return app
+
+    async def handler(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.sockets.append(ws)
+        await ws.send_json([{"T": "success", "msg": "connected"}])
+        async for msg in ws:
+            if msg.type != WSMsgType.TEXT:
+                continue
+            action = json.loads(msg.data)
+            if action["action"] == "auth":
+                if action["key"] != self.key:
+                    await ws.send_json([{"T": "error", "code": 402, "msg": "auth failed"}])
+                    await ws.close()
+                    break
+                await ws.send_json([{"T": "success", "msg": "authenticated"}])
+            elif action["action"] == "subscribe":
+                self.subscribed |= set(action["trades"])
+                await ws.send_json([{"T": "subscription", "trades": sorted(self.subscribed)}])
+                self.subscribed_event.set()
+            elif action["action"] == "unsubscribe":
+                self.subscribed -= set(action["trades"])
+                await ws.send_json([{"T": "subscription", "trades": sorted(self.subscribed)}])
+        return ws
+
+    async def send_trades(self, trades: list[dict]) -> None:
+        for ws in self.sockets:
+            if not ws.closed:
+                await ws.send_json(trades)
+
+
+def _trade(symbol: str, price: float, stamp: str = "2025-05-21T14:00:05Z") -> dict:
+    return {"T": "t", "S": symbol, "p": price, "s": 100, "t": stamp}
+
+
+def _realtime_game(be, ticker: str = "BRK-B", frequency: str = "realtime"):
+    be.add_user(101, "testing")
+    be.add_game(user_id=101, name=f"Stream{frequency}", start_date="2025-01-01", total_picks=2, update_frequency=frequency)
+    game = be.get_many_games(name=f"Stream{frequency}", owner_id=101)[0]
+    be.update_game(game.id, status="active")
+    be.add_participant(101, game.id)
+    participant = be.get_many_participants(game_id=game.id)[0]
+    be.add_stock(ticker, "NYSE", "Streamed Co")
+    stock = be.get_stock(ticker)
+    be.add_stock_pick(participant.id, stock.id)
+    return game, participant, stock
+
+
+def test_stream_holdings_only_cover_streamed_games(be):
+    game, _, stock = _realtime_game(be)
+    rows = be.get_stream_holdings()
+    assert [(r["game_id"], r["stock_id"], r["ticker"]) for r in rows] == [(game.id, stock.id, "BRK-B")]
+    assert be.get_stream_holdings(update_frequencies=("daily",)) == ()
+
+
+def test_coalesce_keeps_last_price_per_ticker_minute(be):
+    stream = AlpacaPriceStream(be, api_key="k", secret_key="s")
+    stream.coalesce(_trade("BRK.B", 1.0, "2025-05-21T14:00:01Z"))
+    stream.coalesce(_trade("BRK.B", 2.0, "2025-05-21T14:00:59Z"))
+    stream.coalesce(_trade("BRK.B", 3.0, "2025-05-21T14:01:00Z"))
+    stream.coalesce({"T": "t", "S": "BRK.B"})  # malformed, ignored
+    assert sorted(stream._pending.values()) == [2.0, 3.0]
+    assert stream.stats["trades"] == 3
+
+
+def test_add_many_stock_prices_replace_overwrites_minute(be):
+    be.add_stock("AAA", "NASDAQ", "Aaa Corp")
+    stock_id = be.get_stock("AAA").id
+    assert be.add_many_stock_prices([{"stock_id": stock_id, "price": 1.0, "datetime": "2025-05-21 10:00:00"}]) == 1
+    assert be.add_many_stock_prices([{"stock_id": stock_id, "price": 2.0, "datetime": "2025-05-21 10:00:00"}]) == 0  # Skipped
+    assert be.get_many_stock_prices(stock_id=stock_id)[0].price == 1.0
+    assert be.add_many_stock_prices([{"stock_id": stock_id, "price": 2.0, "datetime": "2025-05-21 10:00:00"}], replace=True) == 1
+    assert be.get_many_stock_prices(stock_id=stock_id)[0].price == 2.0
+    assert len(be.get_many_stock_prices(stock_id=stock_id, datetime="2025-05-21")) == 1
+
+
+def test_stream_subscribes_coalesces_and_flushes(be):
+    game, participant, stock = _realtime_game(be)
+    logic = GameLogic(be.sql.db)
+    flushed: list[list[str]] = []
+
+    async def on_flush(tickers):
+        flushed.append(tickers)
+        await asyncio.to_thread(logic.update_streamed_games, tickers)
+
+    async def scenario():
+        fake = FakeAlpacaStream()
+        server = TestServer(fake.app())
+        await server.start_server()
+        stream = AlpacaPriceStream(
+            be,
+            api_key="test-key",
+            secret_key="test-secret",
+            url=str(server.make_url("/stream")),
+            flush_interval=3600,
+            on_flush=on_flush,
+        )
+        runner = asyncio.create_task(stream.run())
+        try:
+            await asyncio.wait_for(fake.subscribed_event.wait(), timeout=5)
+            await fake.send_trades([_trade("BRK.B", 100.0), _trade("BRK.B", 125.0)])
+            for _ in range(100):
+                if stream.stats["trades"] == 2:
+                    break
+                await asyncio.sleep(0.02)
+            written = await stream.flush()
+        finally:
+            await stream.stop()
+            await asyncio.wait_for(runner, timeout=5)
+            await server.close()
+        return fake, stream, written
+
+    fake, stream, written = asyncio.run(scenario())
+
+    assert fake.subscribed == {"BRK.B"}
+    assert written == ["BRK-B"] and flushed == [["BRK-B"]]
+    prices = be.get_many_stock_prices(stock_id=stock.id)
+    assert len(prices) == 1 and prices[0].price == 125.0
+    pick = be.get_many_stock_picks(participant_id=participant.id)[0]
+    assert pick.status == "owned"
+    assert be.get_participant(participant.id).current_value == pytest.approx(game.start_money)
+
+
+def test_stream_rejects_bad_credentials(be):
+    async def scenario():
+        server = TestServer(FakeAlpacaStream(key="right-key").app())
+        await server.start_server()
+        stream = AlpacaPriceStream(be, api_key="wrong-key", secret_key="s", url=str(server.make_url("/stream")))
+        try:
+            await stream.run_once()
+        finally:
+            await server.close()
+
+    with pytest.raises(StreamError):
+        asyncio.run(scenario())
+
+
+def test_stream_requires_positive_intervals(be):
+    with pytest.raises(ValueError):
+        AlpacaPriceStream(be, api_key="k", secret_key="s", flush_interval=0)
@@ -31,7 +31,7 @@ def test_sell_ticker_autocomplete_accepts_string_game_ids():
 def test_buy_ticker_autocomplete_includes_typed_ticker_not_in_db():
     fake_frontend = SimpleNamespace(
         be=SimpleNamespace(
-            get_many_stocks=lambda: (
+            get_many_stocks=lambda **_: (
                 SimpleNamespace(ticker="AAPL", company="Apple Inc."),
                 SimpleNamespace(ticker="MSFT", company="Microsoft Corporation"),
             ),
@@ -53,7 +53,7 @@ def test_buy_ticker_autocomplete_includes_typed_ticker_not_in_db():
 def test_buy_ticker_autocomplete_prefers_db_label_for_known_ticker():
     fake_frontend = SimpleNamespace(
         be=SimpleNamespace(
-            get_many_stocks=lambda: (
+            get_many_stocks=lambda **_: (
                 SimpleNamespace(ticker="MSFT", company="Microsoft Corporation"),
             ),
         ),
@@ -70,7 +70,7 @@ def test_buy_ticker_autocomplete_prefers_db_label_for_known_ticker():
 def test_buy_ticker_autocomplete_bare_ticker_when_company_missing():
     fake_frontend = SimpleNamespace(
         be=SimpleNamespace(
-            get_many_stocks=lambda: (
+            get_many_stocks=lambda **_: (
                 SimpleNamespace(ticker="RACE", company="RACE"),
                 SimpleNamespace(ticker="PHYS", company=""),
             ),
@@ -86,7 +86,7 @@ def test_buy_ticker_autocomplete_bare_ticker_when_company_missing():
 
 def test_buy_ticker_autocomplete_works_when_db_empty():
     fake_frontend = SimpleNamespace(
-        be=SimpleNamespace(get_many_stocks=lambda: (_ for _ in ()).throw(LookupError("No items found"))),
+        be=SimpleNamespace(get_many_stocks=lambda **_: (_ for _ in ()).throw(LookupError("No items found"))),
     )
     autocomplete.init_autocomplete(fake_frontend)
 
@@ -97,7 +97,7 @@ def test_buy_ticker_autocomplete_works_when_db_empty():
 
 def test_buy_ticker_autocomplete_normalizes_class_share():
     fake_frontend = SimpleNamespace(
-        be=SimpleNamespace(get_many_stocks=lambda: ()),
+        be=SimpleNamespace(get_many_stocks=lambda **_: ()),
     )
     autocomplete.init_autocomplete(fake_frontend)
 
@@ -407,3 +407,42 @@ class TestBackend:
                 price=s_price,
                 datetime=d_datetime 
             )
+
+    def test_many_gets_page_by_keyset(self, be: Backend):
+        be.add_user(user_id=1, source='test')
+        for n in range(5):
+            be.add_stock(ticker=f'PG{n}', exchange='NASDAQ', company_name=f'Page {n}')
+            be.add_game(user_id=1, name=f'Paged {n}', start_date='2099-01-01')
+        game_id = be.get_many_games(name='Paged 0')[0].id
+        for user_id in range(2, 7):
+            be.add_user(user_id=user_id, source='test')
+            be.add_participant(user_id=user_id, game_id=game_id)
+        participant_ids = [p.id for p in be.get_many_participants(game_id=game_id)]
+        for n, participant_id in enumerate(participant_ids):
+            be.add_stock_pick(participant_id, be.get_stock(f'PG{n}').id)
+            pick = be.get_many_stock_picks(participant_id=participant_id)[0]
+            be.update_stock_pick(pick.id, change_percent=float(n % 3), change_dollars=1.0)
+
+        def pages(get, key, **filters):
+            seen, after = [], None
+            while True:
+                try:
+                    page = get(limit=2, after=after, **filters)
+                except LookupError:
+                    return seen
+                assert len(page) <= 2
+                seen.extend(getattr(item, key) for item in page)
+                after = page[-1].id
+
+        assert pages(be.get_many_games, 'id') == sorted(str(game.id) for game in be.get_many_games())
+        assert pages(be.get_many_stocks, 'ticker') == [f'PG{n}' for n in range(5)]
+        assert pages(be.get_many_participants, 'id', game_id=game_id) == sorted(participant_ids, reverse=True)
+        # Same best-first order as the unpaged list, ties broken by newest pick
+        paged_picks = pages(be.get_many_stock_picks, 'change_percent')
+        assert paged_picks == [pick.change_percent for pick in be.get_many_stock_picks()]
+        assert len(paged_picks) == be.count_many_stock_picks() == 5
+        assert be.count_many_games() == 5 and be.count_many_games(name='Paged 1') == 1
+        assert be.count_many_stocks(exchange='NASDAQ') == 5
+        assert be.count_many_participants(game_id=game_id) == 5
+        with pytest.raises(ValueError):
+            be.get_many_stocks(limit=0)
@@ -24,11 +24,38 @@ class TestGenerateAndRepair:
             assert len(gid) == 5
             assert gid.isalnum()
 
+    def test_add_game_retries_taken_ids(self, be: Backend, mocker):
+        _, first = _owner_game(be, name="FirstId")
+        mocker.patch.object(be, "generate_alnum_id", side_effect=[first.id, first.id, "NEW01"])
+        _, second = _owner_game(be, name="SecondId")
+        assert second.id == "NEW01"
+        assert be.game_id_stats() == {"allocated": 2, "collisions": 2, "collision_rate": 1.0}
+        assert Backend(be.sql.db).game_id_stats() == be.game_id_stats()  # Shared per database
+
+        mocker.patch.object(be, "generate_alnum_id", return_value=first.id)
+        with pytest.raises(Exception, match="no free game ID"):
+            _owner_game(be, name="NoFreeId")
+
     def test_repair_games_noop_and_with_games(self, be: Backend):
         be.repair_games()  # empty DB
         _owner_game(be, name="RepairMe")
         be.repair_games()  # loads each game via get_game
 
+    def test_invalid_game_is_skipped_and_queued_for_repair(self, be: Backend, mocker):
+        _owner_game(be, name="GoodGame")
+        _, bad = _owner_game(be, name="BadGame")
+        be.sql.send_query("UPDATE games SET name = ? WHERE game_id = ?", values=["x" * 50, bad.id], mode="update")
+        be.game_cache.clear()
+
+        send = mocker.spy(be.sql, "_run_query")
+        assert [game.name for game in be.get_many_games()] == ["GoodGame"]
+        assert send.call_count == 1  # No repair-and-retry
+        assert len(be.repair_queue) == 1
+
+        assert be.repair_queued_games() == 1
+        assert len(be.repair_queue) == 0
+        assert len(be.get_many_games()) == 2
+
 
 class TestGetAndUpdateGame:
     def test_get_game_by_id(self, be: Backend):
@@ -158,6 +185,26 @@ class TestStocksAndPrices:
         assert len(prices) == 2
         assert prices[0].price >= prices[1].price or prices[0].datetime >= prices[1].datetime
 
+    def test_price_range_helpers(self, be: Backend):
+        be.add_stock("RNG", "NASDAQ", "Range Co")
+        stock = be.get_stock("RNG")
+        be.add_many_stock_prices([
+            {"stock_id": stock.id, "price": 10.0, "datetime": "2025-05-20 15:59:00"},
+            {"stock_id": stock.id, "price": 11.0, "datetime": "2025-05-21 10:00:00"},
+            {"stock_id": stock.id, "price": 12.0, "datetime": "2025-05-21 11:30:00"},
+        ])
+        between = be.get_prices_between(stock.id, "2025-05-21", "2025-05-22")
+        assert [p.price for p in between] == [11.0, 12.0]
+        assert be.get_price_at_or_before(stock.id, "2025-05-21 11:29:00").price == 11.0
+        assert be.get_price_at_or_before(stock.id, "2025-05-21").price == 10.0  # start of day -> previous close
+        assert be.get_many_stock_prices(stock_id=stock.id, datetime="2025-05-21 11:")[0].price == 12.0
+        with pytest.raises(LookupError):
+            be.get_price_at_or_before(stock.id, "2025-05-20 15:58:00")
+        with pytest.raises(LookupError):
+            be.get_prices_between(stock.id, "2025-05-22", "2025-05-23")
+        with pytest.raises(ValueError):
+            be.add_stock_price(stock.id, 1.0, datetime="21/05/2025")
+
 
 class TestStockPicks:
     def _active_participant(self, be: Backend, *, picks=10):
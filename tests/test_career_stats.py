@@ -0,0 +1,76 @@
+"""Finalizing ended games: frozen results, and career stats on ``users`` added once per game (rebuildable)."""
+
+from datetime import date
+
+import pytest
+
+from stocks import GameLogic
+
+
+def _ended_game(be, name, values, start_money=1_000):
+    """Game whose end date has passed, with ``{user_id: final value}`` players (all active)."""
+    game_id = be.add_game(user_id=501, name=name, start_date="2025-01-01", end_date="2025-01-31", starting_money=start_money)
+    be.update_game(game_id, status="active")
+    for user_id, value in values.items():
+        be.add_participant(user_id, game_id, force_active=True)
+        player = be.get_many_participants(game_id=game_id, user_id=user_id)[0]
+        be.update_participant(player.id, current_value=value, change_dollars=round(value - start_money, 2))
+    return game_id
+
+
+def _stats(be, *user_ids):
+    return [(u.overall_wins, u.change_dollars, u.change_percent) for u in (be.get_user(user_id) for user_id in user_ids)]
+
+
+def test_ending_games_adds_results_once(be, mocker):
+    for user_id in (501, 502):
+        be.add_user(user_id, "testing")
+    _ended_game(be, "CareerOne", {501: 1_200.0, 502: 900.0})
+    _ended_game(be, "CareerTwo", {501: 4_500.0, 502: 5_500.0}, start_money=5_000)
+    pending = _ended_game(be, "CareerPending", {502: 9_000.0})
+    be.update_participant(be.get_many_participants(game_id=pending)[0].id, status="pending")
+
+    logic = GameLogic(be.sql.db)
+    mocker.patch.object(logic, "_today_et", return_value=date(2025, 2, 1))
+    logic.update_game_statuses()
+    logic.update_game_statuses()  # Already ended: nothing added twice
+    expected = [(1, -300.0, -5.0), (1, 400.0, 6.67)]
+    assert _stats(be, 501, 502) == expected
+    assert be.finalize_game(pending) is False
+
+    be.sql.send_query("UPDATE users SET overall_wins = 0, change_dollars = NULL, change_percent = NULL, career_start_money = 0", mode="update")
+    be.rebuild_career_stats()
+    assert _stats(be, 501, 502) == expected
+
+
+def test_finalized_game_views_read_frozen_results(fe):
+    owner_id, other_id = 10, 12
+    fe.new_game(user_id=owner_id, name="Frozen", start_date="2025-01-01")
+    game = fe.be.get_many_games(name="Frozen", owner_id=owner_id, include_private=True)[0]
+    fe.join_game(user_id=other_id, game_id=game.id)
+    fe.be.add_stock("FRZ1", "NASDAQ", "Frozen One")
+    stock = fe.be.get_stock("FRZ1")
+    owner_pid = fe._participant_id(owner_id, game.id)
+    fe.be.add_stock_pick(owner_pid, stock.id)
+    pick_id = fe.be.get_many_stock_picks(participant_id=owner_pid)[0].id
+    fe.be.update_stock_pick(pick_id, status="owned", shares=10, start_value=1_000, current_value=1_500, change_dollars=500, change_percent=50)
+    fe.be.update_participant(owner_pid, current_value=10_500, change_dollars=500, change_percent=5)
+    fe.be.update_participant(fe._participant_id(other_id, game.id), current_value=9_000, change_dollars=-1_000, change_percent=-10)
+
+    fe.manage_game(owner_id, game.id, status="ended")
+    assert fe.be.get_game(game.id).finalized
+    assert fe.be.finalize_game(game.id) is False
+
+    # Later edits to the live rows don't change what an ended game shows
+    fe.be.update_participant(owner_pid, current_value=1.0)
+    fe.be.update_stock_pick(pick_id, current_value=1.0)
+    board = fe.game_info(game.id).leaderboard or []
+    assert [(row.user_id, row.current_value, row.rank) for row in board] == [(owner_id, 10_500, 1), (other_id, 9_000, 2)]
+    (pick,) = fe.my_stocks(owner_id, game.id)
+    assert (pick.stock_ticker, pick.current_value, pick.status) == ("FRZ1", 1_500, "owned")
+
+    # Reopening would leave the frozen rows and career stats behind the live game
+    with pytest.raises(ValueError):
+        fe.manage_game(owner_id, game.id, status="active")
+    assert fe.be.get_game(game.id).status == "ended"
+    fe.manage_game(owner_id, game.id, name="FrozenRenamed")  # Other settings can still change
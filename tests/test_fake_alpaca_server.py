@@ -0,0 +1,69 @@
+"""Offline Alpaca stand-in: replay, fault injection and the update-cycle benchmark."""
+
+import pytest
+
+from helpers.alpaca_client import AlpacaMarketData, CircuitBreaker
+from scripts.benchmark_update_cycle import PHASES, run_benchmark
+from scripts.fake_alpaca_server import FakeAlpacaServer, default_snapshot
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(mocker):
+    mocker.patch("helpers.alpaca_client.time.sleep")
+
+
+def _client(server: FakeAlpacaServer) -> AlpacaMarketData:
+    return AlpacaMarketData(
+        api_key="test-key",
+        secret_key="test-secret",
+        trading_base=server.trading_base,
+        data_base=server.data_base,
+    )
+
+
+def test_prices_thousands_of_symbols_offline():
+    tickers = [f"S{i:04d}" for i in range(2500)] + ["BRK-B", "GONE"]
+    with FakeAlpacaServer(unknown_symbols={"GONE"}) as server:
+        prices = _client(server).get_latest_prices(tickers)
+        stats = dict(server.stats)
+    assert set(prices) == set(tickers) - {"GONE"}
+    assert all(price > 0 for price in prices.values())
+    assert stats["symbols"] >= len(tickers)
+
+
+def test_replays_recorded_fixture():
+    fixture = {
+        "snapshots": {"AAPL": default_snapshot(123.45)},
+        "clock": {"is_open": False},
+        "assets": {"AAPL": {"symbol": "AAPL", "class": "us_equity", "status": "active", "tradable": True, "name": "Apple Inc."}},
+    }
+    with FakeAlpacaServer(fixture) as server:
+        client = _client(server)
+        assert client.get_latest_prices(["AAPL"]) == {"AAPL": 123.45}
+        assert client.is_market_open() is False
+        assert client.get_us_equity("AAPL")["name"] == "Apple Inc."
+
+
+def test_injected_errors_trip_the_circuit():
+    with FakeAlpacaServer(error_rate=1.0) as server:
+        client = _client(server)
+        client.breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+        assert client.get_latest_prices(["AAA", "BBB"]) == {}
+        assert client.breaker.state == "open"
+        requests_sent = server.stats["requests"]
+    assert requests_sent == server.stats["errors"] and requests_sent <= 4
+
+
+def test_rate_limited_requests_are_retried():
+    with FakeAlpacaServer(rate_limit_rate=0.5, retry_after=0, seed=3) as server:
+        prices = _client(server).get_latest_prices([f"R{i:03d}" for i in range(300)])
+        stats = dict(server.stats)
+    assert len(prices) == 300
+    assert stats["rate_limited"] > 0
+
+
+def test_benchmark_runs_full_cycle(tmp_path):
+    result = run_benchmark(tickers=250, games=1, players=2, picks=2, db_path=str(tmp_path / "bench.sqlite"))
+    assert result["price_rows"] == 250
+    assert set(result["phase_seconds"]) == set(PHASES)
+    assert len(result["cycle_seconds"]) == 1
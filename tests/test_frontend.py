@@ -160,6 +160,20 @@ class TestFrontend:
         )
         assert a == 'User already registered'
 
+    def test_register_known_user_runs_no_query(self, fe: Frontend, mocker):
+        fe.register(user_id=11)
+        fe.be.add_user(12, 'other') # Added straight through the backend
+        send = mocker.spy(fe.be.sql, '_run_query')
+        assert fe.register(user_id=11) == 'User already registered'
+        assert fe.register(user_id=12) == 'User already registered'
+        assert send.call_count == 0
+
+        fe.be.add_user(13, 'third')
+        fe.be._known_users.discard(13) # As if another process added user 13
+        assert fe.register(user_id=13) == 'User already registered' # Falls back to the insert
+        fe.be.remove_user(13)
+        assert not fe.be.is_registered(13)
+
     def test_manage_game_can_clear_optional_dates(self, fe: Frontend):
         game_id = fe.new_game(
             user_id=10,
@@ -201,3 +215,21 @@ class TestFrontend:
         game_id = fe.new_game(user_id=10, name='PickCapacity', start_date='2099-10-10', total_picks=3)
 
         assert fe.pick_capacity(10, game_id) == (3, 3)
+
+    def test_game_info_leaderboard_pages_in_one_query(self, fe: Frontend, mocker):
+        game_id = fe.new_game(user_id=10, name='PagedBoard', start_date='2099-10-10')
+        for user_id, value in ((21, 10_500.0), (22, 9_000.0), (23, 12_000.0)):
+            fe.register(user_id, username=f'Player{user_id}')
+            fe.join_game(user_id, game_id)
+            fe.be.update_participant(fe._participant_id(user_id, game_id), current_value=value)
+        fe.be.update_participant(fe._participant_id(10, game_id), current_value=10_000.0)
+
+        board = fe.game_info(game_id).leaderboard or []
+        assert [(e.user_id, e.display_name) for e in board] == [(23, 'Player23'), (21, 'Player21'), (10, 'ID(10)'), (22, 'Player22')]
+
+        send = mocker.spy(fe.be.sql, '_run_query')
+        page = fe.game_info(game_id, limit=2, offset=1)
+        assert [e.user_id for e in page.leaderboard or []] == [21, 10]
+        assert page.leaderboard_size == 4
+        assert send.call_count == 2 # Page, count (the game is cached)
+        assert fe.game_info(game_id, limit=0).leaderboard == []
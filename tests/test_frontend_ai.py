@@ -2,6 +2,7 @@ import pytest
 from stocks import Frontend, Backend 
 from helpers.datatype_validation import GameInfo, GameLeaderboard, GameParticipant
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import helpers.exceptions as bexc
 
 MOCK_DATETIME_STR = "2025-05-21 10:00:00" # Fixed timestamp for tests, matches conftest
@@ -292,7 +293,7 @@ class TestFrontend:
         other_participant = fe._participant_id(other_user_id, game.id)
         fe.be.update_participant(owner_participant, current_value=11_000, change_dollars=1_000, change_percent=10)
         fe.be.update_participant(other_participant, current_value=9_000, change_dollars=-1_000, change_percent=-10)
-        fe.be.update_game(game.id, status="ended")
+        fe.manage_game(owner_id, game.id, status="ended")
 
         owner = fe.get_user(owner_id)
         other = fe.get_user(other_user_id)
@@ -494,6 +495,27 @@ class TestFrontend:
         assert len(picks) == 1
         assert picks[0].status == 'pending_buy'
 
+    def test_buy_stock_known_stock_runs_two_statements(self, fe: Frontend, mocker):
+        owner_id = 10
+        game_id = fe.new_game(user_id=owner_id, name="LeanBuy", start_date="2099-06-01", total_picks=3)
+        _add_stock_to_db(fe.be, ticker="BRK-B", company_name="Berkshire")
+        find_stock = mocker.spy(fe.gl, 'find_stock')
+        send = mocker.spy(fe.be.sql, '_run_query')
+
+        assert fe.buy_stock(user_id=owner_id, game_id=game_id, ticker="brk.b") == (2, 3)
+        assert send.call_count == 2 # Context (participant, game, picks, stock), then the guarded insert
+        find_stock.assert_not_called()
+        assert fe.pick_capacity(owner_id, game_id) == (2, 3)
+        with pytest.raises(LookupError):
+            fe.buy_stock(user_id=99, game_id=game_id, ticker="BRK-B")
+
+    def test_buy_stock_benchmark_smoke(self, tmp_path):
+        from scripts.benchmark_buy_stock import run_benchmark
+
+        result = run_benchmark(tickers=20, players=3, picks=2, draft=True, db_path=str(tmp_path / "bench.sqlite"))
+        assert result["buys"] == 6
+        assert result["statements_per_buy"] == 2
+
     def test_buy_stock_at_max_picks(self, fe: Frontend):
         owner_id = 10
         game_name = "MaxPicksGame"
@@ -722,6 +744,65 @@ class TestFrontend:
         with pytest.raises(bexc.AlreadyExistsError):
             fe.buy_stock(user_id=other_user_id, game_id=game.id, ticker=stock.ticker)
 
+    def test_draft_mode_exclusivity_is_atomic(self, fe: Frontend):
+        owner_id = 10
+        game_id = fe.new_game(user_id=owner_id, name="RaceDraft", start_date="2099-06-01", pick_date="2099-06-01", exclusive_picks=True)
+        players = list(range(30, 38))
+        for user_id in players:
+            fe.join_game(user_id=user_id, game_id=game_id)
+        stock = _add_stock_to_db(fe.be, "RACE")
+        participant_ids = [fe._participant_id(user_id=user_id, game_id=game_id) for user_id in players]
+
+        def buy(participant_id: int) -> bool:
+            try:
+                Backend(fe.be.sql.db).add_stock_pick(participant_id=participant_id, stock_id=stock.id) # Own connection per thread
+                return True
+            except bexc.AlreadyExistsError:
+                return False
+
+        with ThreadPoolExecutor(max_workers=len(participant_ids)) as pool:
+            assert sum(pool.map(buy, participant_ids)) == 1
+        (winner,) = fe.be.get_many_stock_picks(stock_id=stock.id)
+
+        # Selling frees the stock for everyone else
+        fe.be.update_stock_pick(pick_id=winner.id, status='sold')
+        other = next(pid for pid in participant_ids if pid != winner.participation_id)
+        fe.be.add_stock_pick(participant_id=other, stock_id=stock.id)
+
+    def test_pick_limit_race_is_not_reported_as_draft_mode(self, fe: Frontend, mocker):
+        owner_id = 10
+        game_id = fe.new_game(user_id=owner_id, name="RaceLimit", start_date="2099-06-01", pick_date="2099-06-01", total_picks=1)
+        participant_id = fe._participant_id(user_id=owner_id, game_id=game_id)
+        stocks = [_add_stock_to_db(fe.be, f"LIM{n}") for n in range(6)]
+
+        stale = fe.be.get_pick_context(participant_id=participant_id) # Read before another buy fills the limit
+        fe.be.add_stock_pick(participant_id=participant_id, stock_id=stocks[0].id)
+        with pytest.raises(bexc.NotAllowedError) as exc:
+            fe.be.add_stock_pick(participant_id=participant_id, stock_id=stocks[1].id, context=stale)
+        assert exc.value.reason == 'Maximum picks reached'
+        fe.be.update_stock_pick(pick_id=fe.be.get_many_stock_picks(participant_id=participant_id)[0].id, status='sold')
+
+        fe.be.update_participant(participant_id, status='inactive') # Paused during the insert, back before the re-read
+        reread = fe.be.get_pick_context
+        def reactivate_then_read(**kwargs):
+            fe.be.update_participant(participant_id, status='active')
+            return reread(**kwargs)
+        patched = mocker.patch.object(fe.be, 'get_pick_context', side_effect=reactivate_then_read)
+        with pytest.raises(bexc.NotAllowedError) as exc:
+            fe.be.add_stock_pick(participant_id=participant_id, stock_id=stocks[1].id, context=stale)
+        assert exc.value.reason == 'Changed while picking'
+        mocker.stop(patched)
+
+        def buy(stock_id: int) -> bool:
+            try:
+                Backend(fe.be.sql.db).add_stock_pick(participant_id=participant_id, stock_id=stock_id) # Own connection per thread
+                return True
+            except bexc.NotAllowedError:
+                return False
+
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            assert sum(pool.map(buy, [stock.id for stock in stocks[1:]])) == 1
+
     # # FORCE_UPDATE # #
     def test_force_update_by_owner_success(self, fe: Frontend, mocker):
         owner_id = 10 # This is fe.owner_id from conftest
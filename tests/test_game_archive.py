@@ -0,0 +1,149 @@
+"""Hot/cold split: old finalized games move to the archive file and stay readable."""
+
+import sqlite3
+from datetime import date
+
+import pytest
+
+from helpers.game_archive import archive_ended_games
+from stocks import GameLogic
+
+
+def _finished_game(fe, owner_id, name, end_date, value):
+    fe.new_game(user_id=owner_id, name=name, start_date="2025-01-01", end_date=end_date)
+    game = fe.be.get_many_games(name=name, owner_id=owner_id, include_private=True)[0]
+    pid = fe._participant_id(owner_id, game.id)
+    fe.be.add_stock_pick(pid, fe.be.get_stock("ARC1").id)
+    pick = fe.be.get_many_stock_picks(participant_id=pid)[0]
+    fe.be.update_stock_pick(pick.id, status="owned", shares=5, start_value=100, current_value=120, change_dollars=20, change_percent=20)
+    fe.be.update_participant(pid, current_value=value, change_dollars=value - 10_000)
+    fe.manage_game(owner_id, game.id, status="ended")
+    return game.id
+
+
+def _main_count(fe, table):
+    return fe.be.sql.send_query(f"SELECT COUNT(*) AS n FROM {table}").result[0]["n"]
+
+
+def test_archived_games_move_out_and_stay_readable(fe):
+    owner_id = 10
+    fe.be.add_stock("ARC1", "NASDAQ", "Archive One")
+    old = _finished_game(fe, owner_id, "ArchiveOld", "2025-01-31", 10_400.0)
+    recent = _finished_game(fe, owner_id, "ArchiveRecent", "2025-05-30", 9_800.0)
+
+    report = archive_ended_games(fe.be.sql.db, fe.be.archive_db, 90, today=date(2025, 6, 1))
+    assert (report["games"], report["game_participants"], report["stock_picks"], report["pick_results"]) == (1, 1, 1, 1)
+    assert _main_count(fe, "games") == 1 and _main_count(fe, "stock_picks") == 1  # Only the recent game is left
+    again = archive_ended_games(fe.be.sql.db, fe.be.archive_db, 90, today=date(2025, 6, 1))
+    assert again["games"] == 0
+
+    game = fe.be.get_game(old)
+    assert (game.name, game.status, game.finalized) == ("ArchiveOld", "ended", True)
+    ended = fe.be.get_many_games(owner_id=owner_id, include_private=True, include_open=False, include_active=False, include_ended=True)
+    assert {g.id for g in ended} == {old, recent}
+    assert [p.user_id for p in fe.be.get_many_participants(game_id=old)] == [owner_id]
+    board = fe.game_info(old).leaderboard or []
+    assert [(row.user_id, row.current_value) for row in board] == [(owner_id, 10_400.0)]
+    (pick,) = fe.my_stocks(owner_id, old)
+    assert (pick.stock_ticker, pick.current_value) == ("ARC1", 120)
+    assert fe.get_user(owner_id).change_dollars == pytest.approx(200.0)  # Career stats are untouched
+
+    # Columns added to the main schema later are added to the archive too
+    fe.be.sql.send_query("ALTER TABLE games ADD COLUMN season TEXT DEFAULT NULL", mode="ddl")
+    assert archive_ended_games(fe.be.sql.db, fe.be.archive_db, 0, today=date(2025, 6, 2))["games"] == 1
+    conn = sqlite3.connect(fe.be.archive_db)
+    try:
+        assert "season" in {row[1] for row in conn.execute("PRAGMA table_info(games)")}
+        assert conn.execute("SELECT COUNT(*) FROM games").fetchone()[0] == 2
+    finally:
+        conn.close()
+
+
+def test_user_lookups_include_archived_games(fe):
+    owner_id = 10
+    fe.be.add_stock("ARC1", "NASDAQ", "Archive One")
+    old = _finished_game(fe, owner_id, "MineOld", "2025-01-31", 10_400.0)
+    recent = _finished_game(fe, owner_id, "MineRecent", "2025-05-30", 9_800.0)
+    archive_ended_games(fe.be.sql.db, fe.be.archive_db, 90, today=date(2025, 6, 1))
+
+    assert {p.game_id for p in fe.be.get_many_participants(user_id=owner_id)} == {old, recent}
+    assert fe.be.count_many_participants(user_id=owner_id) == 2
+    paged, after = [], None
+    while True:
+        try:
+            page = fe.be.get_many_participants(user_id=owner_id, limit=1, after=after)
+        except LookupError:
+            break
+        paged.append(page[0].game_id)
+        after = page[0].id
+    assert paged == sorted([old, recent], reverse=True)
+
+    ranked = fe.list_my_games_ranked(owner_id, include_ended=True, today=date(2025, 6, 1))
+    assert {game.id for game, _ in ranked} == {old, recent}
+
+
+def test_new_games_skip_archived_ids_without_reading_the_archive(fe, mocker):
+    owner_id = 10
+    fe.be.add_stock("ARC1", "NASDAQ", "Archive One")
+    old = _finished_game(fe, owner_id, "IdOld", "2025-01-31", 10_000.0)
+    archive_ended_games(fe.be.sql.db, fe.be.archive_db, 90, today=date(2025, 6, 1))
+    fe.be.add_game(user_id=owner_id, name="IdWarmup", start_date="2099-01-01")  # Loads the archived IDs once
+
+    mocker.patch.object(fe.be, "generate_alnum_id", side_effect=[old, "FRESH"])
+    archive_reads = mocker.patch("helpers.game_archive.query_archive")
+    send = mocker.spy(fe.be.sql, "_run_query")
+    assert fe.be.add_game(user_id=owner_id, name="IdNew", start_date="2099-01-01") == "FRESH"
+    assert send.call_count == 1 and archive_reads.call_count == 0
+    assert fe.be.game_id_stats()["collisions"] == 1
+    assert fe.be.get_game(old).name == "IdOld"
+
+
+def test_live_game_reads_never_open_the_archive(fe, mocker):
+    owner_id = 10
+    fe.be.add_stock("ARC1", "NASDAQ", "Archive One")
+    old = _finished_game(fe, owner_id, "LiveOld", "2025-01-31", 10_400.0)
+    archive_ended_games(fe.be.sql.db, fe.be.archive_db, 90, today=date(2025, 6, 1))
+    assert [row.user_id for row in fe.be.get_leaderboard(old, finalized=True)] == [owner_id]
+
+    empty = fe.be.add_game(user_id=owner_id, name="LiveEmpty", start_date="2099-01-01")
+    fe.new_game(user_id=owner_id, name="LiveJoined", start_date="2099-01-01")  # The owner joins it
+    joined = fe.be.get_many_games(name="LiveJoined")[0].id
+    archive_reads = mocker.patch("stocks.query_archive")
+    with pytest.raises(LookupError):
+        fe.be.get_leaderboard(empty)  # No players yet
+    with pytest.raises(LookupError):
+        fe.be.get_leaderboard(joined, limit=5, offset=10)  # Past the last page
+    assert fe.be.count_leaderboard(empty) == 0
+    assert fe.be.get_player_counts([empty, joined]) == {str(joined): 1}  # No archive read for the empty game
+    fe.be.get_player_counts()
+    assert archive_reads.call_count == 0
+
+    mocker.stop(archive_reads)
+    assert fe.be.get_player_counts([old, empty]) == {str(old): 1}
+
+
+def test_career_rebuild_counts_archived_games(fe):
+    owner_id = 10
+    fe.be.add_stock("ARC1", "NASDAQ", "Archive One")
+    _finished_game(fe, owner_id, "CareerOld", "2025-01-31", 11_000.0)
+    _finished_game(fe, owner_id, "CareerRecent", "2025-05-30", 9_500.0)
+    before = fe.get_user(owner_id)
+    assert (before.overall_wins, before.change_dollars) == (2, pytest.approx(500.0))
+
+    assert archive_ended_games(fe.be.sql.db, fe.be.archive_db, 90, today=date(2025, 6, 1))["games"] == 1
+    fe.be.rebuild_career_stats()
+    after = fe.get_user(owner_id)
+    assert (after.overall_wins, after.change_dollars, after.change_percent) == (before.overall_wins, before.change_dollars, before.change_percent)
+
+
+def test_update_cycle_archives_once_per_day(be, mocker, monkeypatch):
+    logic = GameLogic(be.sql.db)
+    archive = mocker.patch("stocks.archive_ended_games", return_value={"games": 0})
+    monkeypatch.setenv("GAME_ARCHIVE_AFTER_DAYS", "30")
+    assert logic.archive_games() == {"games": 0}
+    assert logic.archive_games() is None
+    archive.assert_called_once_with(be.sql.db, be.archive_db, 30, log=logic.logger)
+
+    monkeypatch.setenv("GAME_ARCHIVE_ENABLED", "0")
+    assert logic.archive_games(force=True) is None
+    assert archive.call_count == 1
@@ -0,0 +1,55 @@
+"""Validated games are cached per database and dropped on every Backend write."""
+
+import pytest
+
+from helpers.game_cache import GameCache
+from helpers.valuation import TotalUpdate, Valuation
+
+
+def test_repeat_lookups_skip_the_query_and_writes_invalidate(fe, mocker):
+    game_id = fe.new_game(user_id=10, name="CachedGame", start_date="2099-01-01")
+    fe.be.get_game(game_id)
+    assert fe.gl.be.game_cache is fe.be.game_cache  # Shared by every Backend on the DB
+
+    send = mocker.spy(fe.be.sql, "_run_query")
+    game = fe.be.get_game(game_id)
+    game.name = "Changed locally"  # Callers get their own copy
+    assert fe.be.get_game(game_id).name == "CachedGame"
+    assert send.call_count == 0
+
+    fe.gl.be.update_game(game_id, name="Renamed")  # Through the other Backend
+    assert fe.be.get_game(game_id).name == "Renamed"
+
+    fe.gl.be.apply_valuation(Valuation(games=[TotalUpdate(id=game_id, current_value=123.0, change_dollars=1.0, change_percent=1.0)]))
+    assert fe.be.get_game(game_id).current_value == 123.0
+
+    stats = fe.be.game_cache.stats()
+    assert stats["hits"] >= 2 and stats["misses"] >= 3 and stats["invalidations"] >= 2
+
+
+def test_removed_game_is_not_served_from_cache(fe):
+    game_id = fe.new_game(user_id=10, name="GoneGame", start_date="2099-01-01")
+    fe.be.get_game(game_id)
+    fe.be.remove_game(game_id)
+    with pytest.raises(LookupError):
+        fe.be.get_game(game_id)
+
+
+def test_cache_evicts_least_recently_used():
+    class Item:
+        def model_copy(self):
+            return self
+
+    cache = GameCache(max_size=2)
+    cache.put("a", Item())
+    cache.put("b", Item())
+    cache.get("a")
+    cache.put("c", Item())  # Evicts "b"
+    assert cache.get("b") is None and cache.get("a") is not None
+    stats = cache.stats()
+    assert (stats["size"], stats["hits"], stats["misses"], stats["evictions"]) == (2, 2, 1, 1)
+    assert stats["hit_rate"] == round(2 / 3, 4)
+
+    disabled = GameCache(max_size=0)
+    disabled.put("a", Item())
+    assert disabled.get("a") is None
@@ -139,6 +139,24 @@ def test_list_my_games_ranked_filters_to_participant(fe):
     assert all(count >= 1 for _, count in ranked)
 
 
+def test_ranked_lists_count_players_in_one_query(fe, mocker):
+    fe.register(20)
+    ids = [fe.new_game(user_id=10, name=f"Batch{i}", start_date="2099-01-01") for i in range(4)]
+    for game_id in ids[:2]:
+        fe.join_game(20, game_id)
+    fe.be.update_participant(fe._participant_id(20, ids[1]), status="inactive")
+    send = mocker.spy(fe.be.sql, "_run_query")  # Every SqlHelper call goes through it
+
+    ranked = dict((g.id, count) for g, count in fe.list_games_ranked(today=date(2026, 8, 1)))
+    assert [ranked[game_id] for game_id in ids] == [2, 1, 1, 1]
+    assert send.call_count == 2  # Games, then one grouped count
+
+    send.reset_mock()
+    mine = dict((g.id, count) for g, count in fe.list_my_games_ranked(20, today=date(2026, 8, 1)))
+    assert mine == {ids[0]: 2}
+    assert send.call_count <= 4  # register, participations, games, counts
+
+
 def test_recurring_games_use_configured_bot_owner(be, mocker):
     from stocks import GameLogic
 
@@ -96,6 +96,27 @@ def test_update_stock_prices_writes_alpaca_snapshots(be, mocker):
     assert bbb[0].price == 20.0
 
 
+def test_update_stock_prices_writes_one_batch_per_cycle(be, mocker, caplog):
+    import logging
+
+    be.add_stock("AAA", "NASDAQ", "Alpha")
+    be.add_stock("BRK-B", "NYSE", "Berkshire")
+    logic = GameLogic(be.sql.db)
+    mocker.patch.object(logic.alpaca, "get_latest_prices", return_value={"AAA": 12.5, "BRK-B": 400.0})
+    batch = mocker.spy(logic.be, "add_many_stock_prices")
+    lookups = mocker.spy(logic.be, "get_stock")
+
+    with caplog.at_level(logging.INFO, logger="StockGameLogic"):
+        logic.update_stock_prices(force=True)
+        logic.update_stock_prices(force=True)  # Same minute: already stored, not a write failure
+
+    assert batch.call_count == 2 and lookups.call_count == 0
+    rows = batch.call_args.args[0]
+    assert sorted(row["stock_id"] for row in rows) == sorted([be.get_stock("AAA").id, be.get_stock("BRK-B").id])
+    assert len({row["ts"] for row in rows}) == 1
+    assert "2/2 tickers priced (0 missing from feed, 0 write failures)" in caplog.text
+
+
 def test_update_stock_prices_swallows_alpaca_errors(be, mocker):
     be.add_stock("ERR", "NASDAQ", "Error Co")
     logic = GameLogic(be.sql.db)
@@ -3,6 +3,7 @@ from __future__ import annotations
 import asyncio
 from datetime import date, datetime
 from types import SimpleNamespace
+from typing import Optional
 from unittest.mock import AsyncMock, MagicMock
 
 import discord
@@ -214,9 +215,12 @@ def test_public_leaderboard_is_visible_without_participation():
     assert db._user_can_view_leaderboard(game, 999)
 
 
-def _leaderboard_entry(user_id: int) -> SimpleNamespace:
+def _leaderboard_entry(user_id: int, rank: Optional[int] = -1) -> SimpleNamespace:
     return SimpleNamespace(
+        participation_id=100 + user_id,
         user_id=user_id,
+        rank=user_id if rank == -1 else rank,
+        previous_rank=None,
         current_value=11_000,
         joined=date(2026, 8, 1),
         change_dollars=1_000,
@@ -247,8 +251,8 @@ def test_recurring_game_page_renders_chip_layout_with_picks(mocker):
         mocker.patch.object(db, "resolve_player_name", AsyncMock(return_value="Ann"))
         picks = mocker.patch.object(
             db,
-            "collect_player_picks",
-            return_value=[{"ticker": "AAPL", "company": "Apple", "change_percent": 4.0}],
+            "collect_game_picks",
+            return_value={101: [{"ticker": "AAPL", "company": "Apple", "change_percent": 4.0}]},
         )
         render = mocker.patch.object(
             db, "_cached_game_info_leaderboard_png", return_value=b"png"
@@ -256,7 +260,8 @@ def test_recurring_game_page_renders_chip_layout_with_picks(mocker):
 
         await db._build_rank_page(_page_game(4), [_leaderboard_entry(1)], None, 0)
 
-        assert picks.call_args.args[1:] == ("GAME1", 1)
+        assert picks.call_args.args[1].id == "GAME1"
+        assert picks.call_args.args[2] == [101]
         processed = render.call_args.args[2]
         assert processed[0]["picks"][0]["ticker"] == "AAPL"
         assert processed[0]["days_in_first"] == 3
@@ -271,7 +276,7 @@ def test_one_off_game_page_keeps_simple_table_and_skips_pick_lookup(mocker):
     async def run():
         db._leaderboard_image_cache.clear()
         mocker.patch.object(db, "resolve_player_name", AsyncMock(return_value="Ann"))
-        picks = mocker.patch.object(db, "collect_player_picks", return_value=[])
+        picks = mocker.patch.object(db, "collect_game_picks", return_value={})
         render = mocker.patch.object(
             db, "_cached_game_info_leaderboard_png", return_value=b"png"
         )
@@ -292,7 +297,7 @@ def test_recurring_rank_pages_contain_five_players(mocker):
     async def run():
         db._leaderboard_image_cache.clear()
         mocker.patch.object(db, "resolve_player_name", AsyncMock(return_value="Player"))
-        mocker.patch.object(db, "collect_player_picks", return_value=[])
+        picks = mocker.patch.object(db, "collect_game_picks", return_value={})
         render = mocker.patch.object(
             db, "_cached_game_info_leaderboard_png", return_value=b"png"
         )
@@ -308,6 +313,52 @@ def test_recurring_rank_pages_contain_five_players(mocker):
         processed = render.call_args.args[2]
         assert [row["user_id"] for row in processed] == [6, 7, 8, 9, 10]
         assert [row["rank"] for row in processed] == [6, 7, 8, 9, 10]
+        picks.assert_called_once()  # One batched lookup for the page
+        assert picks.call_args.args[2] == [106, 107, 108, 109, 110]
+
+    asyncio.run(run())
+
+
+def test_lazy_rank_page_loads_only_its_rows(mocker):
+    import discord_bot as db
+
+    async def run():
+        db._leaderboard_image_cache.clear()
+        mocker.patch.object(db, "resolve_player_name", AsyncMock(return_value="Player"))
+        render = mocker.patch.object(
+            db, "_cached_game_info_leaderboard_png", return_value=b"png"
+        )
+        game_info = MagicMock(
+            return_value=SimpleNamespace(leaderboard=[_leaderboard_entry(16), _leaderboard_entry(17)])
+        )
+        mocker.patch.object(db, "fe", SimpleNamespace(game_info=game_info))
+        game = _page_game(None)
+
+        descriptor = db._leaderboard_game_data(game, None, leaderboard_size=17)
+        page = await db._build_rank_page(game, None, None, 1)
+
+        assert descriptor["rank_page_count"] == 2
+        game_info.assert_called_once_with("GAME1", True, 15, 15)
+        assert (page["rank_start"], page["rank_end"]) == (16, 17)
+        assert [row["user_id"] for row in render.call_args.args[2]] == [16, 17]
+
+    asyncio.run(run())
+
+
+def test_unranked_players_are_not_numbered_by_position(mocker):
+    import discord_bot as db
+
+    async def run():
+        db._leaderboard_image_cache.clear()
+        mocker.patch.object(db, "resolve_player_name", AsyncMock(return_value="Player"))
+        render = mocker.patch.object(
+            db, "_cached_game_info_leaderboard_png", return_value=b"png"
+        )
+        leaderboard = [_leaderboard_entry(1), _leaderboard_entry(2, rank=None), _leaderboard_entry(3, rank=2)]
+
+        await db._build_rank_page(_page_game(None), leaderboard, None, 0)
+
+        assert [row["rank"] for row in render.call_args.args[2]] == [1, None, 2]
 
     asyncio.run(run())
 
@@ -328,7 +379,8 @@ def test_cached_png_switches_generator_on_recurring_flag():
             "days_in_first": 3,
             "joined": date(2026, 8, 1),
             "picks": [{"ticker": "AAPL", "company": "Apple", "change_percent": 4.0}],
-        }
+        },
+        {"rank": None, "user_id": 2, "display_name": "Pending", "current_value": 10_000, "picks": []},
     ]
 
     recurring = db._cached_game_info_leaderboard_png("rec", game_data, players, True)
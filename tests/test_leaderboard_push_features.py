@@ -9,6 +9,7 @@ from helpers.leaderboard_push import (
     bot_can_push_to_channel,
     build_push_embed,
     chunk_push_players,
+    collect_push_players,
     is_unknown_message_error,
     parse_leaderboard_message_ids,
     push_or_edit_leaderboard_message,
@@ -148,7 +149,8 @@ def test_render_push_pages_splits_top_twenty_without_image_titles(mocker):
         start_date=date.today(),
         end_date=None,
     )
-    players = [{"user_id": user_id} for user_id in range(20)]
+    players = [{"user_id": user_id, "rank": user_id + 1} for user_id in range(19)]
+    players.append({"user_id": 19, "rank": None})  # Pending: no stored rank
 
     embed, images = lp.render_push_pages(game, players, [])
 
@@ -158,6 +160,7 @@ def test_render_push_pages_splits_top_twenty_without_image_titles(mocker):
     assert [call.kwargs["show_title"] for call in calls] == [False, False, False, False]
     assert [call.kwargs["target_n"] for call in calls] == [5, 5, 5, 5]
     assert [row["rank"] for row in calls[1].args[1]] == [6, 7, 8, 9, 10]
+    assert [row["rank"] for row in calls[3].args[1]] == [16, 17, 18, 19, None]  # Not numbered by position
     assert all(call.kwargs["created_at"] is not None for call in calls)
 
 
@@ -179,6 +182,7 @@ def test_days_in_first_idempotent(db_path, mocker):
     p2 = be.get_many_participants(game_id=game_id, user_id=2)[0]
     be.update_participant(p1.id, current_value=12000, change_dollars=2000, change_percent=20)
     be.update_participant(p2.id, current_value=9000, change_dollars=-1000, change_percent=-10)
+    be.update_ranks([game_id])  # Normally done by update_participants_and_games
 
     logic = GameLogic(db_path)
     mocker.patch.object(logic, "_is_market_hours", return_value=False)
@@ -197,6 +201,30 @@ def test_days_in_first_idempotent(db_path, mocker):
     assert len(snaps.result) == 1
 
 
+def test_push_players_load_every_pick_in_one_query(fe, mocker):
+    game_id = fe.new_game(user_id=10, name="ChipGame", start_date="2099-01-01")
+    fe.register(20)
+    fe.join_game(20, game_id)
+    for ticker, name in (("CHA", "Chip A"), ("CHB", "Chip B")):
+        fe.be.add_stock(ticker, "NASDAQ", name)
+    for user_id, tickers in ((10, ("CHA", "CHB")), (20, ("CHB",))):
+        pid = fe._participant_id(user_id, game_id)
+        for ticker in tickers:
+            fe.be.add_stock_pick(pid, fe.be.get_stock(ticker).id)
+    owner_pid = fe._participant_id(10, game_id)
+    pick = fe.be.get_many_stock_picks(participant_id=owner_pid, include_tickers=True)
+    fe.be.update_stock_pick(next(p.id for p in pick if p.stock_ticker == "CHA"), status="owned", change_percent=3.0)
+    fe.be.update_participant(owner_pid, current_value=10_100.0)
+
+    send = mocker.spy(fe.be.sql, "_run_query")
+    players, owned = collect_push_players(fe, fe.be.get_game(game_id))
+
+    assert [(p["user_id"], [c["ticker"] for c in p["picks"]]) for p in players] == [(10, ["CHA", "CHB"]), (20, ["CHB"])]
+    assert players[0]["picks"][0]["company"] == "Chip A"
+    assert owned == [{"ticker": "CHA", "pct": 3.0}]
+    assert send.call_count == 2  # Leaderboard, picks (the game is cached)
+
+
 def test_is_unknown_message_error():
     assert is_unknown_message_error(discord.NotFound(MagicMock(), "missing"))
     http = discord.HTTPException(MagicMock(), "Unknown Message")
@@ -4,6 +4,7 @@ import sqlite3
 from helpers.db_backup import create_db_backup, prune_backups, maybe_daily_backup
 from helpers.sqlhelper import SqlHelper
 from db_schema import create, db_ver, remake_db_on_mismatch, ensure_database, MIGRATIONS
+from stocks import Backend
 
 
 def test_create_fresh_database_has_current_version(db_path):
@@ -144,3 +145,223 @@ def test_ensure_database_runs_registered_migration(db_path):
         assert info.result[0]["current_version"] == db_ver
     finally:
         MIGRATIONS.pop(("0.0.9", db_ver), None)
+
+
+def _downgrade_prices(db_path: str, version: str, rows: tuple[tuple, ...] = ()) -> None:
+    """Swap stock_prices for its text-``datetime`` layout (0.2.2, or 0.2.1 without tiers) holding ``rows``."""
+    tiers = ", price_type TEXT NOT NULL DEFAULT 'raw', open REAL, high REAL, low REAL" if version == "0.2.2" else ""
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("DROP TABLE stock_prices")
+        conn.execute(
+            f"""CREATE TABLE stock_prices (price_id INTEGER PRIMARY KEY AUTOINCREMENT, stock_id INTEGER NOT NULL,
+            price REAL NOT NULL, datetime TEXT NOT NULL{tiers}, UNIQUE (stock_id, datetime))"""
+        )
+        conn.executemany("INSERT INTO stock_prices (stock_id, price, datetime) VALUES (?, ?, ?)", rows)
+        conn.execute("UPDATE database_info SET current_version = ?", (version,))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def test_migrates_0_2_1_price_rows_in_place(db_path):
+    create(db_path, upgrade=False)
+    SqlHelper(db_path).insert("stocks", {"ticker": "KEEP", "exchange": "NASDAQ", "company_name": "Keep"})
+    _downgrade_prices(db_path, "0.2.1", ((1, 12.5, "2025-01-02 10:00:00"),))
+
+    assert ensure_database(db_path) == "migrated"
+    row = SqlHelper(db_path).get("stock_prices").result[0]
+    assert row["price"] == 12.5 and row["price_type"] == "raw" and row["open"] is None
+    info = SqlHelper(db_path).get("database_info", filters={"database_name": db_path})
+    assert info.result[0]["current_version"] == db_ver
+
+
+def test_migrates_0_2_2_datetimes_to_epoch_minutes(db_path):
+    create(db_path, upgrade=False)
+    SqlHelper(db_path).insert("stocks", {"ticker": "KEEP", "exchange": "NASDAQ", "company_name": "Keep"})
+    rows = (
+        (1, 10.0, "2025-01-02 10:00:00"),
+        (1, 11.0, "2025-01-02 10:00:30"),  # same minute: the later row wins
+        (1, 12.0, "2025-01-03"),
+        (1, 13.0, "not a date"),
+    )
+    _downgrade_prices(db_path, "0.2.2", rows)
+
+    assert ensure_database(db_path) == "migrated"
+    be = Backend(db_path)
+    prices = be.get_prices_between(1, "2025-01-01", "2025-01-04")
+    assert [(p.datetime.strftime("%Y-%m-%d %H:%M"), p.price) for p in prices] == [
+        ("2025-01-02 10:00", 11.0),
+        ("2025-01-03 00:00", 12.0),
+    ]
+    conn = sqlite3.connect(db_path)
+    try:
+        cols = {row[1] for row in conn.execute("PRAGMA table_info(stock_prices)")}
+        plan = " ".join(
+            str(row[3])
+            for row in conn.execute("EXPLAIN QUERY PLAN SELECT * FROM stock_prices WHERE stock_id = 1 AND ts <= 5 ORDER BY ts DESC LIMIT 1")
+        )
+    finally:
+        conn.close()
+    assert "ts" in cols and "datetime" not in cols
+    assert "USING INDEX" in plan and "TEMP B-TREE" not in plan
+
+
+def test_migrations_chain_through_intermediate_versions(db_path):
+    create(db_path, upgrade=False)
+    SqlHelper(db_path).insert("users", {"user_id": 7, "source": "testing", "datetime_created": "2025-01-01 00:00:00"})
+    _downgrade_prices(db_path, "0.2.1")
+    SqlHelper(db_path).update("database_info", {"current_version": "0.0.8"}, filters={"database_name": db_path})
+
+    steps: list[str] = []
+    MIGRATIONS[("0.0.8", "0.2.1")] = lambda _db: steps.append("0.0.8->0.2.1")
+    try:
+        assert ensure_database(db_path) == "migrated"
+    finally:
+        MIGRATIONS.pop(("0.0.8", "0.2.1"), None)
+    assert steps == ["0.0.8->0.2.1"]
+    assert SqlHelper(db_path).get("users", filters={"user_id": 7}).status == "success"
+    conn = sqlite3.connect(db_path)
+    try:
+        cols = {row[1] for row in conn.execute("PRAGMA table_info(stock_prices)")}
+    finally:
+        conn.close()
+    assert {"price_type", "open", "high", "low"} <= cols
+
+
+def test_migrates_0_2_3_adds_settlement_prices(db_path):
+    create(db_path, upgrade=False)
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("DROP TABLE settlement_prices")
+        conn.commit()
+    finally:
+        conn.close()
+    SqlHelper(db_path).update("database_info", {"current_version": "0.2.3"}, filters={"database_name": db_path})
+
+    assert ensure_database(db_path) == "migrated"
+    conn = sqlite3.connect(db_path)
+    try:
+        cols = {row[1] for row in conn.execute("PRAGMA table_info(settlement_prices)")}
+    finally:
+        conn.close()
+    assert {"game_id", "stock_id", "settle_ts", "price", "price_ts"} <= cols
+
+
+def test_migrates_0_2_4_seeds_value_history(db_path):
+    create(db_path, upgrade=False)
+    be = Backend(db_path)
+    be.add_user(7, "testing")
+    game_id = be.add_game(user_id=7, name="Seeded", start_date="2025-01-01")
+    be.add_participant(7, game_id)
+    player = be.get_many_participants(game_id=game_id)[0]
+    be.update_participant(participant_id=player.id, current_value=1_234.5)
+    SqlHelper(db_path).send_query("UPDATE game_participants SET last_updated = '2025-05-20 16:05:00'", mode="insert")
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("DROP TABLE participant_value_history")
+        conn.commit()
+    finally:
+        conn.close()
+    SqlHelper(db_path).update("database_info", {"current_version": "0.2.4"}, filters={"database_name": db_path})
+
+    assert ensure_database(db_path) == "migrated"
+    (point,) = Backend(db_path).get_value_history(participant_id=player.id)
+    assert (point.datetime.strftime("%Y-%m-%d %H:%M"), point.current_value) == ("2025-05-20 16:05", 1_234.5)
+
+
+def test_migrates_0_2_5_ranks_existing_games(db_path):
+    create(db_path, upgrade=False)
+    be = Backend(db_path)
+    for user_id in (7, 8):
+        be.add_user(user_id, "testing")
+    game_id = be.add_game(user_id=7, name="Ranked", start_date="2025-01-01")
+    for user_id, value in ((7, 900.0), (8, 1_100.0)):
+        be.add_participant(user_id, game_id)
+        player = be.get_many_participants(game_id=game_id, user_id=user_id)[0]
+        be.update_participant(participant_id=player.id, current_value=value)
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("DROP INDEX idx_participants_game_rank")
+        conn.execute("ALTER TABLE game_participants DROP COLUMN rank")
+        conn.execute("ALTER TABLE game_participants DROP COLUMN previous_rank")
+        conn.commit()
+    finally:
+        conn.close()
+    SqlHelper(db_path).update("database_info", {"current_version": "0.2.5"}, filters={"database_name": db_path})
+
+    assert ensure_database(db_path) == "migrated"
+    ranks = {p.user_id: p.rank for p in Backend(db_path).get_many_participants(game_id=game_id)}
+    assert ranks == {7: 2, 8: 1}
+
+
+def test_migrates_0_2_6_builds_career_stats(db_path):
+    create(db_path, upgrade=False)
+    be = Backend(db_path)
+    for user_id in (7, 8):
+        be.add_user(user_id, "testing")
+    game_id = be.add_game(user_id=7, name="Career", start_date="2025-01-01", starting_money=1_000)
+    for user_id, value in ((7, 1_100.0), (8, 950.0)):
+        be.add_participant(user_id, game_id)
+        player = be.get_many_participants(game_id=game_id, user_id=user_id)[0]
+        be.update_participant(participant_id=player.id, current_value=value, change_dollars=value - 1_000)
+    be.update_ranks([game_id])
+    be.update_game(game_id, status="ended")
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("ALTER TABLE users DROP COLUMN career_start_money")
+        conn.execute("ALTER TABLE games DROP COLUMN results_recorded")
+        conn.commit()
+    finally:
+        conn.close()
+    SqlHelper(db_path).update("database_info", {"current_version": "0.2.6"}, filters={"database_name": db_path})
+
+    assert ensure_database(db_path) == "migrated"
+    be = Backend(db_path)
+    assert [(u.overall_wins, u.change_dollars, u.change_percent) for u in (be.get_user(7), be.get_user(8))] == [
+        (1, 100.0, 10.0),
+        (0, -50.0, -5.0),
+    ]
+    assert be.finalize_game(game_id) is False  # Already counted by the migration
+
+
+def test_migrates_0_2_7_freezes_counted_games(db_path):
+    create(db_path, upgrade=False)
+    be = Backend(db_path)
+    be.add_user(7, "testing")
+    game_id = be.add_game(user_id=7, name="Frozen", start_date="2025-01-01")
+    be.add_participant(7, game_id)
+    player = be.get_many_participants(game_id=game_id)[0]
+    be.update_participant(participant_id=player.id, current_value=10_250.0)
+    be.update_game(game_id, status="ended")
+    be.finalize_game(game_id)
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("DROP TABLE game_results")
+        conn.execute("DROP TABLE pick_results")
+        conn.commit()
+    finally:
+        conn.close()
+    SqlHelper(db_path).update("database_info", {"current_version": "0.2.7"}, filters={"database_name": db_path})
+
+    assert ensure_database(db_path) == "migrated"
+    (result,) = Backend(db_path).get_game_results(game_id)
+    assert (result.user_id, result.current_value, result.rank) == (7, 10_250.0, 1)
+
+
+def test_migrates_0_2_8_indexes_picks_by_stock(db_path):
+    create(db_path, upgrade=False)
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("DROP INDEX idx_stock_picks_stock")
+        conn.commit()
+    finally:
+        conn.close()
+    SqlHelper(db_path).update("database_info", {"current_version": "0.2.8"}, filters={"database_name": db_path})
+
+    assert ensure_database(db_path) == "migrated"
+    conn = sqlite3.connect(db_path)
+    try:
+        assert conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_stock_picks_stock'").fetchone()
+    finally:
+        conn.close()
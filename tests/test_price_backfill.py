@@ -0,0 +1,92 @@
+"""Historical bars backfill: pagination, batching and idempotent loads."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from helpers.alpaca_client import AlpacaMarketData, BATCH_SIZE
+from helpers.price_backfill import backfill_stock_prices, bar_datetime
+
+
+@pytest.fixture
+def alpaca(mocker):
+    client = AlpacaMarketData(api_key="test-key", secret_key="test-secret")
+    mocker.patch("helpers.alpaca_client.time.sleep")
+    return client
+
+
+def _response(payload: dict) -> MagicMock:
+    response = MagicMock()
+    response.status_code = 200
+    response.json.return_value = payload
+    return response
+
+
+def _bar(day: str, close: float) -> dict:
+    return {"t": f"{day}T05:00:00Z", "o": close, "h": close, "l": close, "c": close, "v": 100}
+
+
+def test_bar_datetime_pins_daily_bars_to_trade_date():
+    assert bar_datetime("2026-03-02T05:00:00Z", "1Day").startswith("2026-03-0")
+    assert bar_datetime("2026-03-02T14:31:00Z", "1Min").endswith(":00")
+
+
+def test_iter_bars_follows_page_tokens(alpaca, mocker):
+    get = mocker.patch.object(
+        alpaca,
+        "_get",
+        side_effect=[
+            _response({"bars": {"AAA": [_bar("2026-03-02", 1.0)]}, "next_page_token": "abc"}),
+            _response({"bars": {"AAA": [_bar("2026-03-03", 2.0)]}, "next_page_token": None}),
+        ],
+    )
+    pages = list(alpaca.iter_bars(["AAA"], "2026-03-02", "2026-03-03"))
+    assert [len(bars) for _, bars in pages] == [1, 1]
+    assert get.call_args_list[1].kwargs["params"]["page_token"] == "abc"
+
+
+def test_iter_bars_batches_symbols_and_maps_back_to_db_tickers(alpaca, mocker):
+    tickers = ["BRK-B"] + [f"T{i:03d}" for i in range(BATCH_SIZE)]
+    seen_batches: list[list[str]] = []
+
+    def _side_effect(url, params=None):
+        symbols = params["symbols"].split(",")
+        seen_batches.append(symbols)
+        return _response({"bars": {sym: [_bar("2026-03-02", 1.0)] for sym in symbols}})
+
+    mocker.patch.object(alpaca, "_get", side_effect=_side_effect)
+    yielded = {ticker for ticker, _ in alpaca.iter_bars(tickers, "2026-03-02", "2026-03-02")}
+    assert [len(batch) for batch in seen_batches] == [BATCH_SIZE, 1]
+    assert "BRK.B" in seen_batches[0]
+    assert yielded == set(tickers)
+
+
+def test_fetch_bars_rejects_bad_timeframe(alpaca):
+    with pytest.raises(ValueError):
+        alpaca.fetch_bars(["AAA"], "2026-03-02", "2026-03-03", timeframe="daily")
+
+
+def test_backfill_is_idempotent(be, alpaca, mocker):
+    be.add_stock("AAA", "NASDAQ", "Aaa Corp")
+    be.add_stock("BBB", "NASDAQ", "Bbb Corp")
+    payload = {
+        "bars": {
+            "AAA": [_bar("2026-03-02", 10.0), _bar("2026-03-03", 11.0)],
+            "BBB": [_bar("2026-03-02", 20.0)],
+        }
+    }
+    mocker.patch.object(alpaca, "_get", side_effect=lambda url, params=None: _response(payload))
+
+    first = backfill_stock_prices(be, alpaca, start="2026-03-02", end="2026-03-03", tickers=["AAA", "BBB", "ZZZ"])
+    second = backfill_stock_prices(be, alpaca, start="2026-03-02", end="2026-03-03", tickers=["AAA", "BBB"])
+
+    assert first == {"tickers": 2, "bars": 3, "inserted": 3, "skipped": 0, "unknown": 1}
+    assert second["inserted"] == 0 and second["skipped"] == 3
+    assert be.sql.send_query("SELECT COUNT(*) AS total FROM stock_prices").result[0]["total"] == 3
+    day_rows = be.get_many_stock_prices(stock_id=be.get_stock("AAA").id, datetime=bar_datetime(_bar("2026-03-03", 0)["t"], "1Day")[:10])
+    assert day_rows[0].price == 11.0
+
+
+def test_backfill_rejects_inverted_range(be, alpaca):
+    with pytest.raises(ValueError):
+        backfill_stock_prices(be, alpaca, start="2026-03-05", end="2026-03-01")
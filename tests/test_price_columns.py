@@ -0,0 +1,86 @@
+"""Columnar price export: incremental refresh and the memory-mapped reader."""
+
+import json
+from datetime import datetime
+
+import pytest
+
+from helpers.price_columns import PriceColumns, export_price_columns
+from helpers.price_retention import RetentionPolicy, compact_stock_prices
+from helpers.price_time import to_ts
+from stocks import GameLogic
+
+
+def _prices(be, ticker, rows):
+    stock_id = be.get_stock(ticker).id
+    be.add_many_stock_prices([{"stock_id": stock_id, "price": p, "datetime": dt} for dt, p in rows])
+
+
+@pytest.fixture
+def stocks(be):
+    be.add_stock("AAA", "NASDAQ", "Aaa Corp")
+    be.add_stock("BRK.B", "NYSE", "Berkshire")
+    _prices(be, "AAA", [("2026-01-02 10:00:00", 10.0), ("2026-01-02 11:00:00", 11.0), ("2026-01-05 10:00:00", 12.0)])
+    _prices(be, "BRK.B", [("2026-01-02 10:00:00", 400.0), ("2026-01-05 10:00:00", 380.0)])
+    return be
+
+
+def test_export_and_mmap_reader(stocks, tmp_path):
+    report = export_price_columns(stocks.sql.db, str(tmp_path))
+    assert report == {"tickers": 2, "appended": 0, "rewritten": 2, "removed": 0, "rows": 5}
+
+    with PriceColumns(str(tmp_path)) as cols:
+        assert cols.tickers == ["AAA", "BRK.B"] and "brk.b" in cols
+        aaa = cols.series("AAA")
+        assert list(aaa.prices) == [10.0, 11.0, 12.0]
+        assert list(aaa.ts) == [to_ts("2026-01-02 10:00"), to_ts("2026-01-02 11:00"), to_ts("2026-01-05 10:00")]
+        assert list(aaa.returns()) == pytest.approx([0.1, 12 / 11 - 1])
+        assert aaa.window(to_ts("2026-01-02 10:30")).total_return() == pytest.approx(12 / 11 - 1)
+        returns = cols.period_returns(["AAA", "BRK.B", "NOPE"], "2026-01-01", "2026-01-06")
+        assert returns == {"AAA": pytest.approx(0.2), "BRK.B": pytest.approx(-0.05), "NOPE": None}
+        with pytest.raises(LookupError):
+            cols.series("NOPE")
+
+
+def test_incremental_refresh_appends_rewrites_and_removes(stocks, tmp_path):
+    export_price_columns(stocks.sql.db, str(tmp_path))
+    again = export_price_columns(stocks.sql.db, str(tmp_path))
+    assert again["appended"] == again["rewritten"] == 0
+
+    # New minute for AAA (append), refined last minute via the stream's upsert is picked up with it.
+    aaa_id = stocks.get_stock("AAA").id
+    stocks.add_many_stock_prices([{"stock_id": aaa_id, "price": 12.5, "datetime": "2026-01-05 10:00:00"}], replace=True)
+    _prices(stocks, "AAA", [("2026-01-05 11:00:00", 13.0)])
+    # Backfilled older BRK.B row (rewrite).
+    _prices(stocks, "BRK.B", [("2026-01-01 10:00:00", 390.0)])
+    report = export_price_columns(stocks.sql.db, str(tmp_path))
+    assert (report["appended"], report["rewritten"]) == (1, 1)
+
+    with PriceColumns(str(tmp_path)) as cols:
+        assert list(cols.series("AAA").prices) == [10.0, 11.0, 12.5, 13.0]
+        assert list(cols.series("BRK.B").prices) == [390.0, 400.0, 380.0]
+
+    stocks.remove_stock("BRK.B")
+    assert export_price_columns(stocks.sql.db, str(tmp_path))["removed"] == 1
+    manifest = json.loads((tmp_path / "manifest.json").read_text())
+    assert list(manifest["tickers"]) == ["AAA"]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["1.price", "1.ts", "manifest.json"]
+
+
+def test_compaction_triggers_rewrite(stocks, tmp_path):
+    export_price_columns(stocks.sql.db, str(tmp_path))
+    compact_stock_prices(stocks.sql.db, RetentionPolicy(raw_days=1, hourly_days=1), now=datetime(2026, 3, 1))
+    report = export_price_columns(stocks.sql.db, str(tmp_path))
+    assert report["rewritten"] == 2  # Every old row became a daily row
+    with PriceColumns(str(tmp_path)) as cols:
+        assert list(cols.series("AAA").prices) == [11.0, 12.0]  # 2026-01-02 closed at 11.0
+
+
+def test_update_cycle_refreshes_export_when_configured(be, mocker, monkeypatch, tmp_path):
+    logic = GameLogic(be.sql.db)
+    export = mocker.patch("stocks.export_price_columns", return_value={"rows": 0})
+    monkeypatch.delenv("PRICE_COLUMNS_DIR", raising=False)
+    assert logic.refresh_price_columns() is None
+    monkeypatch.setenv("PRICE_COLUMNS_DIR", str(tmp_path))
+    assert logic.refresh_price_columns() == {"rows": 0}
+    export.assert_called_once_with(be.sql.db, str(tmp_path), log=logic.logger)
@@ -0,0 +1,91 @@
+"""Tiered stock_prices retention: raw -> hourly -> daily OHLC in bounded batches."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from helpers.price_retention import RetentionPolicy, compact_stock_prices
+from stocks import GameLogic
+
+NOW = datetime(2026, 6, 30, 12, 0)
+
+
+def _at(days_ago: int, hour: int, minute: int) -> str:
+    return (NOW - timedelta(days=days_ago)).replace(hour=hour, minute=minute, second=0).strftime("%Y-%m-%d %H:%M:%S")
+
+
+@pytest.fixture
+def seeded(be):
+    be.add_stock("AAA", "NASDAQ", "Aaa Corp")
+    stock_id = be.get_stock("AAA").id
+    rows = []
+    # Today: stays raw.
+    rows += [{"stock_id": stock_id, "price": 50.0 + m, "datetime": _at(0, 10, m)} for m in (0, 15, 30)]
+    # 40 days ago: two hours of 15-minute polls -> two hourly rows.
+    for hour, prices in ((10, (10.0, 12.0, 9.0, 11.0)), (11, (11.0, 13.0, 12.0, 12.5))):
+        rows += [{"stock_id": stock_id, "price": p, "datetime": _at(40, hour, 15 * i)} for i, p in enumerate(prices)]
+    # 200 days ago: a full day -> one daily row.
+    for i, p in enumerate((20.0, 25.0, 18.0, 22.0, 21.0)):
+        rows.append({"stock_id": stock_id, "price": p, "datetime": _at(200, 10 + i, 0)})
+    be.add_many_stock_prices(rows)
+    return stock_id
+
+
+def test_compaction_downsamples_each_tier(be, seeded):
+    policy = RetentionPolicy(raw_days=30, hourly_days=180, batch_size=3)
+    report = compact_stock_prices(be.sql.db, policy, now=NOW)
+
+    assert report["rows_before"] == 16 and report["rows_after"] == 6
+    assert report["rows_deleted"] == 13
+    assert report["hourly_written"] == 2 and report["daily_written"] == 1
+    assert report["batches"] >= 2  # batch_size forces more than one transaction
+    assert report["bytes_reclaimed"] >= 0
+
+    hourly = be.get_many_stock_prices(stock_id=seeded, datetime=_at(40, 0, 0)[:10])
+    assert [(p.price_type, p.open, p.high, p.low, p.price) for p in hourly] == [
+        ("hourly", 11.0, 13.0, 11.0, 12.5),
+        ("hourly", 10.0, 12.0, 9.0, 11.0),
+    ]
+    assert hourly[0].datetime.strftime("%H:%M") == "11:45"  # stamped with the last replaced row
+
+    daily = be.get_many_stock_prices(stock_id=seeded, datetime=_at(200, 0, 0)[:10])
+    assert [(p.price_type, p.open, p.high, p.low, p.price) for p in daily] == [("daily", 20.0, 25.0, 18.0, 21.0)]
+
+    today = be.get_many_stock_prices(stock_id=seeded, datetime=_at(0, 0, 0)[:10])
+    assert {p.price_type for p in today} == {"raw"} and len(today) == 3
+
+
+def test_compaction_is_idempotent_and_rolls_hourly_into_daily(be, seeded):
+    compact_stock_prices(be.sql.db, RetentionPolicy(raw_days=30, hourly_days=180), now=NOW)
+    again = compact_stock_prices(be.sql.db, RetentionPolicy(raw_days=30, hourly_days=180), now=NOW)
+    assert again["batches"] == 0 and again["rows_after"] == again["rows_before"]
+
+    # Later, the 40-day-old hourly rows age past the hourly window.
+    later = compact_stock_prices(be.sql.db, RetentionPolicy(raw_days=30, hourly_days=30), now=NOW)
+    assert later["daily_written"] == 1 and later["hourly_written"] == 0
+    day = be.get_many_stock_prices(stock_id=seeded, datetime=_at(40, 0, 0)[:10])
+    assert [(p.price_type, p.open, p.high, p.low, p.price) for p in day] == [("daily", 10.0, 13.0, 9.0, 12.5)]
+
+
+def test_retention_policy_validation_and_env(monkeypatch):
+    with pytest.raises(ValueError):
+        RetentionPolicy(raw_days=0)
+    with pytest.raises(ValueError):
+        RetentionPolicy(raw_days=30, hourly_days=10)
+    monkeypatch.setenv("PRICE_RETENTION_RAW_DAYS", "7")
+    monkeypatch.setenv("PRICE_RETENTION_HOURLY_DAYS", "60")
+    monkeypatch.setenv("PRICE_RETENTION_VACUUM", "true")
+    assert RetentionPolicy.from_env() == RetentionPolicy(raw_days=7, hourly_days=60, vacuum=True)
+
+
+def test_update_cycle_runs_retention_once_per_day(be, mocker, monkeypatch):
+    logic = GameLogic(be.sql.db)
+    compact = mocker.patch("stocks.compact_stock_prices", return_value={"rows_after": 0})
+    history = mocker.patch("stocks.compact_value_history", return_value={"days": 0})
+    assert logic.apply_price_retention() == {"rows_after": 0, "value_history": {"days": 0}}
+    assert logic.apply_price_retention() is None
+    assert compact.call_count == history.call_count == 1
+
+    monkeypatch.setenv("PRICE_RETENTION_ENABLED", "0")
+    assert logic.apply_price_retention(force=True) is None
+    assert compact.call_count == 1
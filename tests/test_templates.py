@@ -206,6 +206,7 @@ def test_remove_game_template_clears_links(be, mocker):
     template = be.get_many_game_templates(status="enabled")[0]
     game = be.get_many_games(owner_id=owner_id, include_private=True)[0]
     assert game.template_id == template.id
+    assert be.get_game(game.id).template_id == template.id  # Now cached
 
     be.remove_game_template(template.id)
     with pytest.raises(LookupError):
@@ -0,0 +1,266 @@
+"""Valuation engine parity with the per-pick formulas GameLogic used before it."""
+
+import random
+from datetime import date
+
+import pytest
+
+from helpers.price_time import to_ts
+from helpers.valuation import Holding, value_picks, value_portfolios, value_totals
+from stocks import GameLogic
+
+
+def _reference_pick(h):
+    """The old ``update_stock_picks`` body for one pick -> stored (shares, start, current, change$, change%, status)."""
+    if h.status == "pending_buy":
+        buying_power = float(h.start_money / h.pick_count)
+        shares = buying_power / h.price
+        start_value = current_value = round(float(shares * h.price), 2)
+        return shares, start_value, current_value, 0, 0, "owned"
+    current_value = float(h.shares * h.price)
+    dollar_change = current_value - h.start_value
+    percent_change = (dollar_change / h.start_value) * 100
+    status = "sold" if h.status == "pending_sell" else h.status
+    return h.shares, h.start_value, current_value, round(dollar_change, 2), round(percent_change, 2), status
+
+
+def _reference_participant(start_money, pick_count, picks):
+    """The old ``update_participants_and_games`` body for one player (picks: (status, current_value, change_dollars))."""
+    portfolio_value = 0.0
+    allocation = start_money / pick_count
+    active_picks = [p for p in picks if p[0] != "sold"]
+    for status, current_value, _ in active_picks:
+        if status == "pending_buy":
+            portfolio_value += allocation
+        elif current_value is not None:
+            portfolio_value += current_value
+    portfolio_value += sum(p[2] or 0 for p in picks if p[0] == "sold")
+    portfolio_value += start_money - allocation * len(active_picks)
+    return portfolio_value
+
+
+def _random_holdings(rng, games=6, players=5):
+    holdings = []
+    pid = pick_id = 0
+    for g in range(games):
+        start_money, pick_count = rng.choice([(10_000, 5), (1_000, 3), (25_000, 10), (500.5, 7)])
+        for _ in range(players):
+            pid += 1
+            picks = rng.randint(0, pick_count)
+            if not picks:
+                holdings.append(Holding(f"G{g}", start_money, pick_count, pid))
+            for _ in range(picks):
+                pick_id += 1
+                status = rng.choice(["pending_buy", "owned", "pending_sell", "sold"])
+                price = None if rng.random() < 0.15 else round(rng.uniform(1, 900), 2)
+                shares = start = current = change = None
+                if status != "pending_buy":
+                    shares = rng.uniform(0.1, 200)
+                    start = round(shares * rng.uniform(1, 900), 2)
+                    current = shares * rng.uniform(1, 900)
+                    change = round(current - start, 2)
+                holdings.append(
+                    Holding(f"G{g}", start_money, pick_count, pid, pick_id, status, shares, start, current, change, None, price)
+                )
+    return holdings
+
+
+def test_pick_updates_match_reference_formulas():
+    rng = random.Random(7)
+    holdings = _random_holdings(rng)
+    updates, after = value_picks(holdings)
+    by_id = {u.pick_id: u for u in updates}
+
+    for before, stored in zip(holdings, after):
+        repriced = before.pick_id is not None and before.price is not None and before.status != "sold"
+        assert (before.pick_id in by_id) == repriced
+        if not repriced:
+            assert stored == before
+            continue
+        shares, start, current, change, percent, status = _reference_pick(before)
+        assert (stored.shares, stored.start_value, stored.status) == (pytest.approx(shares), start, status)
+        assert stored.current_value == pytest.approx(current)
+        assert (stored.change_dollars, stored.change_percent) == (change, percent)
+
+
+def test_totals_match_reference_formulas():
+    rng = random.Random(11)
+    holdings = value_picks(_random_holdings(rng))[1]
+    result = value_totals(holdings)
+
+    players: dict = {}
+    for h in holdings:
+        entry = players.setdefault(h.participation_id, (h.game_id, h.start_money, h.pick_count, []))
+        if h.pick_id is not None:
+            entry[3].append((h.status, h.current_value, h.change_dollars))
+    expected_games: dict = {}
+    for pid, (game_id, start_money, pick_count, picks) in players.items():
+        value = _reference_participant(start_money, pick_count, picks)
+        total = next(t for t in result.participants if t.id == pid)
+        assert total.current_value == pytest.approx(value)
+        assert total.change_dollars == round(value - start_money, 2)
+        assert total.change_percent == pytest.approx(round((value - start_money) / start_money * 100, 2))
+        agg, count = expected_games.get(game_id, (0.0, 0))
+        expected_games[game_id] = (agg + value, count + 1)
+
+    assert {g.id for g in result.games} == set(expected_games)
+    for game in result.games:
+        aggregate, count = expected_games[game.id]
+        baseline = next(h.start_money for h in holdings if h.game_id == game.id) * count
+        assert game.current_value == pytest.approx(aggregate)
+        assert game.change_dollars == round(aggregate - baseline, 2)
+
+
+def test_value_portfolios_reports_uninvested_cash():
+    holdings = [
+        Holding("G", 10_000, 4, 1, 1, "pending_buy", price=50.0),
+        Holding("G", 10_000, 4, 1, 2, "owned", 10.0, 1_000.0, 1_000.0, price=120.0),
+        Holding("G", 10_000, 4, 2),
+    ]
+    result = value_portfolios(holdings)
+    assert [u.status for u in result.picks] == ["owned", None]
+    assert result.uninvested_cash == {1: 5_000.0, 2: 10_000.0}
+    first, second = result.participants
+    assert first.current_value == pytest.approx(2_500 + 1_200 + 5_000)
+    assert second.current_value == 10_000
+    assert result.games[0].current_value == pytest.approx(18_700)
+
+
+def test_update_cycle_values_every_active_game_in_bulk(be, mocker):
+    owner_id = 301
+    be.add_user(owner_id, "testing")
+    be.add_stock("VAL1", "NASDAQ", "Val One")
+    stock = be.get_stock("VAL1")
+    be.add_stock_price(stock.id, price=25.0, datetime="2025-05-21 10:00:00")
+    game_ids = []
+    for name, private in (("ValPublic", False), ("ValPrivate", True)):
+        game_id = be.add_game(user_id=owner_id, name=name, start_date="2025-01-01", starting_money=1_000, total_picks=2, private_game=private)
+        be.update_game(game_id, status="active")
+        be.add_participant(owner_id, game_id, force_active=True)
+        participant = be.get_many_participants(game_id=game_id)[0]
+        be.add_stock_pick(participant.id, stock.id)
+        game_ids.append(game_id)
+
+    logic = GameLogic(be.sql.db)
+    mocker.patch.object(logic, "_is_market_hours", return_value=False)
+    send = mocker.spy(logic.be.sql, "send_query")
+    logic.update_stock_picks()
+    logic.update_participants_and_games()
+    assert send.call_count <= 9  # two loads + settlement capture/read + ranks + at most one write per table
+
+    for game_id in game_ids:
+        player = be.get_many_participants(game_id=game_id)[0]
+        pick = be.get_many_stock_picks(participant_id=player.id)[0]
+        assert (pick.status, pick.shares, pick.current_value) == ("owned", pytest.approx(20.0), 500.0)
+        assert player.current_value == pytest.approx(1_000.0)
+        assert be.get_game(game_id).current_value == pytest.approx(1_000.0)
+
+
+def test_daily_games_keep_prices_during_market_hours(be, mocker):
+    owner_id = 302
+    be.add_user(owner_id, "testing")
+    be.add_stock("DAY1", "NASDAQ", "Day One")
+    stock = be.get_stock("DAY1")
+    be.add_stock_price(stock.id, price=25.0, datetime="2025-05-21 10:00:00")
+    game_id = be.add_game(user_id=owner_id, name="DailyVal", start_date="2025-01-01", starting_money=1_000, total_picks=2, update_frequency="daily")
+    be.update_game(game_id, status="active")
+    be.add_participant(owner_id, game_id, force_active=True)
+    participant = be.get_many_participants(game_id=game_id)[0]
+    be.add_stock_pick(participant.id, stock.id)
+
+    logic = GameLogic(be.sql.db)
+    mocker.patch.object(logic, "_is_market_hours", return_value=True)
+    logic.update_stock_picks(game_id=game_id)
+    assert be.get_many_stock_picks(participant_id=participant.id)[0].status == "pending_buy"
+    logic.update_stock_picks(game_id=game_id, force=True)
+    assert be.get_many_stock_picks(participant_id=participant.id)[0].status == "owned"
+
+
+def _settlement_game(be, owner_id, ticker, start_date, players=1):
+    be.add_user(owner_id, "testing")
+    be.add_stock(ticker, "NASDAQ", ticker.title())
+    stock = be.get_stock(ticker)
+    game_id = be.add_game(user_id=owner_id, name=f"Settle{ticker}", start_date=start_date, starting_money=1_000, total_picks=2)
+    be.update_game(game_id, status="active")
+    participants = []
+    for offset in range(players):
+        user_id = owner_id + offset
+        if offset:
+            be.add_user(user_id, "testing")
+        be.add_participant(user_id, game_id, force_active=True)
+        participants.append(next(p for p in be.get_many_participants(game_id=game_id) if p.user_id == user_id))
+    return stock.id, game_id, participants
+
+
+def _settlement_rows(be, game_id):
+    query = "SELECT stock_id, settle_ts, price FROM settlement_prices WHERE game_id = ?"
+    resp = be.sql.send_query(query, values=[str(game_id)])
+    return list(resp.result) if resp.status == "success" else []
+
+
+def test_pending_buys_made_before_start_fill_at_the_opening_price(be, mocker):
+    stock_id, game_id, (player, other) = _settlement_game(be, 311, "OPN1", "2025-05-21", players=2)
+    logic = GameLogic(be.sql.db)
+    mocker.patch.object(logic, "_is_market_hours", return_value=False)
+    open_ts = logic._market_open_ts(date(2025, 5, 21))
+    be.add_many_stock_prices(
+        [
+            {"stock_id": stock_id, "price": 20.0, "ts": open_ts - 30},  # Pre-market
+            {"stock_id": stock_id, "price": 25.0, "ts": open_ts + 1},  # Official fill
+            {"stock_id": stock_id, "price": 40.0, "ts": open_ts + 120},  # Latest
+        ]
+    )
+    be.add_stock_pick(player.id, stock_id)  # Both picks were made at 10:00 (mocked), before the open
+    be.add_stock_pick(other.id, stock_id)
+
+    logic.update_stock_picks()
+    for participant in (player, other):
+        pick = be.get_many_stock_picks(participant_id=participant.id)[0]
+        assert (pick.status, pick.shares, pick.start_value) == ("owned", pytest.approx(20.0), 500.0)
+        assert pick.current_value == 500.0  # Revalued at the latest price from the next cycle on
+    assert _settlement_rows(be, game_id) == [{"stock_id": stock_id, "settle_ts": open_ts, "price": 25.0}]
+
+    logic.update_stock_picks()
+    assert be.get_many_stock_picks(participant_id=player.id)[0].current_value == pytest.approx(800.0)
+
+
+def test_late_pending_buys_fill_at_the_next_price_or_wait(be, mocker):
+    stock_id, game_id, (player,) = _settlement_game(be, 321, "LATE1", "2025-01-01")
+    logic = GameLogic(be.sql.db)
+    mocker.patch.object(logic, "_is_market_hours", return_value=False)
+    created = to_ts("2025-05-21 10:00:00")
+    be.add_many_stock_prices([{"stock_id": stock_id, "price": 20.0, "ts": created - 5}])
+    be.add_stock_pick(player.id, stock_id)
+
+    logic.update_stock_picks()  # Nothing priced since the pick was made
+    assert be.get_many_stock_picks(participant_id=player.id)[0].status == "pending_buy"
+    assert _settlement_rows(be, game_id) == []
+
+    be.add_many_stock_prices(
+        [{"stock_id": stock_id, "price": 25.0, "ts": created + 5}, {"stock_id": stock_id, "price": 50.0, "ts": created + 60}]
+    )
+    logic.update_stock_picks()
+    pick = be.get_many_stock_picks(participant_id=player.id)[0]
+    assert (pick.status, pick.shares) == ("owned", pytest.approx(20.0))
+    assert _settlement_rows(be, game_id) == [{"stock_id": stock_id, "settle_ts": created, "price": 25.0}]
+
+
+def test_ranks_are_stored_with_their_last_move(be):
+    _, game_id, players = _settlement_game(be, 331, "RANK1", "2025-01-01", players=4)
+    first, second, third, pending = players
+    be.update_participant(pending.id, status="pending", current_value=9_999.0)
+    for player, value in ((first, 1_200.0), (second, 900.0), (third, 900.0)):
+        be.update_participant(player.id, current_value=value)
+
+    def ranks():
+        by_id = {p.id: (p.rank, p.previous_rank) for p in be.get_many_participants(game_id=game_id)}
+        return [by_id[p.id] for p in players]
+
+    be.update_ranks()
+    assert ranks() == [(1, None), (2, None), (3, None), (None, None)]  # Tie goes to the earlier joiner
+
+    be.update_participant(third.id, current_value=1_500.0)
+    be.update_ranks([game_id])
+    assert ranks() == [(2, 1), (3, 2), (1, 3), (None, None)]
+    be.update_ranks([game_id])  # Nothing moved: previous ranks are kept
+    assert ranks() == [(2, 1), (3, 2), (1, 3), (None, None)]
@@ -0,0 +1,82 @@
+"""Participant value history: bulk writes from the update cycle, range reads and compaction."""
+
+from datetime import datetime
+
+import pytest
+
+from helpers.price_time import to_ts
+from helpers.value_history import compact_value_history
+from stocks import GameLogic
+
+
+@pytest.fixture
+def game(be):
+    owner_id = 401
+    be.add_user(owner_id, "testing")
+    be.add_user(owner_id + 1, "testing")
+    be.add_stock("HIST1", "NASDAQ", "Hist One")
+    stock = be.get_stock("HIST1")
+    be.add_stock_price(stock.id, price=25.0, datetime="2025-05-21 10:00:00")
+    game_id = be.add_game(user_id=owner_id, name="History", start_date="2025-01-01", starting_money=1_000, total_picks=2)
+    be.update_game(game_id, status="active")
+    for user_id in (owner_id, owner_id + 1):
+        be.add_participant(user_id, game_id, force_active=True)
+    player = next(p for p in be.get_many_participants(game_id=game_id) if p.user_id == owner_id)
+    be.add_stock_pick(player.id, stock.id)
+    return game_id, player, stock
+
+
+def _history(be, **filters):
+    return [(h.participant_id, h.datetime.strftime("%Y-%m-%d %H:%M"), h.current_value, h.resolution) for h in be.get_value_history(**filters)]
+
+
+def test_update_cycle_appends_one_row_per_participant(be, game, mocker):
+    game_id, player, stock = game
+    logic = GameLogic(be.sql.db)
+    mocker.patch.object(logic, "_is_market_hours", return_value=False)
+    logic.update_stock_picks()
+    logic.update_participants_and_games()
+    assert len(be.get_value_history(game_id=game_id)) == 2
+
+    # Same cycle minute again: replaced, not duplicated
+    be.add_many_stock_prices([{"stock_id": stock.id, "price": 50.0, "datetime": "2025-05-21 10:00:00"}], replace=True)
+    logic.update_stock_picks()
+    logic.update_participants_and_games()
+    assert _history(be, participant_id=player.id) == [(player.id, "2025-05-21 10:00", pytest.approx(1_500.0), "cycle")]
+
+    mocker.patch("stocks._iso8601", return_value="2025-05-21 10:15:00")
+    logic.update_participants_and_games()
+    assert [h.datetime.minute for h in be.get_value_history(participant_id=player.id)] == [0, 15]
+    assert len(be.get_value_history(game_id=game_id, start="2025-05-21 10:01:00")) == 2
+    with pytest.raises(LookupError):
+        be.get_value_history(game_id=game_id, end="2025-05-21")
+    with pytest.raises(ValueError):
+        be.get_value_history()
+
+
+def test_compaction_keeps_the_last_cycle_of_each_old_day(be, game):
+    game_id, player, _ = game
+    be.sql.send_query("DELETE FROM participant_value_history", mode="insert")
+    rows = [
+        ("2025-05-01 10:00", 1_000.0),
+        ("2025-05-01 16:00", 1_010.0),  # Day close
+        ("2025-05-02 10:00", 1_020.0),  # Only row of the day
+        ("2025-05-20 10:00", 1_030.0),  # Inside the cycle window
+        ("2025-05-20 11:00", 1_040.0),
+    ]
+    values = [(player.id, str(game_id), to_ts(dt), value) for dt, value in rows]
+    be.sql.send_query(
+        "INSERT INTO participant_value_history (participation_id, game_id, ts, current_value) VALUES (?, ?, ?, ?)",
+        values=values,
+        mode="insert_multi",
+    )
+
+    report = compact_value_history(be.sql.db, keep_days=7, now=datetime(2025, 5, 21, 12))
+    assert report == {"days": 2, "rows_deleted": 1, "rows_kept": 2}
+    assert _history(be, participant_id=player.id) == [
+        (player.id, "2025-05-01 16:00", 1_010.0, "daily"),
+        (player.id, "2025-05-02 10:00", 1_020.0, "daily"),
+        (player.id, "2025-05-20 10:00", 1_030.0, "cycle"),
+        (player.id, "2025-05-20 11:00", 1_040.0, "cycle"),
+    ]
+    assert compact_value_history(be.sql.db, keep_days=7, now=datetime(2025, 5, 21, 12))["days"] == 0